@@ -1,12 +1,19 @@
+import argparse
 import base64
+import hashlib
 import json
 import os
 import re
 import secrets
-import smtplib
-from datetime import datetime, timezone as dt_timezone
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 from email.message import EmailMessage
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import parsedate_to_datetime
+from itertools import chain, islice
 from pathlib import Path
 from urllib.parse import urlencode, urlparse
 
@@ -14,6 +21,67 @@ from zoneinfo import ZoneInfo
 
 import mysql.connector
 
+from attachment_store import add_reference, create_attachment_store
+from attachments import (
+    IncompleteUploadError,
+    RangeNotSatisfiableError,
+    UploadTooLargeError,
+    content_disposition,
+    etag_matches,
+    iter_request_body,
+    parse_byte_range,
+    spool_upload,
+)
+from change_bus import ChangeBus, TooManySubscribersError, format_event
+from db_pool import ConnectionPool
+from email_outbox import OutboxDispatcher, OutboxStore, create_smtp_pool, enqueue_messages
+from email_templates import get_template, meeting_template_values
+from free_busy import BusyIndex, free_busy, parse_free_busy_filters, split_emails
+from json_encoding import STREAM_CHUNK_ITEMS, dumps as dumps_json, iter_json_array
+from list_cache import ListCache, create_cache_versions
+from meeting_listing import (
+    MAX_SEARCH_LENGTH,
+    encode_cursor,
+    fetch_meeting_options,
+    fetch_meeting_page_ids,
+    fetch_meetings_by_id,
+    parse_meeting_filters,
+)
+from member_feeds import (
+    MEMBER_BY_FEED_TOKEN_QUERY,
+    PARTSTATS,
+    FeedCache,
+    MemberFeed,
+    feed_last_modified,
+    feed_url,
+    fetch_feed_meetings,
+    new_feed_token,
+)
+from migrations import MIGRATIONS_DIR, MigrationError, apply_migrations, check_schema, load_migrations
+from occurrence_index import (
+    extend_horizon,
+    fetch_calendar,
+    materialize_meeting,
+    occurrence_rows,
+    parse_calendar_filters,
+    time_of_day,
+)
+from recurrence import (
+    OccurrenceCache,
+    RecurrenceError,
+    RecurrenceRule,
+    format_exdates,
+    parse_date,
+    parse_exdates,
+    series_from_meeting,
+)
+from response_compression import ResponseCompressor
+from response_tokens import ResponseTokenSigner, TokenError, parse_token_keys
+from router import RouteTimings, Router, parse_query
+from rsvp import RESPONSE_ACTIONS, RsvpService
+from server import SERVER_MODES, KeepAliveRequestHandler, create_server, serve_prefork
+from static_assets import StaticAssetCache, encoded_etag, negotiate_encoding
+
 # Load environment variables at the very start
 BASE_DIR = Path(__file__).resolve().parent
 try:
@@ -23,11 +91,12 @@ except Exception:
     pass
 
 PUBLIC_DIR = BASE_DIR / "public"
+STATIC_ASSETS = StaticAssetCache(PUBLIC_DIR)
 DB_DIR = BASE_DIR / "db"
-SCHEMA_PATH = DB_DIR / "schema.sql"
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 EST_ZONE = ZoneInfo("America/New_York")
 EST_TIMEZONE_LABEL = "EST"
+ATTACHMENT_DB_CHUNK_SIZE = 1024 * 1024
 
 
 def _parse_bool(value, default=False):
@@ -76,20 +145,13 @@ def _escape_ics_text(value):
 
 
 def _get_est_meeting_range(meeting_payload):
-    starts_at_raw = meeting_payload["startsAt"]
-    start_time_raw = meeting_payload["startTime"]
-    end_time_raw = meeting_payload["endTime"]
-
-    starts_at = starts_at_raw.isoformat() if hasattr(starts_at_raw, "isoformat") else str(starts_at_raw)
-    starts_at = starts_at.split("T", 1)[0]
+    # Rows from MySQL carry TIME columns as timedelta; request payloads as "HH:MM".
+    starts_at = parse_date(meeting_payload["startsAt"])
+    start_time = time_of_day(meeting_payload["startTime"]).replace(second=0)
+    end_time = time_of_day(meeting_payload["endTime"]).replace(second=0)
 
-    start_time = start_time_raw.isoformat() if hasattr(start_time_raw, "isoformat") else str(start_time_raw)
-    end_time = end_time_raw.isoformat() if hasattr(end_time_raw, "isoformat") else str(end_time_raw)
-    start_time = start_time[:5]
-    end_time = end_time[:5]
-
-    start_est = datetime.strptime(f"{starts_at} {start_time}", "%Y-%m-%d %H:%M").replace(tzinfo=EST_ZONE)
-    end_est = datetime.strptime(f"{starts_at} {end_time}", "%Y-%m-%d %H:%M").replace(tzinfo=EST_ZONE)
+    start_est = datetime.combine(starts_at, start_time, tzinfo=EST_ZONE)
+    end_est = datetime.combine(starts_at, end_time, tzinfo=EST_ZONE)
     return start_est, end_est
 
 
@@ -128,31 +190,63 @@ def build_calendar_links(meeting_payload, teams_join_url=None):
     }
 
 
-def build_ics_content(meeting_payload, teams_join_url=None, organizer_email=None):
+def _ics_recurrence_lines(meeting_payload, start_est):
+    """RRULE and EXDATE lines for a recurring meeting; empty for one-time ones."""
+    try:
+        series = series_from_meeting(meeting_payload)
+    except RecurrenceError as error:
+        print(f"[ICS] Skipping unparseable recurrence for meeting {meeting_payload.get('id')}: {error}")
+        return []
+    if series.rule is None:
+        return []
+    until = None
+    if series.last_possible and not series.rule.count:
+        # With a TZID start, UNTIL must be a UTC date-time (RFC 5545 3.3.10).
+        last_start = datetime.combine(series.last_possible, start_est.timetz())
+        until = last_start.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = [f"RRULE:{series.rule.format(until=until)}"]
+    if series.exdates:
+        times = ",".join(
+            datetime.combine(day, start_est.time()).strftime("%Y%m%dT%H%M%S") for day in sorted(series.exdates)
+        )
+        lines.append(f"EXDATE;TZID=America/New_York:{times}")
+    return lines
+
+
+def _ics_event_lines(meeting_payload, teams_join_url=None, organizer_email=None, dtstamp=None):
     start_est, end_est = _get_est_meeting_range(meeting_payload)
     meeting_id = meeting_payload.get("id") or secrets.token_hex(8)
-    dtstamp = datetime.now(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    dtstamp = (dtstamp or datetime.now(dt_timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
     uid = f"meeting-{meeting_id}@meeting-planner-pro.local"
 
     lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//Meeting Planner Pro//EN",
-        "CALSCALE:GREGORIAN",
-        "METHOD:REQUEST",
         "BEGIN:VEVENT",
         f"UID:{uid}",
         f"DTSTAMP:{dtstamp}",
         f"DTSTART;TZID=America/New_York:{start_est.strftime('%Y%m%dT%H%M%S')}",
         f"DTEND;TZID=America/New_York:{end_est.strftime('%Y%m%dT%H%M%S')}",
+    ]
+    lines.extend(_ics_recurrence_lines(meeting_payload, start_est))
+    lines.extend([
         f"SUMMARY:{_escape_ics_text(meeting_payload.get('name'))}",
         f"LOCATION:{_escape_ics_text(teams_join_url or 'Online Meeting')}",
         f"DESCRIPTION:{_escape_ics_text(f'Join link: {teams_join_url}' if teams_join_url else 'Online meeting')}",
-    ]
+    ])
 
     if organizer_email:
         lines.append(f"ORGANIZER:MAILTO:{organizer_email}")
+    return lines
+
 
+def build_ics_content(meeting_payload, teams_join_url=None, organizer_email=None):
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Meeting Planner Pro//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:REQUEST",
+    ]
+    lines.extend(_ics_event_lines(meeting_payload, teams_join_url, organizer_email))
     lines.extend([
         "END:VEVENT",
         "END:VCALENDAR",
@@ -162,10 +256,42 @@ def build_ics_content(meeting_payload, teams_join_url=None, organizer_email=None
     return "\r\n".join(lines)
 
 
-def send_invite_emails(invitees_with_tokens, meeting_payload, base_url="http://localhost:3000"):
-    """Send meeting invite emails via SMTP with action buttons.
+def build_member_feed(member, meetings, organizer_email=None):
+    """Subscribable VCALENDAR with one VEVENT per meeting, recurring series as RRULEs.
+
+    Each DTSTAMP is the meeting's creation time rather than the render
+    time, so the same meetings always render to the same bytes.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Meeting Planner Pro//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape_ics_text('Meetings - ' + member['fullName'])}",
+        "X-WR-TIMEZONE:America/New_York",
+    ]
+    for meeting in meetings:
+        lines.extend(
+            _ics_event_lines(
+                meeting,
+                meeting.get("teamsJoinUrl"),
+                organizer_email,
+                meeting["createdAt"].replace(tzinfo=dt_timezone.utc),
+            )
+        )
+        lines.append(f"ATTENDEE;PARTSTAT={PARTSTATS[meeting.get('responseStatus')]}:MAILTO:{member['email']}")
+        lines.append("END:VEVENT")
+    lines.extend(["END:VCALENDAR", ""])
+    return "\r\n".join(lines)
+
+
+def send_invite_emails(cursor, invitees_with_tokens, meeting_payload, base_url="http://localhost:3000"):
+    """Queue meeting invite emails with action buttons in the email outbox.
     
     Args:
+        cursor: Cursor of the transaction creating the meeting; the emails are
+            delivered by the outbox dispatcher once it commits
         invitees_with_tokens: Dict mapping email -> response_token
         meeting_payload: Dict with meeting details
         base_url: Base URL for action links
@@ -179,254 +305,46 @@ def send_invite_emails(invitees_with_tokens, meeting_payload, base_url="http://l
         return False, f"Missing SMTP settings: {', '.join(missing)}"
 
     try:
+        # Meeting fields are substituted (and escaped) once; only the
+        # recipient's response links are filled in per invitee.
+        meeting_values = meeting_template_values(meeting_payload)
+        text_template = get_template("invite_email.txt").partial(
+            {**meeting_values, "teamsJoinUrl": meeting_payload.get("teamsJoinUrl") or "N/A"}
+        )
+        html_template = get_template("invite_email.html").partial(
+            {**meeting_values, "teamsJoinUrl": meeting_payload.get("teamsJoinUrl") or "#"}
+        )
+        subject = f"Meeting Invite: {meeting_payload['name']}"
+
+        messages = []
         for invitee_email, token in invitees_with_tokens.items():
-            # Create action links
-            accept_link = f"{base_url}/api/respond-to-meeting/{token}?action=accept&calendar=1"
-            decline_link = f"{base_url}/api/respond-to-meeting/{token}?action=decline"
-            tentative_link = f"{base_url}/api/respond-to-meeting/{token}?action=tentative"
-            
-            msg = EmailMessage()
-            msg["Subject"] = f"Meeting Invite: {meeting_payload['name']}"
+            response_url = f"{base_url}/api/respond-to-meeting/{token}"
+            links = {
+                "acceptLink": f"{response_url}?action=accept&calendar=1",
+                "declineLink": f"{response_url}?action=decline",
+                "tentativeLink": f"{response_url}?action=tentative",
+            }
+
+            # The compat32 MIME classes skip the header-registry parsing that
+            # dominates EmailMessage construction for large invite lists.
+            msg = MIMEMultipart("alternative")
+            msg["Subject"] = subject
             msg["From"] = settings["from"]
             msg["To"] = invitee_email
-            
-            # Plain text version (fallback)
-            plain_text = f"""You are invited to a meeting.
-
-Meeting: {meeting_payload['name']}
-Meeting ID: {meeting_payload['id']}
-Date: {meeting_payload['startsAt']}
-Time: {meeting_payload['startTime']} - {meeting_payload['endTime']} ({meeting_payload['timezone']})
-Microsoft Teams: {meeting_payload.get('teamsJoinUrl') or 'N/A'}
-Schedule: {meeting_payload['scheduleType']}
-Recurrence: {meeting_payload.get('recurrenceRule') or 'N/A'}
-Recurrence End: {meeting_payload.get('recurrenceEndDate') or 'N/A'}
-
---- RESPOND TO THIS INVITATION ---
-
-ACCEPT:    {accept_link}
-DECLINE:   {decline_link}
-TENTATIVE: {tentative_link}
-
----
-Please click the appropriate link or button to respond to this meeting invitation.
-"""
-            
-            # HTML version with styled buttons
-            html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 600px;
-            margin: 0;
-            padding: 0;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            background-color: #ffffff;
-            padding: 30px;
-            margin: 20px 0;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #2c3e50;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-        }}
-        .meeting-details {{
-            background-color: #f8f9fa;
-            padding: 15px;
-            border-left: 4px solid #3498db;
-            margin: 20px 0;
-            border-radius: 4px;
-        }}
-        .detail-row {{
-            margin: 8px 0;
-            padding: 5px 0;
-        }}
-        .detail-label {{
-            font-weight: bold;
-            color: #2c3e50;
-            min-width: 120px;
-            display: inline-block;
-        }}
-        .button-container {{
-            display: flex;
-            gap: 15px;
-            margin: 30px 0;
-            flex-wrap: wrap;
-            justify-content: center;
-        }}
-        .button {{
-            display: inline-block;
-            padding: 14px 28px;
-            margin: 10px 5px;
-            text-decoration: none;
-            border-radius: 6px;
-            font-weight: bold;
-            font-size: 16px;
-            cursor: pointer;
-            border: none;
-            transition: all 0.3s ease;
-            text-align: center;
-            min-width: 140px;
-        }}
-        .button-accept {{
-            background-color: #27ae60;
-            color: white;
-        }}
-        .button-accept:hover {{
-            background-color: #229954;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-        }}
-        .button-decline {{
-            background-color: #e74c3c;
-            color: white;
-        }}
-        .button-decline:hover {{
-            background-color: #c0392b;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-        }}
-        .button-tentative {{
-            background-color: #f39c12;
-            color: white;
-        }}
-        .button-tentative:hover {{
-            background-color: #d68910;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-        }}
-        .status-legend {{
-            background-color: #f0f8ff;
-            padding: 15px;
-            border-radius: 4px;
-            margin: 20px 0;
-            border-left: 4px solid #3498db;
-        }}
-        .status-legend-item {{
-            margin: 8px 0;
-            font-size: 14px;
-        }}
-        .footer {{
-            text-align: center;
-            padding-top: 20px;
-            border-top: 1px solid #ddd;
-            color: #7f8c8d;
-            font-size: 12px;
-            margin-top: 30px;
-        }}
-        .icon {{
-            margin-right: 5px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>You Have Been Invited to a Meeting</h1>
-        
-        <div class="meeting-details">
-            <div class="detail-row">
-                <span class="detail-label">Meeting Name:</span> {meeting_payload['name']}
-            </div>
-            <div class="detail-row">
-                <span class="detail-label">Meeting ID:</span> {meeting_payload['id']}
-            </div>
-            <div class="detail-row">
-                <span class="detail-label">Date:</span> {meeting_payload['startsAt']}
-            </div>
-            <div class="detail-row">
-                <span class="detail-label">Time:</span> {meeting_payload['startTime']} - {meeting_payload['endTime']} ({meeting_payload['timezone']})
-            </div>
-            <div class="detail-row">
-                <span class="detail-label">Microsoft Teams:</span>
-                <a href="{meeting_payload.get('teamsJoinUrl') or '#'}" target="_blank" rel="noopener noreferrer">Join / Open in Teams</a>
-            </div>
-            <div class="detail-row">
-                <span class="detail-label">Schedule:</span> {meeting_payload['scheduleType']}
-            </div>
-            <div class="detail-row">
-                <span class="detail-label">Recurrence:</span> {meeting_payload.get('recurrenceRule') or 'N/A'}
-            </div>
-            <div class="detail-row">
-                <span class="detail-label">Ends:</span> {meeting_payload.get('recurrenceEndDate') or 'N/A'}
-            </div>
-        </div>
-
-        <h2 style="color: #2c3e50; margin-top: 30px;">Please Respond to this Invitation</h2>
-        
-        <p style="text-align: center; color: #555; margin: 20px 0;">
-            Click the appropriate button below to let us know if you can attend:
-        </p>
-        
-        <div class="button-container">
-            <a href="{accept_link}" class="button button-accept" style="color: white;">
-                <span class="icon">✓</span> Accept
-            </a>
-            <a href="{tentative_link}" class="button button-tentative" style="color: white;">
-                <span class="icon">?</span> Tentative
-            </a>
-            <a href="{decline_link}" class="button button-decline" style="color: white;">
-                <span class="icon">✕</span> Decline
-            </a>
-        </div>
-
-        <div class="status-legend">
-            <strong>Your Response Options:</strong>
-            <div class="status-legend-item"><span class="icon">✓</span> <strong>Accept</strong> - I can attend this meeting</div>
-            <div class="status-legend-item"><span class="icon">?</span> <strong>Tentative</strong> - I might be able to attend</div>
-            <div class="status-legend-item"><span class="icon">✕</span> <strong>Decline</strong> - I cannot attend this meeting</div>
-        </div>
-
-        <p style="color: #7f8c8d; font-size: 14px; text-align: center; margin-top: 20px;">
-            Your response will be automatically recorded and displayed in the calendar.
-        </p>
-
-        <div class="footer">
-            <p>This is an automated message from Meeting Planner Pro.</p>
-            <p>If you have questions about this meeting, please contact the organizer.</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-            
-            msg.set_content(plain_text)
-            msg.add_alternative(html_content, subtype='html')
-
-            # Try SSL first (port 465), then TLS (port 587)
-            port = settings["port"]
-            if port == 465:
-                # Use implicit SSL
-                with smtplib.SMTP_SSL(settings["host"], port, timeout=10) as server:
-                    server.login(settings["user"], settings["password"])
-                    server.send_message(msg)
-            else:
-                # Use explicit TLS (port 587 or others)
-                with smtplib.SMTP(settings["host"], port, timeout=10) as server:
-                    if settings["use_tls"]:
-                        server.starttls()
-                    server.login(settings["user"], settings["password"])
-                    server.send_message(msg)
-        
-        return True, "Emails sent successfully"
-    except smtplib.SMTPAuthenticationError:
-        return False, "SMTP authentication failed. Check SMTP_USER and SMTP_PASSWORD."
-    except smtplib.SMTPException as e:
-        return False, f"SMTP error: {str(e)}"
+            msg.attach(MIMEText(text_template.render(links), "plain", "utf-8"))
+            msg.attach(MIMEText(html_template.render(links), "html", "utf-8"))
+            messages.append(msg)
+
+        queued = enqueue_messages(cursor, messages, meeting_payload["id"])
+        return True, f"{queued} invitation email(s) queued"
+    except mysql.connector.Error as e:
+        return False, f"Failed to queue emails: {str(e)}"
     except Exception as e:
-        return False, f"Failed to send emails: {str(e)}"
+        return False, f"Failed to build emails: {str(e)}"
 
 
-def send_calendar_invite_email(invitee_email, meeting_payload):
+def send_calendar_invite_email(cursor, invitee_email, meeting_payload):
+    """Queue the .ics calendar invite for an accepted meeting in the email outbox."""
     settings = _get_smtp_settings()
     missing = _validate_smtp_settings(settings)
     if missing:
@@ -443,91 +361,438 @@ def send_calendar_invite_email(invitee_email, meeting_payload):
         msg["To"] = invitee_email
 
         msg.set_content(
-            f"""You accepted the meeting invitation.
-
-Meeting: {meeting_payload['name']}
-Date: {meeting_payload['startsAt']}
-Time: {meeting_payload['startTime']} - {meeting_payload['endTime']} ({meeting_payload.get('timezone') or EST_TIMEZONE_LABEL})
-Microsoft Teams: {teams_join_url or 'N/A'}
-
-The calendar file is attached and should be added to your email calendar automatically in most clients.
-"""
+            get_template("calendar_invite_email.txt").render(
+                {
+                    **meeting_template_values(meeting_payload),
+                    "timezone": meeting_payload.get("timezone") or EST_TIMEZONE_LABEL,
+                    "teamsJoinUrl": teams_join_url or "N/A",
+                }
+            )
         )
 
         msg.add_attachment(
-            ics_content.encode("utf-8"),
-            maintype="text",
+            ics_content,
             subtype="calendar",
             filename=ics_filename,
-            method="REQUEST",
+            params={"method": "REQUEST"},
         )
 
-        port = settings["port"]
-        if port == 465:
-            with smtplib.SMTP_SSL(settings["host"], port, timeout=10) as server:
-                server.login(settings["user"], settings["password"])
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(settings["host"], port, timeout=10) as server:
-                if settings["use_tls"]:
-                    server.starttls()
-                server.login(settings["user"], settings["password"])
-                server.send_message(msg)
-
-        return True, "Calendar invite sent"
-    except smtplib.SMTPAuthenticationError:
-        return False, "SMTP authentication failed"
+        enqueue_messages(cursor, [msg], meeting_payload.get("id"))
+        return True, "Calendar invite queued"
     except Exception as error:
-        return False, f"Failed to send calendar invite: {str(error)}"
+        return False, f"Failed to queue calendar invite: {str(error)}"
 
 
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.environ.get("DB_HOST", "127.0.0.1"),
-        port=int(os.environ.get("DB_PORT", "3306")),
-        user=os.environ.get("DB_USER", "root"),
-        password=os.environ.get("DB_PASSWORD", "12345678"),
-        database=os.environ.get("DB_NAME", "General_meetings_db"),
+def _get_email_outbox_settings():
+    return {
+        "workers": int(os.environ.get("EMAIL_SMTP_SESSIONS", "2")),
+        "batch_size": int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", "20")),
+        "poll_interval": float(os.environ.get("EMAIL_OUTBOX_POLL_INTERVAL", "5")),
+        "max_attempts": int(os.environ.get("EMAIL_MAX_ATTEMPTS", "6")),
+        "backoff_base": float(os.environ.get("EMAIL_RETRY_BASE_SECONDS", "30")),
+        "backoff_max": float(os.environ.get("EMAIL_RETRY_MAX_SECONDS", "3600")),
+    }
+
+
+_email_dispatcher = None
+_email_dispatcher_pid = None
+_email_dispatcher_lock = threading.Lock()
+
+
+def get_email_dispatcher():
+    """Return this process's running outbox dispatcher, or None if email is disabled."""
+    global _email_dispatcher, _email_dispatcher_pid
+    if not EMAIL_ENABLED:
+        return None
+    pid = os.getpid()
+    if _email_dispatcher is not None and _email_dispatcher_pid == pid:
+        return _email_dispatcher
+    with _email_dispatcher_lock:
+        if _email_dispatcher is None or _email_dispatcher_pid != pid:
+            settings = _get_smtp_settings()
+            outbox_settings = _get_email_outbox_settings()
+            _email_dispatcher = OutboxDispatcher(
+                OutboxStore(get_db_connection),
+                create_smtp_pool(settings, size=outbox_settings["workers"]),
+                settings["from"],
+                **outbox_settings,
+            )
+            _email_dispatcher.start()
+            _email_dispatcher_pid = pid
+    return _email_dispatcher
+
+
+def wake_email_dispatcher():
+    dispatcher = get_email_dispatcher()
+    if dispatcher is not None:
+        dispatcher.wake()
+
+
+def stop_email_dispatcher():
+    global _email_dispatcher
+    with _email_dispatcher_lock:
+        if _email_dispatcher is not None and _email_dispatcher_pid == os.getpid():
+            _email_dispatcher.stop()
+        _email_dispatcher = None
+
+
+def _get_attachment_settings():
+    spool_dir = os.environ.get("ATTACHMENT_SPOOL_DIR", "").strip()
+    return {
+        "max_bytes": int(os.environ.get("ATTACHMENT_MAX_BYTES", str(50 * 1024 * 1024))),
+        "spool_dir": spool_dir or None,
+        "store": os.environ.get("ATTACHMENT_STORE", "filesystem").strip(),
+        "store_dir": os.environ.get("ATTACHMENT_STORE_DIR", "").strip() or str(BASE_DIR / "data" / "attachments"),
+    }
+
+
+def _iter_file_data(cursor, attachment_id, start, length):
+    """``length`` bytes of a not yet migrated attachment's file_data from ``start``, in ATTACHMENT_DB_CHUNK_SIZE slices."""
+    offset = start + 1  # SUBSTRING counts from 1
+    remaining = length
+    while remaining > 0:
+        cursor.execute(
+            "SELECT SUBSTRING(file_data, %s, %s) AS chunk FROM meeting_attachments WHERE id = %s",
+            (offset, min(ATTACHMENT_DB_CHUNK_SIZE, remaining), attachment_id),
+        )
+        chunk = cursor.fetchone()["chunk"]
+        if not chunk:
+            return
+        yield bytes(chunk)
+        offset += len(chunk)
+        remaining -= len(chunk)
+
+
+_attachment_store = None
+_attachment_store_lock = threading.Lock()
+
+
+def get_attachment_store():
+    """Return the configured attachment content store, creating it on first use."""
+    global _attachment_store
+    with _attachment_store_lock:
+        if _attachment_store is None:
+            settings = _get_attachment_settings()
+            options = {"root": settings["store_dir"]} if settings["store"] == "filesystem" else {}
+            _attachment_store = create_attachment_store(settings["store"], **options)
+    return _attachment_store
+
+
+def insert_attachment(cursor, patient, file_name, file_type, file_size, sha256):
+    """Insert an attachment row that points at content in the attachment store.
+
+    Takes the attachment_blobs reference first; callers put the content in
+    the store after this and before committing.
+    """
+    add_reference(cursor, sha256, file_size)
+    cursor.execute(
+        """
+        INSERT INTO meeting_attachments
+        (meeting_id, medical_record_number, doctor_name, department_name, file_name, file_type, file_size, content_sha256)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        (
+            patient["meeting_id"],
+            patient["medical_record_number"],
+            patient["doctor_name"],
+            patient["department_name"],
+            file_name,
+            file_type,
+            file_size,
+            sha256,
+        ),
     )
+    return cursor.lastrowid
+
+
+def _get_response_token_settings():
+    keys, active_key_id = parse_token_keys(os.environ.get("RESPONSE_TOKEN_KEYS", ""))
+    return {
+        "keys": keys,
+        "active_key_id": active_key_id,
+        "ttl_seconds": float(os.environ.get("RESPONSE_TOKEN_TTL_DAYS", "180")) * 86400,
+    }
+
+
+def _create_response_token_signer():
+    settings = _get_response_token_settings()
+    if not settings["keys"]:
+        print("[TOKENS] RESPONSE_TOKEN_KEYS is not set; issuing unsigned random response tokens")
+        return None
+    return ResponseTokenSigner(settings["keys"], settings["active_key_id"], settings["ttl_seconds"])
+
+
+RSVP = RsvpService(ttl=float(os.environ.get("RSVP_CACHE_TTL", "30")), signer=_create_response_token_signer())
+CHANGES = ChangeBus(
+    history=int(os.environ.get("EVENTS_HISTORY", "1000")),
+    max_subscribers=int(os.environ.get("EVENTS_MAX_STREAMS", "8")),
+)
+EVENTS_STREAM_SECONDS = float(os.environ.get("EVENTS_STREAM_SECONDS", "300"))
+EVENTS_HEARTBEAT_SECONDS = 15
+EVENTS_RETRY_MS = 3000
+# Longer JSON arrays are streamed with chunked encoding instead of buffered.
+JSON_STREAM_MIN_ITEMS = int(os.environ.get("JSON_STREAM_MIN_ITEMS", "1000"))
+COMPRESSION = ResponseCompressor(
+    min_size=int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1024")),
+    gzip_level=int(os.environ.get("RESPONSE_GZIP_LEVEL", "6")),
+    brotli_quality=int(os.environ.get("RESPONSE_BROTLI_QUALITY", "4")),
+)
+FEEDS = FeedCache(ttl=float(os.environ.get("FEED_CACHE_TTL", "300")))
+# Team, member and meeting lists, and the ETags of list responses. Cache
+# keys depend on "teams", "members", "meetings" (which meetings exist),
+# "meeting:<id>" (one meeting's patients, attachments and responses),
+# "meeting_details" (those of any meeting) and "patient_details".
+LIST_CACHE = ListCache(
+    ttl=float(os.environ.get("LIST_CACHE_TTL", "300")),
+    max_entries=int(os.environ.get("LIST_CACHE_SIZE", "2000")),
+    versions=create_cache_versions(os.environ.get("LIST_CACHE_VERSIONS", "local")),
+)
+OCCURRENCES = OccurrenceCache(max_entries=int(os.environ.get("OCCURRENCE_CACHE_SIZE", "10000")))
+OCCURRENCE_HORIZON_DAYS = int(os.environ.get("OCCURRENCE_HORIZON_DAYS", "400"))
+_occurrence_horizon = None
+_occurrence_horizon_lock = threading.Lock()
+
+
+def occurrence_horizon_end():
+    """Last date meeting_occurrences is kept filled to: the rolling horizon or a later requested end."""
+    rolling = datetime.now(EST_ZONE).date() + timedelta(days=OCCURRENCE_HORIZON_DAYS)
+    return max(rolling, _occurrence_horizon or rolling)
+
+
+def ensure_occurrence_horizon(end=None):
+    """Extend meeting_occurrences to the rolling horizon, or to ``end`` when that is later.
+
+    Cheap once the horizon is reached: the check is in memory and the
+    rolling horizon only moves once a day.
+    """
+    global _occurrence_horizon
+    target = max(occurrence_horizon_end(), end or date.min)
+    if _occurrence_horizon is not None and _occurrence_horizon >= target:
+        return
+    with _occurrence_horizon_lock:
+        if _occurrence_horizon is not None and _occurrence_horizon >= target:
+            return
+        conn = get_db_connection()
+        try:
+            totals = extend_horizon(conn, target)
+        finally:
+            conn.close()
+        _occurrence_horizon = target
+    if totals["meetings"]:
+        print(f"[OCCURRENCES] Extended {totals['meetings']} meeting(s) to {target}: {totals['occurrences']} occurrence(s)")
+
+
+BUSY = BusyIndex()
+# Each worker process keeps its own index; rebuilding it picks up meetings
+# and responses written by other processes. 0 disables the rebuilds.
+BUSY_INDEX_MAX_AGE = float(os.environ.get("BUSY_INDEX_MAX_AGE", "300"))
+# Conflicts listed in a 409 response; conflictCount has the full number.
+MAX_REPORTED_CONFLICTS = 50
+_busy_index_lock = threading.Lock()
+_busy_index_rebuilding = False
+
+
+def rebuild_busy_index():
+    """Reload the busy index from the database, from today to its current end."""
+    global _busy_index_rebuilding
+    try:
+        with _busy_index_lock:
+            until = max(BUSY.until or date.min, occurrence_horizon_end())
+            conn = get_db_connection()
+            try:
+                BUSY.rebuild(conn, datetime.now(EST_ZONE).date(), until)
+            finally:
+                conn.close()
+    finally:
+        _busy_index_rebuilding = False
+
+
+def ensure_busy_index(end=None):
+    """Build the busy index on first use and extend it to the occurrence horizon or ``end``.
+
+    An index older than BUSY_INDEX_MAX_AGE keeps answering while a
+    background task rebuilds it.
+    """
+    global _busy_index_rebuilding
+    target = max(occurrence_horizon_end(), end or date.min)
+    ensure_occurrence_horizon(target)
+    if not BUSY.loaded or BUSY.until < target:
+        with _busy_index_lock:
+            conn = get_db_connection()
+            try:
+                if not BUSY.loaded:
+                    BUSY.rebuild(conn, datetime.now(EST_ZONE).date(), target)
+                    print(f"[BUSY] Indexed {BUSY.stats()['intervals']} busy interval(s) up to {target}")
+                else:
+                    BUSY.extend(conn, target)
+            finally:
+                conn.close()
+    elif BUSY_INDEX_MAX_AGE and BUSY.age() > BUSY_INDEX_MAX_AGE and not _busy_index_rebuilding:
+        _busy_index_rebuilding = True
+        submit_background_task(rebuild_busy_index)
+
+
+_background_executor = None
+_background_executor_pid = None
+_background_executor_lock = threading.Lock()
+
+
+def _log_background_failure(future):
+    error = future.exception()
+    if error is not None:
+        print(f"[BACKGROUND] Task failed: {error}")
 
 
-def initialize_db():
-    DB_DIR.mkdir(parents=True, exist_ok=True)
-    schema_sql = SCHEMA_PATH.read_text(encoding="utf-8")
+def submit_background_task(func, *args):
+    """Run ``func(*args)`` on this process's small background thread pool."""
+    global _background_executor, _background_executor_pid
+    pid = os.getpid()
+    with _background_executor_lock:
+        if _background_executor is None or _background_executor_pid != pid:
+            _background_executor = ThreadPoolExecutor(
+                max_workers=int(os.environ.get("BACKGROUND_WORKERS", "2")),
+                thread_name_prefix="background",
+            )
+            _background_executor_pid = pid
+        future = _background_executor.submit(func, *args)
+    future.add_done_callback(_log_background_failure)
+    return future
+
+
+def stop_background_tasks():
+    """Finish queued background tasks, e.g. on shutdown."""
+    global _background_executor
+    with _background_executor_lock:
+        if _background_executor is not None and _background_executor_pid == os.getpid():
+            _background_executor.shutdown(wait=True)
+        _background_executor = None
+
+
+def warm_up_indexes():
+    """Roll the occurrence horizon forward and build the busy index.
+
+    Runs as a background task in each serving process, so time to start
+    does not grow with the number of meetings. A request that needs either
+    first waits for it on the same locks.
+    """
+    started = time.perf_counter()
+    ensure_busy_index()
+    STARTUP_TIMINGS["warm_up"] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"[STARTUP] Occurrences and busy index ready in {STARTUP_TIMINGS['warm_up']} ms")
+
+
+def start_services():
+    get_email_dispatcher()
+    submit_background_task(warm_up_indexes)
+
+
+def stop_services():
+    stop_background_tasks()
+    stop_email_dispatcher()
+
+
+def queue_calendar_invite(invitee_email, meeting_payload):
+    """Render and enqueue the accepted-meeting calendar email off the request path."""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        statements = [stmt.strip() for stmt in schema_sql.split(";") if stmt.strip()]
-        for statement in statements:
-            cursor.execute(statement)
+        queued, message = send_calendar_invite_email(cursor, invitee_email, meeting_payload)
+        if not queued:
+            print(f"[EMAIL] Calendar invite for {invitee_email} not queued: {message}")
+            return
         conn.commit()
     finally:
         conn.close()
+    wake_email_dispatcher()
+
+
+def _get_db_settings():
+    return {
+        "host": os.environ.get("DB_HOST", "127.0.0.1"),
+        "port": int(os.environ.get("DB_PORT", "3306")),
+        "user": os.environ.get("DB_USER", "root"),
+        "password": os.environ.get("DB_PASSWORD", "12345678"),
+        "database": os.environ.get("DB_NAME", "General_meetings_db"),
+    }
+
+
+def _get_db_pool_settings():
+    return {
+        "size": int(os.environ.get("DB_POOL_SIZE", "10")),
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "5")),
+        "healthcheck_idle": float(os.environ.get("DB_POOL_HEALTHCHECK_IDLE", "5")),
+        "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", "1800")),
+    }
+
+
+_db_pool = None
+_db_pool_pid = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool():
+    """Return the process-wide connection pool, creating it on first use.
+
+    The pool is rebuilt after a fork so worker processes never share sockets.
+    """
+    global _db_pool, _db_pool_pid
+    pid = os.getpid()
+    if _db_pool is not None and _db_pool_pid == pid:
+        return _db_pool
+    with _db_pool_lock:
+        if _db_pool is None or _db_pool_pid != pid:
+            settings = _get_db_settings()
+            _db_pool = ConnectionPool(lambda: mysql.connector.connect(**settings), **_get_db_pool_settings())
+            _db_pool_pid = pid
+    return _db_pool
+
+
+def close_db_pool():
+    """Close this process's pool, e.g. before forking worker processes."""
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is not None:
+            _db_pool.close()
+        _db_pool = None
 
 
-def ensure_schema_updates():
+def get_db_connection():
+    """Check out a pooled connection; close() returns it to the pool."""
+    return get_db_pool().acquire()
+
+
+def check_schema_version():
+    """Fail fast unless every migration in db/migrations has been applied.
+
+    One query against schema_migrations; the schema itself is only changed
+    by migrate_schema() (python migrate_schema.py, or app.py --migrate).
+    """
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT COUNT(*)
-            FROM information_schema.COLUMNS
-            WHERE TABLE_SCHEMA = DATABASE()
-              AND TABLE_NAME = 'meeting_schedules'
-              AND COLUMN_NAME = 'teams_join_url'
-            """
-        )
-        exists = cursor.fetchone()[0] > 0
-        if not exists:
-            cursor.execute(
-                "ALTER TABLE meeting_schedules ADD COLUMN teams_join_url VARCHAR(2048) NULL"
-            )
-            conn.commit()
+        return check_schema(conn, load_migrations(MIGRATIONS_DIR))
     finally:
         conn.close()
 
 
+def migrate_schema(log=print):
+    """Apply pending migrations. Returns the migrations applied."""
+    conn = get_db_connection()
+    try:
+        return apply_migrations(conn, load_migrations(MIGRATIONS_DIR), log)
+    finally:
+        conn.close()
+
+
+def run_timed(steps):
+    """Run (name, function) pairs in order and return {name: milliseconds}."""
+    timings = {}
+    for name, function in steps:
+        started = time.perf_counter()
+        function()
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
+
+
 def build_teams_meeting_url(name, starts_at, start_time, end_time):
     start_est = datetime.strptime(f"{starts_at} {start_time}", "%Y-%m-%d %H:%M").replace(tzinfo=EST_ZONE)
     end_est = datetime.strptime(f"{starts_at} {end_time}", "%Y-%m-%d %H:%M").replace(tzinfo=EST_ZONE)
@@ -541,671 +806,1244 @@ def build_teams_meeting_url(name, starts_at, start_time, end_time):
     return f"https://teams.microsoft.com/l/meeting/new?{urlencode(params)}"
 
 
-class AppHandler(BaseHTTPRequestHandler):
-    def _send_json(self, data, status=200):
-        payload = json.dumps(data, default=str).encode("utf-8")
+def add_next_occurrences(meetings):
+    """Set nextOccurrence on listed meetings from the shared occurrence cache."""
+    today = datetime.now(EST_ZONE).date()
+    for meeting in meetings:
+        try:
+            series = series_from_meeting(meeting)
+        except RecurrenceError:
+            meeting["nextOccurrence"] = None
+            continue
+        meeting["nextOccurrence"] = OCCURRENCES.next_after(meeting["id"], series, today)
+    return meetings
+
+
+def _load_teams():
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT id, name FROM teams ORDER BY name")
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def _load_members():
+    query = """
+        SELECT m.id, m.full_name AS fullName, m.email, m.feed_token AS feedToken,
+               COALESCE(GROUP_CONCAT(t.name ORDER BY t.name SEPARATOR ', '), '') AS teams
+        FROM members m
+        LEFT JOIN team_members tm ON tm.member_id = m.id
+        LEFT JOIN teams t ON t.id = tm.team_id
+        GROUP BY m.id, m.full_name, m.email, m.feed_token
+        ORDER BY m.full_name
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query)
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+    members = []
+    for row in rows:
+        member = dict(row)
+        token = member.pop("feedToken")
+        member["feedUrl"] = feed_url(token) if token else None
+        members.append(member)
+    return members
+
+
+def iter_patient_details(batch_size=STREAM_CHUNK_ITEMS):
+    """All patient details, newest first, read ``batch_size`` rows at a time.
+
+    Keyset pages on (created_at, id) use idx_meeting_patient_details_created.
+    Each page checks a connection out only for its own query, so a client
+    reading the stream slowly does not hold one.
+    """
+    query = """
+        SELECT mpd.id,
+               mpd.meeting_id AS meetingId,
+               me.name AS meetingName,
+               mpd.medical_record_number AS medicalRecordNumber,
+               mpd.patient_name AS patientName,
+               mpd.patient_date_of_birth AS patientDateOfBirth,
+               mpd.patient_description AS patientDescription,
+               mpd.doctor_name AS doctorName,
+               mpd.department_name AS departmentName,
+               mpd.meeting_agenda_note AS meetingAgendaNote,
+               mpd.created_at AS createdAt
+        FROM meeting_patient_details mpd
+        LEFT JOIN meetings me ON mpd.meeting_id = me.id
+        {where}
+        ORDER BY mpd.created_at DESC, mpd.id DESC
+        LIMIT %s
+    """
+    after = None
+    while True:
+        if after is None:
+            sql, params = query.format(where=""), [batch_size]
+        else:
+            where = "WHERE mpd.created_at < %s OR (mpd.created_at = %s AND mpd.id < %s)"
+            sql, params = query.format(where=where), [after[0], after[0], after[1], batch_size]
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        if rows:
+            after = (rows[-1]["createdAt"], rows[-1]["id"])
+        for row in rows:
+            detail = dict(row)
+            del detail["createdAt"]
+            yield detail
+        if len(rows) < batch_size:
+            return
+
+
+def meeting_page_dependencies(filters):
+    """What decides which meetings a page lists.
+
+    Team membership too when filtered by team, and patients when searched
+    by patient name or MRN.
+    """
+    dependencies = ("meetings",)
+    if filters["teamId"]:
+        dependencies += ("members",)
+    if filters["patientName"] or filters["mrn"]:
+        dependencies += ("patient_details",)
+    return dependencies
+
+
+def load_meeting_page(filters):
+    """One page of /api/meetings through LIST_CACHE.
+
+    The page's meeting ids are cached until a meeting is created (or, with
+    a teamId filter, a member joins a team); each meeting is cached on its
+    own until it changes. An RSVP therefore only reloads that one meeting.
+    A database connection is only taken on a miss.
+
+    Returns:
+        Tuple (meetings: list of fresh dicts in API shape, has_more: bool)
+    """
+    conn = None
+
+    def connection():
+        nonlocal conn
+        if conn is None:
+            conn = get_db_connection()
+        return conn
+
+    try:
+        page_key = LIST_CACHE.key("meeting_page", tuple(filters.items()), meeting_page_dependencies(filters))
+        ids, has_more = LIST_CACHE.get_or_load(page_key, lambda: fetch_meeting_page_ids(connection(), filters))
+        keys = {meeting_id: LIST_CACHE.key("meeting", meeting_id, (f"meeting:{meeting_id}",)) for meeting_id in ids}
+        meetings = {meeting_id: LIST_CACHE.get(key) for meeting_id, key in keys.items()}
+        missing = [meeting_id for meeting_id, meeting in meetings.items() if meeting is None]
+        for meeting in fetch_meetings_by_id(connection(), missing) if missing else ():
+            LIST_CACHE.set(keys[meeting["id"]], meeting)
+            meetings[meeting["id"]] = meeting
+    finally:
+        if conn is not None:
+            conn.close()
+    # Cached dicts are shared between requests; callers get copies to add to.
+    return [dict(meetings[meeting_id]) for meeting_id in ids if meetings[meeting_id] is not None], has_more
+
+
+ROUTES = Router()
+ROUTE_TIMINGS = RouteTimings()
+ROUTES.add_hook(ROUTE_TIMINGS)
+# Milliseconds per startup step, filled in by __main__ and warm_up_indexes().
+STARTUP_TIMINGS = {}
+
+
+class AppHandler(KeepAliveRequestHandler):
+    keepalive_timeout = float(os.environ.get("KEEPALIVE_TIMEOUT", "5"))
+    keepalive_max_requests = int(os.environ.get("KEEPALIVE_MAX_REQUESTS", "100"))
+    request_timeout = float(os.environ.get("REQUEST_TIMEOUT", "30"))
+
+    def _send_json(self, data, status=200, headers=None):
+        if isinstance(data, list) and len(data) > JSON_STREAM_MIN_ITEMS and self.request_version == "HTTP/1.1":
+            self._send_stream(iter_json_array(data), "application/json", status, headers)
+            return
+        self._send_body(dumps_json(data), "application/json", status, headers)
+
+    def _send_json_items(self, items, status=200, headers=None):
+        """Send an iterable as a JSON array, streamed while it is still being read.
+
+        Up to JSON_STREAM_MIN_ITEMS items are read first; a shorter result
+        goes out as one body with Content-Length. Past that, HTTP/1.1
+        clients get the items encoded and sent as they are pulled.
+        """
+        items = iter(items)
+        head = list(islice(items, JSON_STREAM_MIN_ITEMS + 1))
+        if len(head) <= JSON_STREAM_MIN_ITEMS or self.request_version != "HTTP/1.1":
+            self._send_body(dumps_json(head + list(items)), "application/json", status, headers)
+            return
+        self._send_stream(iter_json_array(chain(head, items)), "application/json", status, headers)
+
+    def _send_body(self, payload, content_type, status=200, headers=None):
+        """Send a complete body, compressed if it is large enough and the client accepts it."""
+        encoding = COMPRESSION.choose(self.headers.get("Accept-Encoding"), len(payload))
+        if encoding != "identity":
+            payload = COMPRESSION.compress(payload, encoding)
         self.send_response(status)
-        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Type", content_type)
         self.send_header("Content-Length", str(len(payload)))
+        self._send_encoding_headers(encoding, headers)
         self.end_headers()
         self.wfile.write(payload)
 
-    def _send_html(self, html, status=200):
-        payload = html.encode("utf-8")
+    def _send_stream(self, chunks, content_type, status=200, headers=None):
+        """Send a body produced piece by piece with chunked encoding, compressed as it goes."""
+        encoding = COMPRESSION.negotiate(self.headers.get("Accept-Encoding"))
+        if encoding != "identity":
+            chunks = COMPRESSION.compress_stream(chunks, encoding)
         self.send_response(status)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self._send_encoding_headers(encoding, headers)
         self.end_headers()
-        self.wfile.write(payload)
+        for chunk in chunks:
+            # An empty chunk would end the body early.
+            if chunk:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_encoding_headers(self, encoding, headers):
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        for name, value in (headers or {}).items():
+            if name == "ETag":
+                value = encoded_etag(value, encoding)
+            self.send_header(name, value)
+
+    def _not_modified(self, etag):
+        """Answer 304 if If-None-Match has ``etag``; call before loading the response data.
+
+        The client holds the variant for its Accept-Encoding, or the
+        uncompressed one if the body was too small to compress.
+        """
+        if_none_match = self.headers.get("If-None-Match")
+        encoding = COMPRESSION.negotiate(self.headers.get("Accept-Encoding"))
+        for candidate in (encoded_etag(etag, encoding), etag):
+            if etag_matches(if_none_match, candidate):
+                self.send_response(304)
+                self.send_header("ETag", candidate)
+                self.send_header("Cache-Control", "private, no-cache")
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return True
+        return False
+
+    @staticmethod
+    def _etag_headers(etag):
+        return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    def _send_html(self, html, status=200):
+        self._send_body(html.encode("utf-8"), "text/html; charset=utf-8", status)
 
     def _read_json(self):
-        length = int(self.headers.get("Content-Length", "0"))
-        raw = self.rfile.read(length) if length else b"{}"
+        # Reads Content-Length and chunked bodies alike, so the next request
+        # on a kept-alive connection starts at the right byte.
+        raw = b"".join(iter_request_body(self.rfile, self.headers)) or b"{}"
         return json.loads(raw.decode("utf-8"))
     
+    def _parse_request_url(self):
+        self.parsed_url = urlparse(self.path)
+        self.query = parse_query(self.parsed_url.query)
+        return self.parsed_url
+
     def _get_query_param(self, param_name, default=""):
-        """Extract query parameter from URL."""
-        parsed = urlparse(self.path)
-        params = {}
-        if parsed.query:
-            for part in parsed.query.split("&"):
-                if "=" in part:
-                    key, value = part.split("=", 1)
-                    params[key] = value
-        return params.get(param_name, default)
+        """Extract a URL-decoded query parameter."""
+        return self.query.get(param_name, default)
+
+    def _page_url(self, cursor):
+        """Same URL with the cursor query parameter replaced."""
+        params = {name: value for name, value in self.query.items() if name != "cursor"}
+        params["cursor"] = cursor
+        return f"{self.parsed_url.path}?{urlencode(params)}"
 
     def _serve_static(self, path):
-        path = "/index.html" if path == "/" else path
-        file_path = (PUBLIC_DIR / path.lstrip("/")).resolve()
-        if not str(file_path).startswith(str(PUBLIC_DIR.resolve())) or not file_path.exists():
-            self.send_error(404, "File not found")
+        asset, cache_control = STATIC_ASSETS.lookup(path)
+        if asset is None:
+            self._send_json({"error": "File not found"}, 404)
             return
 
-        content_type = "text/html"
-        if file_path.suffix == ".css":
-            content_type = "text/css"
-        elif file_path.suffix == ".js":
-            content_type = "application/javascript"
-
-        content = file_path.read_bytes()
-        self.send_response(200)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(content)))
+        encoding = negotiate_encoding(self.headers.get("Accept-Encoding"), asset.variants)
+        body, etag = asset.variant(encoding)
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            not_modified = etag_matches(if_none_match, etag)
+        else:
+            try:
+                since = parsedate_to_datetime(self.headers.get("If-Modified-Since"))
+                not_modified = int(asset.mtime) <= since.timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", asset.last_modified)
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", asset.content_type)
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(content)
-
-    def do_GET(self):
-        parsed = urlparse(self.path)
-
-        # Handle meeting response links (accept/decline/tentative)
-        if parsed.path.startswith("/api/respond-to-meeting/"):
-            token_path = parsed.path.replace("/api/respond-to-meeting/", "").strip("/")
-            if token_path.endswith(".ics"):
-                token = token_path[:-4]
-
-                conn = get_db_connection()
-                try:
-                    cursor = conn.cursor(dictionary=True)
-                    cursor.execute(
-                        """
-                        SELECT me.id, me.name,
-                               ms.starts_at AS startsAt,
-                               ms.start_time AS startTime,
-                               ms.end_time AS endTime,
-                               ms.timezone,
-                               ms.schedule_type AS scheduleType,
-                               ms.recurrence_rule AS recurrenceRule,
-                               ms.recurrence_end_date AS recurrenceEndDate,
-                               ms.teams_join_url AS teamsJoinUrl,
-                               mir.invitee_email AS inviteeEmail
-                        FROM meeting_invitee_responses mir
-                        JOIN meetings me ON me.id = mir.meeting_id
-                        JOIN meeting_schedules ms ON ms.meeting_id = me.id
-                        WHERE mir.response_token = %s
-                        """,
-                        (token,),
-                    )
-                    meeting = cursor.fetchone()
-                finally:
-                    conn.close()
-
-                if not meeting:
-                    self._send_json({"error": "Invalid or expired response token."}, 404)
-                    return
-
-                ics_content = build_ics_content(meeting, meeting.get("teamsJoinUrl"), _get_smtp_settings().get("from"))
-                payload = ics_content.encode("utf-8")
-                self.send_response(200)
-                self.send_header("Content-Type", "text/calendar; charset=utf-8")
-                self.send_header("Content-Disposition", f"attachment; filename=meeting-{meeting['id']}-accepted.ics")
-                self.send_header("Content-Length", str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+        self.wfile.write(body)
+
+    @ROUTES.route("GET", "/api/attachments/{attachment_id:int}")
+    def _send_attachment(self, attachment_id):
+        """Stream one attachment, honouring If-None-Match and single byte ranges.
+
+        Content goes out with socket.sendfile(), so the kernel copies it
+        straight from the page cache. Rows not yet moved by
+        migrate_attachments.py are tagged by id and size, so revalidation
+        never reads file_data; otherwise only the requested bytes are copied
+        into a spool file in 1 MB SUBSTRING slices, and the database
+        connection is back in the pool before sending starts. Neither path
+        holds the whole file in memory.
+        """
+        conn = get_db_connection()
+        spooled = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                """
+                SELECT file_name, file_type, content_sha256, LENGTH(file_data) AS database_size
+                FROM meeting_attachments
+                WHERE id = %s
+                """,
+                (attachment_id,),
+            )
+            attachment = cursor.fetchone()
+            if not attachment:
+                self._send_json({"error": "Attachment not found."}, 404)
                 return
-
-            token = token_path
-            action = self._get_query_param("action", "").lower()
-            calendar_mode = self._get_query_param("calendar", "")
-            
-            if action not in ["accept", "decline", "tentative"]:
-                self._send_json({"error": "Invalid action. Must be accept, decline, or tentative."}, 400)
+            size = attachment["database_size"]
+            if size is not None:
+                etag = f'"legacy-{attachment_id}-{size}"'
+            else:
+                etag = f'"{attachment["content_sha256"]}"' if attachment["content_sha256"] else None
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
                 return
-            
-            # Map action to database ENUM values
-            status_map = {
-                "accept": "Accept",
-                "decline": "Decline",
-                "tentative": "Tentative"
-            }
-            db_status = status_map[action]
-            
-            conn = get_db_connection()
-            try:
-                cursor = conn.cursor(dictionary=True)
-                
-                # Find the invitee response record
-                cursor.execute(
-                    "SELECT id, meeting_id, invitee_email, status FROM meeting_invitee_responses WHERE response_token = %s",
-                    (token,)
-                )
-                response_record = cursor.fetchone()
-                
-                if not response_record:
-                    self._send_json({"error": "Invalid or expired response token."}, 404)
+            if size is not None:
+                try:
+                    byte_range = self._requested_range(size, etag)
+                except RangeNotSatisfiableError:
+                    self._send_range_not_satisfiable(size)
                     return
-                
-                # Update the response status
-                cursor.execute(
-                    "UPDATE meeting_invitee_responses SET status = %s, responded_at = %s WHERE response_token = %s",
-                    (db_status, datetime.now(), token)
+                start, end = byte_range or (0, size - 1)
+                settings = _get_attachment_settings()
+                spooled = spool_upload(
+                    _iter_file_data(cursor, attachment_id, start, end - start + 1),
+                    float("inf"),
+                    settings["spool_dir"] or get_attachment_store().spool_dir,
                 )
-                
-                # Get meeting details
-                cursor.execute(
-                    """
-                    SELECT me.id, me.name,
-                           ms.starts_at AS startsAt,
-                           ms.start_time AS startTime,
-                           ms.end_time AS endTime,
-                           ms.timezone,
-                           ms.schedule_type AS scheduleType,
-                           ms.recurrence_rule AS recurrenceRule,
-                           ms.recurrence_end_date AS recurrenceEndDate,
-                           ms.teams_join_url AS teamsJoinUrl
-                    FROM meetings me
-                    JOIN meeting_schedules ms ON ms.meeting_id = me.id
-                    WHERE me.id = %s
-                    """,
-                    (response_record['meeting_id'],)
-                )
-                meeting = cursor.fetchone()
-                
-                conn.commit()
+        finally:
+            conn.close()
 
-                calendar_note = None
-                if action == "accept" and meeting and response_record.get("status") != "Accept" and EMAIL_ENABLED:
-                    sent, message = send_calendar_invite_email(response_record['invitee_email'], meeting)
-                    calendar_note = message if sent else f"Accept recorded, but calendar invite failed: {message}"
-
-                if action == "accept" and calendar_mode in {"1", "true", "yes"} and meeting:
-                    calendar_links = build_calendar_links(meeting, meeting.get("teamsJoinUrl"))
-                    ics_url = f"/api/respond-to-meeting/{token}.ics"
-                    html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset=\"UTF-8\" />
-    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\" />
-    <title>Meeting Accepted</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; background: #f5f7fb; margin: 0; padding: 24px; }}
-        .card {{ max-width: 640px; margin: 0 auto; background: #fff; border-radius: 10px; padding: 24px; box-shadow: 0 2px 10px rgba(0,0,0,.08); }}
-        .btn {{ display: inline-block; margin: 8px 8px 0 0; padding: 10px 16px; border-radius: 6px; text-decoration: none; color: #fff; }}
-        .google {{ background: #1a73e8; }}
-        .outlook {{ background: #2563eb; }}
-        .ics {{ background: #059669; }}
-        .sub {{ color: #444; margin-top: 8px; }}
-    </style>
-</head>
-<body>
-    <div class=\"card\">
-        <h2>✅ Meeting accepted</h2>
-        <p class=\"sub\">Your RSVP is saved. Add this to your calendar now:</p>
-        <a class=\"btn google\" href=\"{calendar_links['google']}\" target=\"_blank\" rel=\"noopener noreferrer\">Add to Google Calendar</a>
-        <a class=\"btn outlook\" href=\"{calendar_links['outlook']}\" target=\"_blank\" rel=\"noopener noreferrer\">Add to Outlook Calendar</a>
-        <a class=\"btn ics\" href=\"{ics_url}\">Download .ics</a>
-        <p class=\"sub\">A calendar invite email has also been sent to {response_record['invitee_email']}.</p>
-    </div>
-</body>
-</html>
-"""
-                    self._send_html(html, 200)
-                    return
-                
-                response_data = {
-                    "success": True,
-                    "message": f"Your response ({action}) has been recorded successfully!",
-                    "meeting": meeting['name'] if meeting else "Unknown Meeting",
-                    "invitee_email": response_record['invitee_email'],
-                    "action": action
-                }
-                if calendar_note:
-                    response_data["calendar"] = calendar_note
-
-                self._send_json(response_data, 200)
-            except Exception as e:
-                self._send_json({"error": f"Error processing response: {str(e)}"}, 500)
+        if spooled is not None:
+            try:
+                with open(spooled.path, "rb") as source:
+                    self._send_attachment_content(attachment, source, etag, size, byte_range, offset=0)
             finally:
-                conn.close()
+                spooled.discard()
             return
 
-        if parsed.path == "/api/teams":
-            conn = get_db_connection()
+        try:
+            source = get_attachment_store().open(attachment["content_sha256"])
+        except (FileNotFoundError, ValueError, TypeError):
+            print(f"[ATTACHMENT] Content missing for attachment {attachment_id}")
+            self._send_json({"error": "Attachment content not found."}, 404)
+            return
+        with source:
+            size = os.fstat(source.fileno()).st_size
             try:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT id, name FROM teams ORDER BY name")
-                rows = cursor.fetchall()
-            finally:
-                conn.close()
-            self._send_json([dict(row) for row in rows])
+                byte_range = self._requested_range(size, etag)
+            except RangeNotSatisfiableError:
+                self._send_range_not_satisfiable(size)
+                return
+            offset = byte_range[0] if byte_range else 0
+            self._send_attachment_content(attachment, source, etag, size, byte_range, offset)
+
+    def _requested_range(self, size, etag):
+        """The (start, end) byte range the client asked for, or None for the whole file."""
+        if_range = self.headers.get("If-Range")
+        if if_range and if_range.strip() != etag:
+            return None
+        return parse_byte_range(self.headers.get("Range"), size)
+
+    def _send_range_not_satisfiable(self, size):
+        self.send_response(416)
+        self.send_header("Content-Range", f"bytes */{size}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_attachment_content(self, attachment, source, etag, size, byte_range, offset):
+        """Send ``byte_range`` (or all ``size`` bytes) of an attachment, read from ``source`` at ``offset``."""
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", attachment["file_type"] or "application/octet-stream")
+        self.send_header("Content-Disposition", content_disposition(attachment["file_name"]))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Cache-Control", "private, no-cache")
+        self.send_header("ETag", etag)
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+        if length > 0:
+            self.wfile.flush()
+            self.connection.sendfile(source, offset=offset, count=length)
+
+    @ROUTES.route("GET", "/api/respond-to-meeting/{token}.ics")
+    def _send_response_calendar(self, token):
+        try:
+            invitation = RSVP.lookup(get_db_connection, token)
+        except TokenError:
+            invitation = None
+        if not invitation:
+            self._send_json({"error": "Invalid or expired response token."}, 404)
             return
 
-        if parsed.path == "/api/members":
-            query = """
-                SELECT m.id, m.full_name AS fullName, m.email,
-                       COALESCE(GROUP_CONCAT(t.name ORDER BY t.name SEPARATOR ', '), '') AS teams
-                FROM members m
-                LEFT JOIN team_members tm ON tm.member_id = m.id
-                LEFT JOIN teams t ON t.id = tm.team_id
-                GROUP BY m.id, m.full_name, m.email
-                ORDER BY m.full_name
-            """
+        _, _, meeting = invitation
+        ics_content = build_ics_content(meeting, meeting.get("teamsJoinUrl"), _get_smtp_settings().get("from"))
+        payload = ics_content.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/calendar; charset=utf-8")
+        self.send_header("Content-Disposition", f"attachment; filename=meeting-{meeting['id']}-accepted.ics")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    @ROUTES.route("GET", "/api/feeds/{token}.ics")
+    def _send_member_feed(self, token):
+        """Serve a member's calendar subscription feed.
+
+        Rendered feeds are cached by token, so a client polling with the
+        current ETag or Last-Modified gets a 304 without a database query.
+        """
+        feed = FEEDS.get(token)
+        if feed is None:
             conn = get_db_connection()
             try:
                 cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                rows = cursor.fetchall()
+                cursor.execute(MEMBER_BY_FEED_TOKEN_QUERY, (token,))
+                member = cursor.fetchone()
+                meetings = fetch_feed_meetings(conn, member["email"]) if member else None
             finally:
                 conn.close()
-            self._send_json([dict(row) for row in rows])
+            if not member:
+                self._send_json({"error": "Feed not found."}, 404)
+                return
+            body = build_member_feed(member, meetings, _get_smtp_settings().get("from")).encode("utf-8")
+            feed = MemberFeed(member["email"], body, feed_last_modified(meetings))
+            FEEDS.set(token, feed)
+
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            not_modified = etag_matches(if_none_match, feed.etag)
+        else:
+            try:
+                since = parsedate_to_datetime(self.headers.get("If-Modified-Since"))
+                not_modified = feed.last_modified is not None and feed.last_modified.replace(microsecond=0) <= since
+            except (TypeError, ValueError):
+                not_modified = False
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", feed.etag)
+        if feed.last_modified_header:
+            self.send_header("Last-Modified", feed.last_modified_header)
+        self.send_header("Cache-Control", "private, no-cache")
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "text/calendar; charset=utf-8")
+        self.send_header("Content-Length", str(len(feed.body)))
+        self.end_headers()
+        self.wfile.write(feed.body)
+
+    @ROUTES.route("GET", "/api/respond-to-meeting/{token}")
+    def _record_meeting_response(self, token):
+        action = self._get_query_param("action", "").lower()
+        calendar_mode = self._get_query_param("calendar", "")
+
+        if action not in RESPONSE_ACTIONS:
+            self._send_json({"error": "Invalid action. Must be accept, decline, or tentative."}, 400)
             return
 
-        if parsed.path == "/api/meetings":
-            query = """
-                SELECT me.id, me.name,
-                       GROUP_CONCAT(DISTINCT CONCAT(mpd.id, '|', mpd.patient_name, '|', mpd.medical_record_number, '|',
-                                    mpd.patient_date_of_birth, '|', mpd.doctor_name, '|', mpd.department_name, '|',
-                                    COALESCE(mpd.meeting_agenda_note, ''), '|', COALESCE(mpd.patient_description, ''))
-                                    ORDER BY mpd.patient_name SEPARATOR '||') AS patientsData,
-                       COUNT(DISTINCT ma.id) AS attachmentCount,
-                       GROUP_CONCAT(DISTINCT ma.file_name ORDER BY ma.file_name SEPARATOR ', ') AS attachmentNames,
-                       GROUP_CONCAT(DISTINCT mi.emails SEPARATOR '; ') AS invitees,
-                       GROUP_CONCAT(DISTINCT CONCAT(mir.invitee_email, '|', mir.status) ORDER BY mir.invitee_email SEPARATOR '||') AS inviteeResponses,
-                       ms.starts_at AS startsAt,
-                       ms.start_time AS startTime,
-                       ms.end_time AS endTime,
-                       ms.timezone,
-                       ms.teams_join_url AS teamsJoinUrl,
-                       ms.schedule_type AS scheduleType,
-                       ms.recurrence_rule AS recurrenceRule,
-                       ms.recurrence_end_date AS recurrenceEndDate
-                FROM meetings me
-                JOIN meeting_schedules ms ON ms.meeting_id = me.id
-                LEFT JOIN meeting_patient_details mpd ON mpd.meeting_id = me.id
-                LEFT JOIN meeting_attachments ma ON ma.meeting_id = me.id
-                LEFT JOIN meeting_invites mi ON mi.meeting_id = me.id
-                LEFT JOIN meeting_invitee_responses mir ON mir.meeting_id = me.id
-                GROUP BY me.id, me.name, ms.starts_at, ms.start_time, ms.end_time, ms.timezone,
-                         ms.teams_join_url,
-                         ms.schedule_type, ms.recurrence_rule, ms.recurrence_end_date
-                ORDER BY ms.starts_at DESC, ms.start_time DESC
-            """
+        try:
+            invitation = RSVP.lookup(get_db_connection, token)
+        except TokenError:
+            invitation = None
+        if not invitation:
+            self._send_json({"error": "Invalid or expired response token."}, 404)
+            return
+        invitee_id, invitee_email, meeting = invitation
+
+        try:
             conn = get_db_connection()
             try:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                rows = cursor.fetchall()
-                # Parse patients data
-                processed_rows = []
-                for row in rows:
-                    processed_row = dict(row)
-                    patients = []
-                    if row['patientsData']:
-                        for patient_str in row['patientsData'].split('||'):
-                            parts = patient_str.split('|')
-                            if len(parts) >= 8:
-                                patients.append({
-                                    'patientDetailId': int(parts[0]),
-                                    'patientName': parts[1],
-                                    'medicalRecordNumber': parts[2],
-                                    'patientDateOfBirth': parts[3],
-                                    'doctorName': parts[4],
-                                    'departmentName': parts[5],
-                                    'meetingAgendaNote': parts[6] if parts[6] else None,
-                                    'patientDescription': parts[7] if parts[7] else None
-                                })
-                    processed_row['patients'] = patients
-                    del processed_row['patientsData']
-                    
-                    # Parse invitee responses
-                    invitee_responses = {}
-                    if row['inviteeResponses']:
-                        for response_str in row['inviteeResponses'].split('||'):
-                            if '|' in response_str:
-                                email, status = response_str.rsplit('|', 1)
-                                if email not in invitee_responses:
-                                    invitee_responses[email] = status
-                    processed_row['responses'] = invitee_responses
-                    if 'inviteeResponses' in processed_row:
-                        del processed_row['inviteeResponses']
-                    
-                    processed_rows.append(processed_row)
+                changed = RSVP.record(conn.cursor(), invitee_id, RESPONSE_ACTIONS[action], datetime.now())
+                if changed:
+                    conn.commit()
             finally:
                 conn.close()
-            self._send_json(processed_rows)
+            if changed:
+                BUSY.set_attendance(meeting["id"], invitee_email, RESPONSE_ACTIONS[action])
+                FEEDS.invalidate([invitee_email])
+                LIST_CACHE.invalidate(f"meeting:{meeting['id']}", "meeting_details")
+                CHANGES.publish(
+                    "rsvp.recorded",
+                    {"meetingId": meeting["id"], "email": invitee_email, "status": RESPONSE_ACTIONS[action]},
+                )
+        except Exception as e:
+            self._send_json({"error": f"Error processing response: {str(e)}"}, 500)
+            return
+
+        # Only the click that moved the invitee to Accept sends the
+        # calendar email; it is rendered and queued off the request path.
+        calendar_note = None
+        if action == "accept" and changed and EMAIL_ENABLED:
+            submit_background_task(queue_calendar_invite, invitee_email, meeting)
+            calendar_note = "Calendar invite will be emailed shortly"
+
+        if action == "accept" and calendar_mode in {"1", "true", "yes"}:
+            calendar_links = build_calendar_links(meeting, meeting.get("teamsJoinUrl"))
+            ics_url = f"/api/respond-to-meeting/{token}.ics"
+            html = get_template("meeting_accepted.html").render(
+                {
+                    "googleUrl": calendar_links["google"],
+                    "outlookUrl": calendar_links["outlook"],
+                    "icsUrl": ics_url,
+                    # Only promised when this click queued the email.
+                    "emailNote": f"A calendar invite email is being sent to {invitee_email}." if calendar_note else "",
+                }
+            )
+            self._send_html(html, 200)
             return
 
-        if parsed.path == "/api/patient-details":
-            query = """
-                SELECT mpd.id,
-                       mpd.meeting_id AS meetingId,
-                       me.name AS meetingName,
-                       mpd.medical_record_number AS medicalRecordNumber,
-                       mpd.patient_name AS patientName,
-                       mpd.patient_date_of_birth AS patientDateOfBirth,
-                       mpd.patient_description AS patientDescription,
-                       mpd.doctor_name AS doctorName,
-                       mpd.department_name AS departmentName,
-                       mpd.meeting_agenda_note AS meetingAgendaNote
-                FROM meeting_patient_details mpd
-                LEFT JOIN meetings me ON mpd.meeting_id = me.id
-                ORDER BY mpd.created_at DESC, mpd.id DESC
-            """
+        response_data = {
+            "success": True,
+            "message": f"Your response ({action}) has been recorded successfully!",
+            "meeting": meeting["name"],
+            "invitee_email": invitee_email,
+            "action": action
+        }
+        if calendar_note:
+            response_data["calendar"] = calendar_note
+
+        self._send_json(response_data, 200)
+
+    @ROUTES.route("GET", "/api/events")
+    def _stream_events(self):
+        """Stream change events to the browser as Server-Sent Events.
+
+        A stream occupies a worker thread, so at most EVENTS_MAX_STREAMS are
+        open at once. Each ends after EVENTS_STREAM_SECONDS, or sooner when
+        requests are queued for a worker. EventSource then reconnects with
+        Last-Event-ID and resumes from the bus's buffer.
+        """
+        try:
+            subscription = CHANGES.subscribe()
+        except TooManySubscribersError as error:
+            self._send_json({"error": str(error)}, 503, headers={"Retry-After": "5"})
+            return
+        with subscription:
+            position = CHANGES.position(self.headers.get("Last-Event-ID"))
+            # The stream is not length-framed; it ends by closing the connection.
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("X-Accel-Buffering", "no")
+            self.end_headers()
+            try:
+                self.wfile.write(f"retry: {EVENTS_RETRY_MS}\n\n".encode("ascii"))
+                if position is None:
+                    # Unknown or too old Last-Event-ID: the client reloads its lists.
+                    position = CHANGES.position()
+                    self.wfile.write(format_event((CHANGES.event_id(position), "reset", {})))
+                started = last_write = time.monotonic()
+                while True:
+                    events, position = CHANGES.wait(position, timeout=1.0)
+                    if events is None:
+                        events = [(CHANGES.event_id(position), "reset", {})]
+                    for event in events:
+                        self.wfile.write(format_event(event))
+                    now = time.monotonic()
+                    if events:
+                        last_write = now
+                    elif now - last_write >= EVENTS_HEARTBEAT_SECONDS:
+                        self.wfile.write(b": keep-alive\n\n")
+                        last_write = now
+                    if now - started >= EVENTS_STREAM_SECONDS or self._server_wants_connection_back():
+                        return
+            except (BrokenPipeError, ConnectionResetError, TimeoutError):
+                return
+
+    @ROUTES.route("GET", "/api/metrics")
+    def _get_metrics(self):
+        metrics = {
+            "db_pool": get_db_pool().stats(),
+            "rsvp_cache": RSVP.stats(),
+            "feed_cache": FEEDS.stats(),
+            "list_cache": LIST_CACHE.stats(),
+            "response_compression": COMPRESSION.stats(),
+            "events": CHANGES.stats(),
+            "occurrence_cache": OCCURRENCES.stats(),
+            "busy_index": BUSY.stats(),
+            "routes": ROUTE_TIMINGS.stats(),
+            "startup": STARTUP_TIMINGS,
+        }
+        dispatcher = get_email_dispatcher()
+        if dispatcher is not None:
+            metrics["email_outbox"] = dispatcher.stats()
+        if hasattr(self.server, "stats"):
+            metrics["server"] = self.server.stats()
+        self._send_json(metrics)
+
+    @ROUTES.route("GET", "/api/teams")
+    def _list_teams(self):
+        key = LIST_CACHE.key("teams", depends_on=("teams",))
+        etag = LIST_CACHE.etag(key)
+        if not self._not_modified(etag):
+            self._send_json(LIST_CACHE.get_or_load(key, _load_teams), headers=self._etag_headers(etag))
+
+    @ROUTES.route("GET", "/api/members")
+    def _list_members(self):
+        key = LIST_CACHE.key("members", depends_on=("members", "teams"))
+        etag = LIST_CACHE.etag(key)
+        if not self._not_modified(etag):
+            self._send_json(LIST_CACHE.get_or_load(key, _load_members), headers=self._etag_headers(etag))
+
+    @ROUTES.route("GET", "/api/meetings")
+    def _list_meetings(self):
+        try:
+            filters = parse_meeting_filters(self._get_query_param)
+        except ValueError as error:
+            self._send_json({"error": str(error)}, 400)
+            return
+        # nextOccurrence moves on with the date, without any write.
+        key = LIST_CACHE.key(
+            "meetings_response",
+            (tuple(filters.items()), datetime.now(EST_ZONE).date().isoformat()),
+            meeting_page_dependencies(filters) + ("meeting_details",),
+        )
+        etag = LIST_CACHE.etag(key)
+        if self._not_modified(etag):
+            return
+        meetings, has_more = load_meeting_page(filters)
+        add_next_occurrences(meetings)
+        headers = self._etag_headers(etag)
+        if has_more:
+            next_cursor = encode_cursor(meetings[-1])
+            headers["X-Next-Cursor"] = next_cursor
+            headers["Link"] = f'<{self._page_url(next_cursor)}>; rel="next"'
+        self._send_json(meetings, headers=headers)
+
+    @ROUTES.route("GET", "/api/meeting-options")
+    def _list_meeting_options(self):
+        search = self._get_query_param("q", "").strip()[:MAX_SEARCH_LENGTH]
+
+        def load():
             conn = get_db_connection()
             try:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                rows = cursor.fetchall()
+                return fetch_meeting_options(conn, search)
             finally:
                 conn.close()
-            self._send_json([dict(row) for row in rows])
+
+        self._send_json(LIST_CACHE.get_or_load(LIST_CACHE.key("meeting_options", search, ("meetings",)), load))
+
+    @ROUTES.route("GET", "/api/calendar")
+    def _get_calendar(self):
+        try:
+            filters = parse_calendar_filters(self._get_query_param, datetime.now(EST_ZONE).date())
+        except ValueError as error:
+            self._send_json({"error": str(error)}, 400)
+            return
+        ensure_occurrence_horizon(filters["end"])
+        conn = get_db_connection()
+        try:
+            occurrences = fetch_calendar(conn, filters)
+        finally:
+            conn.close()
+        self._send_json(occurrences)
+
+    @ROUTES.route("GET", "/api/free-busy")
+    def _get_free_busy(self):
+        try:
+            filters = parse_free_busy_filters(self._get_query_param, datetime.now(EST_ZONE).date())
+        except ValueError as error:
+            self._send_json({"error": str(error)}, 400)
             return
+        ensure_busy_index(filters["end"])
+        self._send_json(free_busy(BUSY, filters))
 
-        self._serve_static(parsed.path)
+    @ROUTES.route("GET", "/api/patient-details")
+    def _list_patient_details(self):
+        etag = LIST_CACHE.etag(LIST_CACHE.key("patient_details", depends_on=("patient_details",)))
+        if self._not_modified(etag):
+            return
+        self._send_json_items(iter_patient_details(), headers=self._etag_headers(etag))
 
-    def do_POST(self):
-        parsed = urlparse(self.path)
+    def do_GET(self):
+        parsed = self._parse_request_url()
+        if self.headers.get("Content-Length", "0") != "0" or self.headers.get("Transfer-Encoding"):
+            # GET bodies are never read; don't parse them as the next request.
+            self.close_connection = True
+        if not ROUTES.dispatch(self, "GET", parsed.path):
+            self._serve_static(parsed.path)
+
+    @ROUTES.route("POST", "/api/patient-details/{patient_detail_id:int}/attachments")
+    def _handle_attachment_upload(self, patient_detail_id):
+        """Store the raw request body as an attachment of one patient detail.
+
+        The body is streamed to a spool file in chunks while it is hashed and
+        size-checked, so neither the whole file nor a base64 copy of it is
+        held in memory while reading. The DB connection is only checked out
+        before and after the upload, never while waiting on the client.
+        """
+        file_name = self._get_query_param("fileName").strip()
+        if not file_name:
+            self.close_connection = True
+            self._send_json({"error": "fileName query parameter is required."}, 400)
+            return
+        file_type = (self.headers.get("Content-Type") or "").strip() or None
+        settings = _get_attachment_settings()
+
+        chunked = "chunked" in (self.headers.get("Transfer-Encoding") or "").lower()
         try:
-            data = self._read_json()
+            declared_length = int(self.headers.get("Content-Length") or -1)
+        except ValueError:
+            declared_length = -1
+        if not chunked and declared_length < 0:
+            self.close_connection = True
+            self._send_json({"error": "Content-Length or chunked transfer encoding is required."}, 411)
+            return
+        if declared_length > settings["max_bytes"]:
+            self.close_connection = True
+            self._send_json({"error": f"Attachment exceeds the {settings['max_bytes']} byte limit."}, 413)
+            return
 
-            if parsed.path == "/api/teams":
-                name = (data.get("name") or "").strip()
-                if not name:
-                    self._send_json({"error": "Team name is required."}, 400)
-                    return
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                """
+                SELECT meeting_id, medical_record_number, doctor_name, department_name
+                FROM meeting_patient_details
+                WHERE id = %s
+                """,
+                (patient_detail_id,),
+            )
+            patient = cursor.fetchone()
+        finally:
+            conn.close()
+        if not patient:
+            self.close_connection = True
+            self._send_json({"error": "Patient detail not found."}, 404)
+            return
 
-                conn = get_db_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute("INSERT INTO teams (name) VALUES (%s)", (name,))
-                    conn.commit()
-                    team_id = cursor.lastrowid
-                finally:
-                    conn.close()
+        store = get_attachment_store()
+        try:
+            upload = spool_upload(
+                iter_request_body(self.rfile, self.headers),
+                settings["max_bytes"],
+                settings["spool_dir"] or store.spool_dir,
+            )
+        except UploadTooLargeError as error:
+            self.close_connection = True
+            self._send_json({"error": str(error)}, 413)
+            return
+        except IncompleteUploadError as error:
+            self.close_connection = True
+            self._send_json({"error": str(error)}, 400)
+            return
 
-                self._send_json({"id": team_id, "name": name}, 201)
-                return
+        with upload:
+            conn = get_db_connection()
+            try:
+                cursor = conn.cursor()
+                attachment_id = insert_attachment(
+                    cursor, patient, file_name, file_type, upload.size, upload.sha256
+                )
+                store.put_file(upload.path, upload.sha256)
+                conn.commit()
+            finally:
+                conn.close()
 
-            if parsed.path == "/api/members":
-                full_name = (data.get("fullName") or "").strip()
-                email = (data.get("email") or "").strip().lower()
-                team_ids = data.get("teamIds") or []
-                if not full_name or not email:
-                    self._send_json({"error": "Member full name and email are required."}, 400)
-                    return
+        LIST_CACHE.invalidate(f"meeting:{patient['meeting_id']}", "meeting_details")
+        CHANGES.publish(
+            "attachment.created",
+            {
+                "id": attachment_id,
+                "meetingId": patient["meeting_id"],
+                "fileName": file_name,
+                "fileType": file_type,
+                "fileSize": upload.size,
+            },
+        )
+        self._send_json(
+            {
+                "id": attachment_id,
+                "patientDetailId": patient_detail_id,
+                "fileName": file_name,
+                "fileSize": upload.size,
+                "sha256": upload.sha256,
+            },
+            201,
+        )
 
-                conn = get_db_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "INSERT INTO members (full_name, email) VALUES (%s, %s)",
-                        (full_name, email),
-                    )
-                    member_id = cursor.lastrowid
-                    for team_id in team_ids:
-                        cursor.execute(
-                            "INSERT INTO team_members (team_id, member_id) VALUES (%s, %s)",
-                            (int(team_id), member_id),
-                        )
-                    conn.commit()
-                finally:
-                    conn.close()
+    @ROUTES.route("POST", "/api/teams")
+    def _create_team(self):
+        data = self._read_json()
+        name = (data.get("name") or "").strip()
+        if not name:
+            self._send_json({"error": "Team name is required."}, 400)
+            return
+
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO teams (name) VALUES (%s)", (name,))
+            conn.commit()
+            team_id = cursor.lastrowid
+        finally:
+            conn.close()
+
+        LIST_CACHE.invalidate("teams")
+        CHANGES.publish("team.created", {"id": team_id, "name": name})
+        self._send_json({"id": team_id, "name": name}, 201)
+
+    @ROUTES.route("POST", "/api/members")
+    def _create_member(self):
+        data = self._read_json()
+        full_name = (data.get("fullName") or "").strip()
+        email = (data.get("email") or "").strip().lower()
+        team_ids = data.get("teamIds") or []
+        if not full_name or not email:
+            self._send_json({"error": "Member full name and email are required."}, 400)
+            return
 
-                self._send_json({"id": member_id, "fullName": full_name, "email": email}, 201)
+        feed_token = new_feed_token()
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO members (full_name, email, feed_token) VALUES (%s, %s, %s)",
+                (full_name, email, feed_token),
+            )
+            member_id = cursor.lastrowid
+            for team_id in team_ids:
+                cursor.execute(
+                    "INSERT INTO team_members (team_id, member_id) VALUES (%s, %s)",
+                    (int(team_id), member_id),
+                )
+            team_names = []
+            if team_ids:
+                cursor.execute(
+                    f"SELECT name FROM teams WHERE id IN ({', '.join(['%s'] * len(team_ids))}) ORDER BY name",
+                    [int(team_id) for team_id in team_ids],
+                )
+                team_names = [row[0] for row in cursor.fetchall()]
+            conn.commit()
+        finally:
+            conn.close()
+
+        # Team membership also decides which meetings a teamId filter lists.
+        LIST_CACHE.invalidate("members")
+        member = {"id": member_id, "fullName": full_name, "email": email, "feedUrl": feed_url(feed_token)}
+        CHANGES.publish("member.created", {**member, "teams": ", ".join(team_names)})
+        self._send_json(member, 201)
+
+    @ROUTES.route("POST", "/api/meetings")
+    def _create_meeting(self):
+        data = self._read_json()
+        name = (data.get("name") or "").strip()
+        starts_at = data.get("startsAt")
+        start_time = data.get("startTime")
+        end_time = data.get("endTime")
+        timezone = EST_TIMEZONE_LABEL
+        schedule_type = data.get("scheduleType")
+        recurrence_rule = (data.get("recurrenceRule") or "").strip() or None
+        recurrence_end = data.get("recurrenceEndDate") or None
+        recurrence_exceptions = data.get("recurrenceExceptions") or None
+        invitee_email = (data.get("inviteeEmail") or "").strip() or None
+
+        invitee_emails = None
+        if invitee_email:
+            raw_emails = [email.strip().lower() for email in invitee_email.split(",") if email.strip()]
+            unique_emails = []
+            seen = set()
+            for email in raw_emails:
+                if email not in seen:
+                    seen.add(email)
+                    unique_emails.append(email)
+            invalid_emails = [email for email in unique_emails if not EMAIL_RE.match(email)]
+            if invalid_emails:
+                self._send_json({"error": f"Invalid invitee email(s): {', '.join(invalid_emails)}"}, 400)
+                return
+            invitee_emails = ", ".join(unique_emails) if unique_emails else None
+
+        if not name or not starts_at or not schedule_type or not start_time or not end_time:
+            self._send_json(
+                {
+                    "error": "Meeting name, start date/time, start time, end time and schedule type are required."
+                },
+                400,
+            )
+            return
+        if schedule_type not in ["one-time", "recurring"]:
+            self._send_json({"error": "Schedule type must be one-time or recurring."}, 400)
+            return
+        if schedule_type == "recurring" and not recurrence_rule:
+            self._send_json({"error": "Recurrence rule is required for recurring meetings."}, 400)
+            return
+        if schedule_type == "recurring":
+            try:
+                RecurrenceRule.parse(recurrence_rule)
+                recurrence_exceptions = format_exdates(parse_exdates(recurrence_exceptions))
+            except RecurrenceError as error:
+                self._send_json({"error": f"Invalid recurrence: {error}"}, 400)
                 return
 
-            if parsed.path == "/api/meetings":
-                name = (data.get("name") or "").strip()
-                starts_at = data.get("startsAt")
-                start_time = data.get("startTime")
-                end_time = data.get("endTime")
-                timezone = EST_TIMEZONE_LABEL
-                schedule_type = data.get("scheduleType")
-                recurrence_rule = (data.get("recurrenceRule") or "").strip() or None
-                recurrence_end = data.get("recurrenceEndDate") or None
-                invitee_email = (data.get("inviteeEmail") or "").strip() or None
-
-                invitee_emails = None
-                if invitee_email:
-                    raw_emails = [email.strip().lower() for email in invitee_email.split(",") if email.strip()]
-                    unique_emails = []
-                    seen = set()
-                    for email in raw_emails:
-                        if email not in seen:
-                            seen.add(email)
-                            unique_emails.append(email)
-                    invalid_emails = [email for email in unique_emails if not EMAIL_RE.match(email)]
-                    if invalid_emails:
-                        self._send_json({"error": f"Invalid invitee email(s): {', '.join(invalid_emails)}"}, 400)
-                        return
-                    invitee_emails = ", ".join(unique_emails) if unique_emails else None
-
-                if not name or not starts_at or not schedule_type or not start_time or not end_time:
-                    self._send_json(
-                        {
-                            "error": "Meeting name, start date/time, start time, end time and schedule type are required."
-                        },
-                        400,
-                    )
-                    return
-                if schedule_type not in ["one-time", "recurring"]:
-                    self._send_json({"error": "Schedule type must be one-time or recurring."}, 400)
-                    return
-                if schedule_type == "recurring" and not recurrence_rule:
-                    self._send_json({"error": "Recurrence rule is required for recurring meetings."}, 400)
-                    return
+        if EMAIL_ENABLED and invitee_email:
+            settings = _get_smtp_settings()
+            missing = _validate_smtp_settings(settings)
+            if missing:
+                self._send_json({"error": f"Email enabled but missing SMTP settings: {', '.join(missing)}"}, 500)
+                return
 
-                if EMAIL_ENABLED and invitee_email:
-                    settings = _get_smtp_settings()
-                    missing = _validate_smtp_settings(settings)
-                    if missing:
-                        self._send_json({"error": f"Email enabled but missing SMTP settings: {', '.join(missing)}"}, 500)
-                        return
+        datetime.fromisoformat(starts_at)
+        parsed_start_time = datetime.strptime(start_time, "%H:%M")
+        parsed_end_time = datetime.strptime(end_time, "%H:%M")
+        if parsed_end_time <= parsed_start_time:
+            self._send_json({"error": "Meeting end time must be after start time."}, 400)
+            return
+        teams_join_url = build_teams_meeting_url(name, starts_at, start_time, end_time)
+
+        schedule = {
+            "id": None,
+            "startsAt": starts_at,
+            "startTime": start_time,
+            "endTime": end_time,
+            "scheduleType": schedule_type,
+            "recurrenceRule": recurrence_rule,
+            "recurrenceEndDate": recurrence_end,
+            "recurrenceExceptions": recurrence_exceptions,
+        }
+        attendees = split_emails(invitee_emails)
+        occurrences = []
+        if attendees:
+            ensure_busy_index()
+            occurrences = [(start, end) for _, start, end in occurrence_rows(schedule, starts_at, BUSY.until)]
+            conflicts = [] if data.get("allowConflicts") else BUSY.conflicts(attendees, occurrences)
+            if conflicts:
+                self._send_json(
+                    {
+                        "error": f"{len({c['email'] for c in conflicts})} invitee(s) are already booked at this time.",
+                        "conflicts": self._describe_conflicts(conflicts[:MAX_REPORTED_CONFLICTS]),
+                        "conflictCount": len(conflicts),
+                    },
+                    409,
+                )
+                return
 
-                datetime.fromisoformat(starts_at)
-                parsed_start_time = datetime.strptime(start_time, "%H:%M")
-                parsed_end_time = datetime.strptime(end_time, "%H:%M")
-                if parsed_end_time <= parsed_start_time:
-                    self._send_json({"error": "Meeting end time must be after start time."}, 400)
-                    return
-                teams_join_url = build_teams_meeting_url(name, starts_at, start_time, end_time)
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO meetings (name) VALUES (%s)", (name,))
+            meeting_id = cursor.lastrowid
+            cursor.execute(
+                """
+                INSERT INTO meeting_schedules
+                (meeting_id, starts_at, start_time, end_time, timezone, teams_join_url, schedule_type,
+                 recurrence_rule, recurrence_end_date, recurrence_exdates)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                (
+                    meeting_id,
+                    starts_at,
+                    start_time,
+                    end_time,
+                    timezone,
+                    teams_join_url,
+                    schedule_type,
+                    recurrence_rule if schedule_type == "recurring" else None,
+                    recurrence_end if schedule_type == "recurring" else None,
+                    recurrence_exceptions if schedule_type == "recurring" else None,
+                ),
+            )
+            materialize_meeting(cursor, {**schedule, "id": meeting_id}, occurrence_horizon_end())
 
-                conn = get_db_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute("INSERT INTO meetings (name) VALUES (%s)", (name,))
-                    meeting_id = cursor.lastrowid
+            if invitee_emails:
+                cursor.execute(
+                    "INSERT INTO meeting_invites (meeting_id, emails) VALUES (%s, %s)",
+                    (meeting_id, invitee_emails),
+                )
+
+            # Send invite emails if enabled
+            email_error = None
+            email_success = False
+            if EMAIL_ENABLED and invitee_emails:
+                # Parse email list (handle both ", " and "," separators)
+                email_list = [e.strip() for e in invitee_emails.replace(", ", ",").split(",") if e.strip()]
+                print(f"[EMAIL DEBUG] Sending invites to: {email_list}")
+
+                # Generate tokens and store invitee responses
+                invitees_with_tokens = {}
+                for invitee_email in email_list:
+                    token = secrets.token_urlsafe(32)
                     cursor.execute(
-                        """
-                        INSERT INTO meeting_schedules
-                        (meeting_id, starts_at, start_time, end_time, timezone, teams_join_url, schedule_type, recurrence_rule, recurrence_end_date)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            meeting_id,
-                            starts_at,
-                            start_time,
-                            end_time,
-                            timezone,
-                            teams_join_url,
-                            schedule_type,
-                            recurrence_rule if schedule_type == "recurring" else None,
-                            recurrence_end if schedule_type == "recurring" else None,
-                        ),
+                        "INSERT INTO meeting_invitee_responses (meeting_id, invitee_email, response_token) VALUES (%s, %s, %s)",
+                        (meeting_id, invitee_email, token),
                     )
-
-                    if invitee_emails:
-                        cursor.execute(
-                            "INSERT INTO meeting_invites (meeting_id, emails) VALUES (%s, %s)",
-                            (meeting_id, invitee_emails),
-                        )
-
-                    # Send invite emails if enabled
-                    email_error = None
-                    email_success = False
-                    if EMAIL_ENABLED and invitee_emails:
-                        # Parse email list (handle both ", " and "," separators)
-                        email_list = [e.strip() for e in invitee_emails.replace(", ", ",").split(",") if e.strip()]
-                        print(f"[EMAIL DEBUG] Sending invites to: {email_list}")
-                        
-                        # Generate tokens and store invitee responses
-                        invitees_with_tokens = {}
-                        for invitee_email in email_list:
-                            token = secrets.token_urlsafe(32)
-                            invitees_with_tokens[invitee_email] = token
-                            cursor.execute(
-                                "INSERT INTO meeting_invitee_responses (meeting_id, invitee_email, response_token) VALUES (%s, %s, %s)",
-                                (meeting_id, invitee_email, token),
-                            )
-                        
-                        # Send emails with action links
-                        success, msg = send_invite_emails(
-                            invitees_with_tokens,
-                            {
-                                "id": meeting_id,
-                                "name": name,
-                                "startsAt": starts_at,
-                                "startTime": start_time,
-                                "endTime": end_time,
-                                "timezone": timezone,
-                                "teamsJoinUrl": teams_join_url,
-                                "scheduleType": schedule_type,
-                                "recurrenceRule": recurrence_rule,
-                                "recurrenceEndDate": recurrence_end,
-                            },
-                        )
-                        if success:
-                            print(f"[EMAIL SUCCESS] Emails sent successfully: {msg}")
-                            email_success = True
-                        else:
-                            print(f"[EMAIL ERROR] {msg}")
-                            email_error = msg
-                    elif not EMAIL_ENABLED:
-                        print("[EMAIL DEBUG] EMAIL_ENABLED is False, skipping email")
-                    else:
-                        print("[EMAIL DEBUG] No invitee emails provided")
-
-                    conn.commit()
-                    
-                    # Warn if email failed but meeting was created
-                    response = {
+                    # With signing keys configured the emailed link carries a signed
+                    # token and the stored random token is never sent out.
+                    if RSVP.signer is not None:
+                        token = RSVP.signer.issue(meeting_id, cursor.lastrowid)
+                    invitees_with_tokens[invitee_email] = token
+
+                # Queue emails with action links; they go out after commit
+                success, msg = send_invite_emails(
+                    cursor,
+                    invitees_with_tokens,
+                    {
                         "id": meeting_id,
                         "name": name,
+                        "startsAt": starts_at,
+                        "startTime": start_time,
+                        "endTime": end_time,
                         "timezone": timezone,
                         "teamsJoinUrl": teams_join_url,
-                    }
-                    if email_success:
-                        response["email_status"] = "Invitation emails sent successfully"
-                    elif email_error:
-                        response["warning"] = f"Meeting created but email sending failed: {email_error}"
-                    elif EMAIL_ENABLED and not invitee_emails:
-                        response["note"] = "No invitee emails provided, no invitations sent"
-                    elif not EMAIL_ENABLED:
-                        response["note"] = "EMAIL_ENABLED is false, invitations were not sent"
-                    
-                    self._send_json(response, 201)
-                finally:
-                    conn.close()
-                return
+                        "scheduleType": schedule_type,
+                        "recurrenceRule": recurrence_rule,
+                        "recurrenceEndDate": recurrence_end,
+                        "recurrenceExceptions": recurrence_exceptions,
+                    },
+                )
+                if success:
+                    print(f"[EMAIL SUCCESS] {msg}")
+                    email_success = True
+                else:
+                    print(f"[EMAIL ERROR] {msg}")
+                    email_error = msg
+            elif not EMAIL_ENABLED:
+                print("[EMAIL DEBUG] EMAIL_ENABLED is False, skipping email")
+            else:
+                print("[EMAIL DEBUG] No invitee emails provided")
 
-            if parsed.path == "/api/patient-details":
-                meeting_id = data.get("meetingId")
-                medical_record_number = (data.get("medicalRecordNumber") or "").strip()
-                patient_name = (data.get("patientName") or "").strip()
-                patient_date_of_birth = data.get("patientDateOfBirth")
-                patient_description = (data.get("patientDescription") or "").strip() or None
-                doctor_name = (data.get("doctorName") or "").strip()
-                department_name = (data.get("departmentName") or "").strip()
-                meeting_agenda_note = (data.get("meetingAgendaNote") or "").strip() or None
-                attachments = data.get("attachments") or []
-
-                # Convert meeting_id to int
-                try:
-                    meeting_id = int(meeting_id) if meeting_id else None
-                except (ValueError, TypeError):
-                    meeting_id = None
+            conn.commit()
+            LIST_CACHE.invalidate("meetings")
+            if attendees:
+                BUSY.add_meeting(meeting_id, occurrences, attendees)
+                FEEDS.invalidate(attendees)
+            for meeting in add_next_occurrences(fetch_meetings_by_id(conn, [meeting_id])):
+                CHANGES.publish("meeting.created", meeting)
+            if email_success:
+                wake_email_dispatcher()
+
+            # Warn if email failed but meeting was created
+            response = {
+                "id": meeting_id,
+                "name": name,
+                "timezone": timezone,
+                "teamsJoinUrl": teams_join_url,
+            }
+            if email_success:
+                response["email_status"] = "Invitation emails queued for delivery"
+            elif email_error:
+                response["warning"] = f"Meeting created but email sending failed: {email_error}"
+            elif EMAIL_ENABLED and not invitee_emails:
+                response["note"] = "No invitee emails provided, no invitations sent"
+            elif not EMAIL_ENABLED:
+                response["note"] = "EMAIL_ENABLED is false, invitations were not sent"
+
+            self._send_json(response, 201)
+        finally:
+            conn.close()
+
+    def _describe_conflicts(self, conflicts):
+        """Conflicts in API shape, with the names of the meetings they clash with."""
+        meeting_ids = sorted({conflict["meetingId"] for conflict in conflicts})
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT id, name FROM meetings WHERE id IN ({', '.join(['%s'] * len(meeting_ids))})",
+                meeting_ids,
+            )
+            names = dict(cursor.fetchall())
+        finally:
+            conn.close()
+        return [
+            {
+                "email": conflict["email"],
+                "meetingId": conflict["meetingId"],
+                "meetingName": names.get(conflict["meetingId"]),
+                "start": conflict["start"].isoformat(),
+                "end": conflict["end"].isoformat(),
+            }
+            for conflict in conflicts
+        ]
+
+    @ROUTES.route("POST", "/api/patient-details")
+    def _create_patient_detail(self):
+        data = self._read_json()
+        meeting_id = data.get("meetingId")
+        medical_record_number = (data.get("medicalRecordNumber") or "").strip()
+        patient_name = (data.get("patientName") or "").strip()
+        patient_date_of_birth = data.get("patientDateOfBirth")
+        patient_description = (data.get("patientDescription") or "").strip() or None
+        doctor_name = (data.get("doctorName") or "").strip()
+        department_name = (data.get("departmentName") or "").strip()
+        meeting_agenda_note = (data.get("meetingAgendaNote") or "").strip() or None
+        attachments = data.get("attachments") or []
+
+        # Convert meeting_id to int
+        try:
+            meeting_id = int(meeting_id) if meeting_id else None
+        except (ValueError, TypeError):
+            meeting_id = None
 
-                # Meeting ID is required
-                if not meeting_id:
-                    self._send_json({"error": "Meeting ID is required."}, 400)
-                    return
+        # Meeting ID is required
+        if not meeting_id:
+            self._send_json({"error": "Meeting ID is required."}, 400)
+            return
 
-                if (
-                    not medical_record_number
-                    or not patient_name
-                    or not patient_date_of_birth
-                    or not doctor_name
-                    or not department_name
-                ):
-                    self._send_json(
-                        {
-                            "error": "Medical record number, patient name/date of birth, doctor name and department are required."
-                        },
-                        400,
-                    )
-                    return
+        if (
+            not medical_record_number
+            or not patient_name
+            or not patient_date_of_birth
+            or not doctor_name
+            or not department_name
+        ):
+            self._send_json(
+                {
+                    "error": "Medical record number, patient name/date of birth, doctor name and department are required."
+                },
+                400,
+            )
+            return
 
-                datetime.fromisoformat(patient_date_of_birth)
+        datetime.fromisoformat(patient_date_of_birth)
 
-                conn = get_db_connection()
-                try:
-                    cursor = conn.cursor(dictionary=True)
-                    
-                    # Validate meeting exists
-                    cursor.execute("SELECT id FROM meetings WHERE id = %s", (meeting_id,))
-                    meeting = cursor.fetchone()
-                    if not meeting:
-                        self._send_json({"error": "Meeting ID not found."}, 400)
-                        return
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
 
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        """
-                        INSERT INTO meeting_patient_details
-                        (meeting_id, medical_record_number, patient_name, patient_date_of_birth, patient_description, doctor_name, department_name, meeting_agenda_note)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            meeting_id,
-                            medical_record_number,
-                            patient_name,
-                            patient_date_of_birth,
-                            patient_description,
-                            doctor_name,
-                            department_name,
-                            meeting_agenda_note,
-                        ),
-                    )
-                    patient_detail_id = cursor.lastrowid
-
-                    for attachment in attachments:
-                        file_name = (attachment.get("fileName") or "").strip()
-                        file_type = (attachment.get("fileType") or "").strip() or None
-                        file_data = attachment.get("fileData")
-                        if not file_name or not file_data:
-                            continue
-                        blob_data = base64.b64decode(file_data, validate=True)
-                        cursor.execute(
-                            """
-                            INSERT INTO meeting_attachments 
-                            (meeting_id, medical_record_number, doctor_name, department_name, file_name, file_type, file_size, file_data)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                            """,
-                            (
-                                meeting_id,
-                                medical_record_number,
-                                doctor_name,
-                                department_name,
-                                file_name,
-                                file_type,
-                                len(blob_data),
-                                blob_data,
-                            ),
-                        )
+            # Validate meeting exists
+            cursor.execute("SELECT id, name FROM meetings WHERE id = %s", (meeting_id,))
+            meeting = cursor.fetchone()
+            if not meeting:
+                self._send_json({"error": "Meeting ID not found."}, 400)
+                return
 
-                    conn.commit()
-                finally:
-                    conn.close()
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO meeting_patient_details
+                (meeting_id, medical_record_number, patient_name, patient_date_of_birth, patient_description, doctor_name, department_name, meeting_agenda_note)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                (
+                    meeting_id,
+                    medical_record_number,
+                    patient_name,
+                    patient_date_of_birth,
+                    patient_description,
+                    doctor_name,
+                    department_name,
+                    meeting_agenda_note,
+                ),
+            )
+            patient_detail_id = cursor.lastrowid
 
-                self._send_json(
+            patient = {
+                "meeting_id": meeting_id,
+                "medical_record_number": medical_record_number,
+                "doctor_name": doctor_name,
+                "department_name": department_name,
+            }
+            created_attachments = []
+            for attachment in attachments:
+                file_name = (attachment.get("fileName") or "").strip()
+                file_type = (attachment.get("fileType") or "").strip() or None
+                file_data = attachment.get("fileData")
+                if not file_name or not file_data:
+                    continue
+                blob_data = base64.b64decode(file_data, validate=True)
+                sha256 = hashlib.sha256(blob_data).hexdigest()
+                attachment_id = insert_attachment(cursor, patient, file_name, file_type, len(blob_data), sha256)
+                get_attachment_store().put_bytes(blob_data)
+                created_attachments.append(
                     {
-                        "id": patient_detail_id,
+                        "id": attachment_id,
                         "meetingId": meeting_id,
-                        "patientName": patient_name,
-                    },
-                    201,
+                        "fileName": file_name,
+                        "fileType": file_type,
+                        "fileSize": len(blob_data),
+                    }
                 )
-                return
 
+            conn.commit()
+        finally:
+            conn.close()
+
+        LIST_CACHE.invalidate(f"meeting:{meeting_id}", "meeting_details", "patient_details")
+        CHANGES.publish(
+            "patient.created",
+            {
+                "id": patient_detail_id,
+                "meetingId": meeting_id,
+                "meetingName": meeting["name"],
+                "medicalRecordNumber": medical_record_number,
+                "patientName": patient_name,
+                "patientDateOfBirth": patient_date_of_birth,
+                "patientDescription": patient_description,
+                "doctorName": doctor_name,
+                "departmentName": department_name,
+                "meetingAgendaNote": meeting_agenda_note,
+            },
+        )
+        for attachment in created_attachments:
+            CHANGES.publish("attachment.created", attachment)
+
+        self._send_json(
+            {
+                "id": patient_detail_id,
+                "meetingId": meeting_id,
+                "patientName": patient_name,
+            },
+            201,
+        )
+
+    def do_POST(self):
+        parsed = self._parse_request_url()
+        try:
+            if ROUTES.dispatch(self, "POST", parsed.path):
+                return
+            # The body of an unrouted request is never read.
+            self.close_connection = True
+            allowed = ROUTES.allowed_methods(parsed.path)
+            if allowed:
+                self._send_json({"error": "Method not allowed"}, 405, headers={"Allow": ", ".join(allowed)})
+                return
             self._send_json({"error": "Not found"}, 404)
         except mysql.connector.IntegrityError as error:
             self._send_json({"error": str(error)}, 400)
@@ -1215,10 +2053,64 @@ class AppHandler(BaseHTTPRequestHandler):
             self._send_json({"error": str(error)}, 500)
 
 
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Meeting Planner Pro web server")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "3000")))
+    parser.add_argument(
+        "--mode",
+        choices=SERVER_MODES,
+        default=os.environ.get("SERVER_MODE", "threaded"),
+        help="single: one request at a time; threaded: bounded worker-thread pool; "
+        "asyncio: event loop holds connections, handlers run on --threads executor threads",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WORKERS", "1")),
+        help="number of pre-forked processes sharing the listening socket",
+    )
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("SERVER_THREADS", "16")))
+    parser.add_argument("--queue-size", type=int, default=int(os.environ.get("SERVER_QUEUE_SIZE", "64")))
+    parser.add_argument("--drain-timeout", type=float, default=float(os.environ.get("SERVER_DRAIN_TIMEOUT", "30")))
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="apply pending schema migrations before starting (otherwise run migrate_schema.py)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    initialize_db()
-    ensure_schema_updates()
-    port = int(os.environ.get("PORT", "3000"))
-    server = HTTPServer(("0.0.0.0", port), AppHandler)
-    print(f"Server running at http://localhost:{port}")
-    server.serve_forever()
+    args = _parse_args()
+    started = time.perf_counter()
+    steps = [("schema_check", check_schema_version)]
+    if args.migrate:
+        steps.insert(0, ("migrate", migrate_schema))
+    try:
+        STARTUP_TIMINGS.update(run_timed(steps))
+    except MigrationError as error:
+        raise SystemExit(f"[STARTUP] {error}")
+    server = create_server(
+        AppHandler,
+        port=args.port,
+        mode=args.mode,
+        threads=args.threads,
+        queue_size=args.queue_size,
+        drain_timeout=args.drain_timeout,
+    )
+    STARTUP_TIMINGS["total"] = round((time.perf_counter() - started) * 1000, 1)
+    steps_text = ", ".join(f"{name} {ms} ms" for name, ms in STARTUP_TIMINGS.items() if name != "total")
+    print(f"[STARTUP] Ready in {STARTUP_TIMINGS['total']} ms ({steps_text})")
+    print(f"Server running at http://localhost:{args.port} ({args.mode} mode, {args.workers} worker process(es))")
+    if args.workers > 1 and LIST_CACHE.versions.name == "local":
+        print(
+            "[CACHE] LIST_CACHE_VERSIONS=local: after another worker's write, a worker may list stale teams, "
+            "members or meetings, and answer their ETags with 304, for up to twice LIST_CACHE_TTL seconds"
+        )
+    serve_prefork(
+        server,
+        args.workers,
+        before_fork=close_db_pool,
+        on_start=start_services,
+        on_stop=stop_services,
+    )
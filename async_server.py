@@ -0,0 +1,235 @@
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+MAX_REQUEST_HEAD = 65536
+
+
+class _LoopReader:
+    """Blocking, file-like reader over an asyncio StreamReader for handler threads.
+
+    Serves the already-read request head first, then pulls the body from the
+    event loop as the handler asks for it, so uploads still stream.
+    """
+
+    def __init__(self, loop, reader, head, timeout):
+        self._loop = loop
+        self._reader = reader
+        self._buffer = head
+        self._timeout = timeout
+
+    def _call(self, coroutine):
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(coroutine, self._timeout), self._loop)
+        try:
+            return future.result()
+        except asyncio.TimeoutError:
+            raise TimeoutError("timed out reading request body") from None
+
+    def readline(self, limit=-1):
+        if self._buffer:
+            end = self._buffer.find(b"\n") + 1 or len(self._buffer)
+            if limit is not None and limit >= 0:
+                end = min(end, limit)
+            line, self._buffer = self._buffer[:end], self._buffer[end:]
+            return line
+        return self._call(self._reader.readline())
+
+    def read(self, size=-1):
+        if self._buffer:
+            if size is None or size < 0:
+                data, self._buffer = self._buffer, b""
+                return data + self._call(self._reader.read())
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+            return data
+        if size is None or size < 0:
+            return self._call(self._reader.read())
+        try:
+            return self._call(self._reader.readexactly(size))
+        except asyncio.IncompleteReadError as error:
+            return error.partial
+
+
+class _LoopWriter:
+    """Blocking, file-like writer that hands data to the event loop with backpressure."""
+
+    def __init__(self, loop, writer):
+        self._loop = loop
+        self._writer = writer
+
+    async def _write(self, data):
+        self._writer.write(data)
+        await self._writer.drain()
+
+    def write(self, data):
+        if data:
+            asyncio.run_coroutine_threadsafe(self._write(bytes(data)), self._loop).result()
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+class _LoopConnection:
+    """Stands in for the client socket: sendfile() goes through loop.sendfile()."""
+
+    def __init__(self, loop, writer):
+        self._loop = loop
+        self._writer = writer
+
+    def sendfile(self, file, offset=0, count=None):
+        coroutine = self._loop.sendfile(self._writer.transport, file, offset, count)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def settimeout(self, timeout):
+        pass
+
+
+class AsyncioHTTPServer:
+    """HTTP/1.1 server on asyncio streams that reuses a BaseHTTPRequestHandler class.
+
+    The event loop owns every socket: accepting, waiting for the next request
+    on a kept-alive connection and writing responses. Only while a request is
+    being handled does it occupy one of ``threads`` executor threads, where
+    the handler's do_GET/do_POST run unchanged (blocking MySQL calls
+    included). Thousands of idle or slow connections therefore cost a
+    coroutine each instead of a thread each.
+
+    The interface matches socketserver servers closely enough for serve()
+    and serve_prefork(): serve_forever(), shutdown(), server_close(),
+    socket and server_address.
+    """
+
+    def __init__(self, server_address, handler_class, threads=16, drain_timeout=30.0, backlog=1024):
+        self.handler_class = handler_class
+        self.threads = threads
+        self.drain_timeout = drain_timeout
+        self.socket = socket.create_server(server_address, backlog=backlog)
+        self.socket.setblocking(False)
+        self.server_address = self.socket.getsockname()
+        self._loop = None
+        self._stop = None
+        self._stopped = threading.Event()
+        self._draining = False
+        self._idle_waits = set()
+        self._stats_lock = threading.Lock()
+        self._stats = {"accepted": 0, "open_connections": 0, "in_flight": 0, "completed": 0}
+
+    def should_close_idle(self):
+        return self._draining
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({"threads": self.threads, "mode": "asyncio"})
+        return stats
+
+    def _count(self, name, delta=1):
+        with self._stats_lock:
+            self._stats[name] += delta
+
+    def serve_forever(self, poll_interval=None):
+        self._stopped.clear()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._stopped.set()
+
+    def shutdown(self):
+        """Stop accepting, let in-flight requests finish, and wait for serve_forever() to return."""
+        loop = self._loop
+        if loop is not None and not self._stopped.is_set():
+            loop.call_soon_threadsafe(self._stop.set)
+            self._stopped.wait()
+
+    def server_close(self):
+        self._draining = True
+        self.socket.close()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix="async-http-worker")
+        server = await asyncio.start_server(self._handle_connection, sock=self.socket, limit=MAX_REQUEST_HEAD)
+        try:
+            await self._stop.wait()
+        finally:
+            self._draining = True
+            server.close()
+            for waiter in list(self._idle_waits):
+                waiter.cancel()
+            deadline = self._loop.time() + self.drain_timeout
+            while self._stats["open_connections"] and self._loop.time() < deadline:
+                await asyncio.sleep(0.05)
+            if self._stats["open_connections"]:
+                print(f"[SERVER] Drain timeout reached with {self._stats['open_connections']} connection(s) open")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._loop = None
+
+    async def _read_head(self, reader, timeout):
+        waiter = asyncio.ensure_future(reader.readuntil(b"\r\n\r\n"))
+        self._idle_waits.add(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        finally:
+            self._idle_waits.discard(waiter)
+
+    async def _handle_connection(self, reader, writer):
+        self._count("accepted")
+        self._count("open_connections")
+        handler_class = self.handler_class
+        requests_handled = 0
+        sock = writer.get_extra_info("socket")
+        if sock is not None and handler_class.disable_nagle_algorithm:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+        try:
+            while not self._draining:
+                timeout = handler_class.keepalive_timeout if requests_handled else handler_class.request_timeout
+                try:
+                    head = await self._read_head(reader, timeout)
+                except (asyncio.TimeoutError, asyncio.CancelledError, asyncio.IncompleteReadError,
+                        asyncio.LimitOverrunError, ConnectionError):
+                    break
+                self._count("in_flight")
+                try:
+                    close = await self._loop.run_in_executor(
+                        self._executor, self._run_handler, head, reader, writer, requests_handled
+                    )
+                finally:
+                    self._count("in_flight", -1)
+                    self._count("completed")
+                requests_handled += 1
+                if close or requests_handled >= handler_class.keepalive_max_requests:
+                    break
+        finally:
+            self._count("open_connections", -1)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    def _run_handler(self, head, reader, writer, requests_handled):
+        """Run one request through the handler class on an executor thread.
+
+        Returns:
+            True if the connection must be closed afterwards.
+        """
+        handler = self.handler_class.__new__(self.handler_class)
+        handler.server = self
+        handler.request = None
+        handler.client_address = writer.get_extra_info("peername") or ("", 0)
+        handler.connection = _LoopConnection(self._loop, writer)
+        handler.rfile = _LoopReader(self._loop, reader, head, self.handler_class.request_timeout)
+        handler.wfile = _LoopWriter(self._loop, writer)
+        handler.requests_handled = requests_handled
+        handler.close_connection = True
+        try:
+            BaseHTTPRequestHandler.handle_one_request(handler)
+        except (ConnectionError, TimeoutError, RuntimeError):
+            return True
+        except Exception as error:
+            print(f"[SERVER] Unhandled error for {handler.client_address}: {error}")
+            return True
+        return handler.close_connection
@@ -0,0 +1,203 @@
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+
+class AttachmentStore(ABC):
+    """Storage for attachment content, addressed by its SHA-256 hex digest.
+
+    Metadata (file name, type, size, owner) stays in meeting_attachments;
+    a store only knows digests and bytes. Backends are looked up by name in
+    ATTACHMENT_STORE_BACKENDS.
+    """
+
+    spool_dir = None
+
+    @abstractmethod
+    def put_file(self, path, sha256):
+        """Take ownership of the file at ``path`` whose content hashes to ``sha256``."""
+
+    @abstractmethod
+    def put_bytes(self, data):
+        """Store ``data`` and return its digest."""
+
+    @abstractmethod
+    def open(self, sha256):
+        """Return a binary file object positioned at the start of the content."""
+
+    def local_path(self, sha256):
+        """Filesystem path of the content if it lives on local disk, else None."""
+        return None
+
+    @abstractmethod
+    def exists(self, sha256):
+        ...
+
+    @abstractmethod
+    def delete(self, sha256):
+        ...
+
+    @abstractmethod
+    def iter_digests(self):
+        """Yield (sha256, modified_timestamp) for every stored object."""
+
+
+class FileSystemAttachmentStore(AttachmentStore):
+    """Content-addressed files under ``root/ab/cd/abcd...``.
+
+    Identical content is written once: storing a digest that already exists
+    just drops the new copy.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.spool_dir = self.root / "tmp"
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, sha256):
+        if len(sha256) != 64 or not all(char in "0123456789abcdef" for char in sha256):
+            raise ValueError(f"Invalid attachment digest: {sha256!r}")
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def put_file(self, path, sha256):
+        target = self._path(sha256)
+        if target.exists():
+            os.unlink(path)
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(path, target)
+        except OSError as error:
+            if error.errno != errno.EXDEV:
+                raise
+            # Spool file on another filesystem: copy beside the target, then rename.
+            fd, staged = tempfile.mkstemp(prefix="put-", dir=self.spool_dir)
+            os.close(fd)
+            shutil.copyfile(path, staged)
+            os.replace(staged, target)
+            os.unlink(path)
+        return target
+
+    def put_bytes(self, data):
+        sha256 = hashlib.sha256(data).hexdigest()
+        if not self._path(sha256).exists():
+            fd, staged = tempfile.mkstemp(prefix="put-", dir=self.spool_dir)
+            with os.fdopen(fd, "wb") as out:
+                out.write(data)
+            self.put_file(staged, sha256)
+        return sha256
+
+    def open(self, sha256):
+        return open(self._path(sha256), "rb")
+
+    def local_path(self, sha256):
+        return self._path(sha256)
+
+    def exists(self, sha256):
+        return self._path(sha256).exists()
+
+    def delete(self, sha256):
+        try:
+            os.unlink(self._path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def iter_digests(self):
+        for path in self.root.glob("??/??/*"):
+            if path.is_file() and len(path.name) == 64:
+                yield path.name, path.stat().st_mtime
+
+
+ATTACHMENT_STORE_BACKENDS = {
+    "filesystem": FileSystemAttachmentStore,
+}
+
+
+def create_attachment_store(backend, **options):
+    try:
+        store_class = ATTACHMENT_STORE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown attachment store {backend!r}; expected one of {', '.join(ATTACHMENT_STORE_BACKENDS)}."
+        ) from None
+    return store_class(**options)
+
+
+def add_reference(cursor, sha256, size):
+    """Count one more meeting_attachments row pointing at ``sha256``.
+
+    Call this before putting the content in the store and commit it with the
+    attachment row: the upsert locks the attachment_blobs row, which keeps
+    collect_garbage() from deleting the content underneath the upload.
+    """
+    cursor.execute(
+        """
+        INSERT INTO attachment_blobs (content_sha256, file_size, ref_count)
+        VALUES (%s, %s, 1)
+        ON DUPLICATE KEY UPDATE ref_count = ref_count + 1
+        """,
+        (sha256, size),
+    )
+
+
+def collect_garbage(conn, store, orphan_grace_seconds=3600):
+    """Drop stored content that no attachment references any more.
+
+    Reference counts go stale when attachments disappear through ON DELETE
+    CASCADE, so each candidate is recounted from meeting_attachments under a
+    row lock before its content is removed. Files with no attachment_blobs
+    row at all (left by an upload whose transaction rolled back) are removed
+    once they are older than ``orphan_grace_seconds``.
+
+    Returns:
+        Dict with counts of deleted blobs, corrected ref counts and orphan files.
+    """
+    result = {"deleted": 0, "recounted": 0, "orphans": 0}
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT b.content_sha256
+        FROM attachment_blobs b
+        LEFT JOIN meeting_attachments ma ON ma.content_sha256 = b.content_sha256
+        GROUP BY b.content_sha256, b.ref_count
+        HAVING COUNT(ma.id) <> b.ref_count
+        """
+    )
+    candidates = [row[0] for row in cursor.fetchall()]
+    conn.commit()
+
+    for sha256 in candidates:
+        cursor.execute("SELECT ref_count FROM attachment_blobs WHERE content_sha256 = %s FOR UPDATE", (sha256,))
+        if cursor.fetchone() is None:
+            conn.commit()
+            continue
+        cursor.execute("SELECT COUNT(*) FROM meeting_attachments WHERE content_sha256 = %s", (sha256,))
+        references = cursor.fetchone()[0]
+        if references:
+            cursor.execute(
+                "UPDATE attachment_blobs SET ref_count = %s WHERE content_sha256 = %s", (references, sha256)
+            )
+            result["recounted"] += 1
+        else:
+            cursor.execute("DELETE FROM attachment_blobs WHERE content_sha256 = %s", (sha256,))
+            # Delete before committing so a concurrent upload of the same
+            # content waits on the row lock and then writes a fresh copy.
+            store.delete(sha256)
+            result["deleted"] += 1
+        conn.commit()
+
+    cutoff = time.time() - orphan_grace_seconds
+    for sha256, modified in store.iter_digests():
+        if modified > cutoff:
+            continue
+        cursor.execute("SELECT 1 FROM attachment_blobs WHERE content_sha256 = %s", (sha256,))
+        if cursor.fetchone() is None:
+            store.delete(sha256)
+            result["orphans"] += 1
+        conn.commit()
+    return result
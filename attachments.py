@@ -0,0 +1,161 @@
+import hashlib
+import os
+import tempfile
+from urllib.parse import quote
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised as soon as an upload exceeds the configured size limit."""
+
+
+class IncompleteUploadError(ValueError):
+    """Raised when the client stops sending before the declared body length."""
+
+
+def iter_request_body(rfile, headers, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the request body in chunks without buffering it.
+
+    Supports both Content-Length and ``Transfer-Encoding: chunked`` bodies.
+    """
+    if "chunked" in (headers.get("Transfer-Encoding") or "").lower():
+        while True:
+            size_line = rfile.readline(1024)
+            if not size_line:
+                raise IncompleteUploadError("Upload ended inside a chunk header.")
+            try:
+                remaining = int(size_line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise IncompleteUploadError("Malformed chunk size.") from None
+            if remaining == 0:
+                # Skip optional trailers up to the blank line.
+                while rfile.readline(1024) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            while remaining > 0:
+                chunk = rfile.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise IncompleteUploadError("Upload ended inside a chunk.")
+                remaining -= len(chunk)
+                yield chunk
+            rfile.readline(1024)
+        return
+
+    remaining = int(headers.get("Content-Length") or 0)
+    while remaining > 0:
+        chunk = rfile.read(min(chunk_size, remaining))
+        if not chunk:
+            raise IncompleteUploadError("Upload ended before Content-Length bytes were received.")
+        remaining -= len(chunk)
+        yield chunk
+
+
+class SpooledUpload:
+    """An uploaded file written to a temporary file, with its size and SHA-256."""
+
+    def __init__(self, path, size, sha256):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def read_bytes(self):
+        with open(self.path, "rb") as handle:
+            return handle.read()
+
+    def discard(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.discard()
+        return False
+
+
+def spool_upload(chunks, max_bytes, spool_dir=None):
+    """Write body chunks to a temporary file, hashing and size-checking as they arrive.
+
+    Raises:
+        UploadTooLargeError: The running size passed ``max_bytes``; nothing
+            past the limit is read or written.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="upload-", dir=spool_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Attachment exceeds the {max_bytes} byte limit.")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return SpooledUpload(path, size, digest.hexdigest())
+
+
+class RangeNotSatisfiableError(ValueError):
+    """The Range header does not overlap the file."""
+
+
+def parse_byte_range(header, size):
+    """Parse a ``Range: bytes=...`` header against a file of ``size`` bytes.
+
+    Only a single range is honoured; multi-range requests, other units and
+    malformed headers return None, meaning the whole file is sent (which
+    RFC 9110 allows).
+
+    Returns:
+        Tuple (start, end) with ``end`` inclusive, or None.
+
+    Raises:
+        RangeNotSatisfiableError: The range starts past the end of the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            suffix = int(last)
+    except ValueError:
+        return None
+    if not first:
+        if suffix <= 0 or size == 0:
+            raise RangeNotSatisfiableError(header)
+        return max(size - suffix, 0), size - 1
+    if last and start > end:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError(header)
+    return start, min(end, size - 1)
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against ``etag``."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    strip = lambda tag: tag.strip().removeprefix("W/")
+    return any(strip(tag) == strip(etag) for tag in if_none_match.split(","))
+
+
+def content_disposition(file_name, disposition="attachment"):
+    """Content-Disposition with an ASCII fallback and an RFC 5987 UTF-8 name."""
+    fallback = "".join(char if 32 <= ord(char) < 127 and char not in '"\\' else "_" for char in file_name)
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(file_name, safe='')}"
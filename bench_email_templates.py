@@ -0,0 +1,100 @@
+"""Per-recipient cost of building invite emails for a 500-invitee meeting.
+
+Run: python bench_email_templates.py
+"""
+import secrets
+import timeit
+from email.message import EmailMessage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from email_templates import get_template, meeting_template_values
+
+INVITEES = 500
+REPEAT = 5
+
+MEETING = {
+    "id": 1234,
+    "name": "Multidisciplinary Tumor Board",
+    "startsAt": "2026-03-02",
+    "startTime": "08:00",
+    "endTime": "09:00",
+    "timezone": "EST",
+    "teamsJoinUrl": "https://teams.microsoft.com/l/meeting/new?subject=Multidisciplinary+Tumor+Board",
+    "scheduleType": "recurring",
+    "recurrenceRule": "FREQ=WEEKLY;BYDAY=MO",
+    "recurrenceEndDate": "2026-12-28",
+}
+TOKENS = [secrets.token_urlsafe(32) for _ in range(INVITEES)]
+
+
+def _links(token):
+    response_url = f"http://localhost:3000/api/respond-to-meeting/{token}"
+    return {
+        "acceptLink": f"{response_url}?action=accept&calendar=1",
+        "declineLink": f"{response_url}?action=decline",
+        "tentativeLink": f"{response_url}?action=tentative",
+    }
+
+
+def render_full_each_time():
+    """Baseline: substitute every field for every recipient, like the old f-string."""
+    template = get_template("invite_email.html")
+    values = meeting_template_values(MEETING)
+    for token in TOKENS:
+        template.render({**values, **_links(token)})
+
+
+def render_partial():
+    """Meeting fields rendered once, then only the three links per recipient."""
+    partial = get_template("invite_email.html").partial(meeting_template_values(MEETING))
+    for token in TOKENS:
+        partial.render(_links(token))
+
+
+def build_email_messages():
+    """Complete EmailMessage per recipient (text + HTML alternatives)."""
+    values = meeting_template_values(MEETING)
+    text = get_template("invite_email.txt").partial(values)
+    html = get_template("invite_email.html").partial(values)
+    for index, token in enumerate(TOKENS):
+        links = _links(token)
+        msg = EmailMessage()
+        msg["Subject"] = f"Meeting Invite: {MEETING['name']}"
+        msg["From"] = "planner@example.com"
+        msg["To"] = f"invitee{index}@example.com"
+        msg.set_content(text.render(links))
+        msg.add_alternative(html.render(links), subtype="html")
+        msg.as_bytes()
+
+
+def build_mime_messages():
+    """Complete MIMEMultipart per recipient, as send_invite_emails does."""
+    values = meeting_template_values(MEETING)
+    text = get_template("invite_email.txt").partial(values)
+    html = get_template("invite_email.html").partial(values)
+    for index, token in enumerate(TOKENS):
+        links = _links(token)
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = f"Meeting Invite: {MEETING['name']}"
+        msg["From"] = "planner@example.com"
+        msg["To"] = f"invitee{index}@example.com"
+        msg.attach(MIMEText(text.render(links), "plain", "utf-8"))
+        msg.attach(MIMEText(html.render(links), "html", "utf-8"))
+        msg.as_bytes()
+
+
+def main():
+    print(f"Invite email rendering, {INVITEES} invitees, best of {REPEAT}")
+    for label, func in [
+        ("full render per recipient", render_full_each_time),
+        ("meeting partial + per-recipient links", render_partial),
+        ("EmailMessage build + serialize", build_email_messages),
+        ("MIMEMultipart build + serialize", build_mime_messages),
+    ]:
+        best = min(timeit.repeat(func, number=1, repeat=REPEAT))
+        print(f"  {label:<45} {best * 1000:8.2f} ms total  {best / INVITEES * 1e6:8.1f} us/recipient")
+
+
+if __name__ == "__main__":
+    main()
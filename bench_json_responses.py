@@ -0,0 +1,129 @@
+"""Encoding cost of a 50k-meeting /api/meetings response.
+
+Builds meetings in the shape _send_json receives them (MySQL DATE, TIME and
+DATETIME values included) and compares:
+  - the old json.dumps(data, default=str).encode()
+  - json_encoding.dumps() with the stdlib encoder and with orjson (if installed)
+  - json_encoding.iter_json_array(), as streamed with chunked encoding
+Prints best-of-N time, time to the first byte and peak memory held by the
+encoded output.
+
+Run: python bench_json_responses.py [--meetings 50000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import json_encoding
+from json_encoding import dumps, iter_json_array
+
+
+def build_meetings(count):
+    meetings = []
+    for n in range(count):
+        day = date(2026, 1, 1) + timedelta(days=n % 365)
+        meetings.append(
+            {
+                "id": n,
+                "name": f"Multidisciplinary Tumor Board {n}",
+                "patients": [
+                    {
+                        "patientDetailId": n * 2 + p,
+                        "patientName": f"Patient {n}-{p}",
+                        "medicalRecordNumber": f"MRN{n:07d}{p}",
+                        "patientDateOfBirth": date(1960 + p, 1 + n % 12, 1 + n % 28),
+                        "doctorName": "Dr. Rivera",
+                        "departmentName": "Oncology",
+                        "meetingAgendaNote": "Review CT and pathology",
+                        "patientDescription": None,
+                    }
+                    for p in range(2)
+                ],
+                "attachments": [
+                    {"id": n * 2 + a, "fileName": f"scan-{a}.pdf", "fileType": "application/pdf", "fileSize": 180_000}
+                    for a in range(2)
+                ],
+                "attachmentCount": 2,
+                "attachmentNames": "scan-0.pdf, scan-1.pdf",
+                "invitees": ", ".join(f"doctor{i}@example.org" for i in range(5)),
+                "responses": {f"doctor{i}@example.org": "Accept" if i % 2 else "Pending" for i in range(5)},
+                "startsAt": day,
+                "startTime": timedelta(hours=8),
+                "endTime": timedelta(hours=9),
+                "timezone": "EST",
+                "teamsJoinUrl": f"https://teams.microsoft.com/l/meetup-join/{n}",
+                "scheduleType": "recurring" if n % 3 == 0 else "one-time",
+                "recurrenceRule": "FREQ=WEEKLY;BYDAY=MO" if n % 3 == 0 else None,
+                "recurrenceEndDate": date(2026, 12, 28) if n % 3 == 0 else None,
+                "recurrenceExceptions": [],
+                "createdAt": datetime(2025, 12, 1, 9, 30),
+                "nextOccurrence": day,
+            }
+        )
+    return meetings
+
+
+def old_dumps(meetings):
+    return json.dumps(meetings, default=str).encode("utf-8")
+
+
+def stream(meetings):
+    size = 0
+    for chunk in iter_json_array(meetings):
+        size += len(chunk)
+    return size
+
+
+def first_chunk(meetings):
+    return next(iter_json_array(meetings))
+
+
+def _best(func, meetings, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(meetings)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_bytes(func, meetings):
+    tracemalloc.start()
+    func(meetings)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--meetings", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    meetings = build_meetings(args.meetings)
+    print(f"{args.meetings} meetings, {len(old_dumps(meetings)) / 1e6:.1f} MB as JSON, best of {args.repeat}")
+    encoders = ["json"] + (["orjson"] if json_encoding.orjson is not None else [])
+    installed = json_encoding.orjson
+    cases = [("json.dumps(default=str), old", None, old_dumps, old_dumps)]
+    for encoder in encoders:
+        cases.append((f"dumps(), {encoder}", encoder, dumps, dumps))
+        cases.append((f"iter_json_array(), {encoder}", encoder, stream, first_chunk))
+    for label, encoder, func, first in cases:
+        json_encoding.orjson = installed if encoder != "json" else None
+        total = _best(func, meetings, args.repeat)
+        first_byte = _best(first, meetings, args.repeat)
+        peak = _peak_bytes(func, meetings)
+        print(
+            f"  {label:<32} {total * 1000:8.1f} ms total  {first_byte * 1000:8.1f} ms to first byte"
+            f"  {peak / 1e6:8.1f} MB peak"
+        )
+    json_encoding.orjson = installed
+    if installed is None:
+        print("  (orjson is not installed: pip install orjson)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Compare the old GROUP_CONCAT meeting listing with the batched page queries.
+
+Seeds a separate database (BENCH_DB_NAME, default General_meetings_bench) with
+10k meetings x 20 invitees, then prints EXPLAIN plans and best-of-N timings for:
+  - the original single query joining every child table (all meetings)
+  - fetch_meeting_page() for the first page and for a page deep in history
+
+Run: python bench_meeting_listing.py [--meetings 10000] [--invitees 20] [--reseed]
+Uses the DB_HOST/DB_PORT/DB_USER/DB_PASSWORD settings from .env.
+"""
+import argparse
+import os
+import time
+from datetime import date, timedelta
+
+import mysql.connector
+
+from app import _get_db_settings
+from meeting_listing import (
+    build_meeting_page_query,
+    decode_cursor,
+    encode_cursor,
+    fetch_meeting_page,
+    parse_meeting_filters,
+)
+from migrations import apply_migrations, load_migrations
+
+OLD_LISTING_QUERY = """
+    SELECT me.id, me.name,
+           GROUP_CONCAT(DISTINCT CONCAT(mpd.id, '|', mpd.patient_name, '|', mpd.medical_record_number, '|',
+                        mpd.patient_date_of_birth, '|', mpd.doctor_name, '|', mpd.department_name, '|',
+                        COALESCE(mpd.meeting_agenda_note, ''), '|', COALESCE(mpd.patient_description, ''))
+                        ORDER BY mpd.patient_name SEPARATOR '||') AS patientsData,
+           COUNT(DISTINCT ma.id) AS attachmentCount,
+           GROUP_CONCAT(DISTINCT ma.file_name ORDER BY ma.file_name SEPARATOR ', ') AS attachmentNames,
+           GROUP_CONCAT(DISTINCT mi.emails SEPARATOR '; ') AS invitees,
+           GROUP_CONCAT(DISTINCT CONCAT(mir.invitee_email, '|', mir.status) ORDER BY mir.invitee_email SEPARATOR '||') AS inviteeResponses,
+           ms.starts_at AS startsAt,
+           ms.start_time AS startTime,
+           ms.end_time AS endTime,
+           ms.timezone,
+           ms.teams_join_url AS teamsJoinUrl,
+           ms.schedule_type AS scheduleType,
+           ms.recurrence_rule AS recurrenceRule,
+           ms.recurrence_end_date AS recurrenceEndDate
+    FROM meetings me
+    JOIN meeting_schedules ms ON ms.meeting_id = me.id
+    LEFT JOIN meeting_patient_details mpd ON mpd.meeting_id = me.id
+    LEFT JOIN meeting_attachments ma ON ma.meeting_id = me.id
+    LEFT JOIN meeting_invites mi ON mi.meeting_id = me.id
+    LEFT JOIN meeting_invitee_responses mir ON mir.meeting_id = me.id
+    GROUP BY me.id, me.name, ms.starts_at, ms.start_time, ms.end_time, ms.timezone,
+             ms.teams_join_url,
+             ms.schedule_type, ms.recurrence_rule, ms.recurrence_end_date
+    ORDER BY ms.starts_at DESC, ms.start_time DESC
+"""
+
+
+def _connect(database=None):
+    settings = _get_db_settings()
+    if database:
+        settings["database"] = database
+    else:
+        settings.pop("database")
+    return mysql.connector.connect(**settings)
+
+
+def _seed(conn, meetings, invitees):
+    apply_migrations(conn, load_migrations())
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM meetings")
+    if cursor.fetchone()[0] >= meetings:
+        return
+
+    print(f"Seeding {meetings} meetings x {invitees} invitees...")
+    first_day = date(2020, 1, 1)
+    batch = 500
+    for start in range(0, meetings, batch):
+        ids = range(start + 1, min(start + batch, meetings) + 1)
+        cursor.executemany("INSERT INTO meetings (id, name) VALUES (%s, %s)", [(i, f"Bench meeting {i}") for i in ids])
+        cursor.executemany(
+            """
+            INSERT INTO meeting_schedules (meeting_id, starts_at, start_time, end_time, timezone, teams_join_url, schedule_type)
+            VALUES (%s, %s, %s, %s, 'EST', %s, 'one-time')
+            """,
+            [
+                (i, first_day + timedelta(days=i // 5), f"{8 + i % 8:02d}:00", f"{9 + i % 8:02d}:00",
+                 f"https://teams.microsoft.com/l/meeting/new?subject=Bench+meeting+{i}")
+                for i in ids
+            ],
+        )
+        emails = {i: [f"clinician{(i + n) % 400}@example.org" for n in range(invitees)] for i in ids}
+        cursor.executemany(
+            "INSERT INTO meeting_invites (meeting_id, emails) VALUES (%s, %s)",
+            [(i, ", ".join(emails[i])) for i in ids],
+        )
+        cursor.executemany(
+            "INSERT INTO meeting_invitee_responses (meeting_id, invitee_email, response_token, status) VALUES (%s, %s, %s, %s)",
+            [
+                (i, email, f"bench-{i}-{n}", ("Pending", "Accept", "Decline", "Tentative")[n % 4])
+                for i in ids
+                for n, email in enumerate(emails[i])
+            ],
+        )
+        cursor.executemany(
+            """
+            INSERT INTO meeting_patient_details
+            (meeting_id, medical_record_number, patient_name, patient_date_of_birth, doctor_name, department_name, meeting_agenda_note)
+            VALUES (%s, %s, %s, '1970-01-01', 'Dr. Bench', 'Oncology', 'Review imaging | labs')
+            """,
+            [(i, f"MRN{i}-{p}", f"Patient {i}-{p}") for i in ids for p in range(2)],
+        )
+        cursor.executemany(
+            """
+            INSERT INTO meeting_attachments
+            (meeting_id, medical_record_number, doctor_name, department_name, file_name, file_type, file_size, file_data)
+            VALUES (%s, %s, 'Dr. Bench', 'Oncology', %s, 'application/pdf', 4, 'data')
+            """,
+            [(i, f"MRN{i}-0", f"scan-{i}.pdf") for i in ids],
+        )
+        conn.commit()
+    cursor.execute("ANALYZE TABLE meetings, meeting_schedules, meeting_invites, meeting_invitee_responses, "
+                   "meeting_patient_details, meeting_attachments")
+    cursor.fetchall()
+
+
+def _explain(conn, query, params=()):
+    cursor = conn.cursor()
+    cursor.execute(f"EXPLAIN {query}", params)
+    columns = [column[0] for column in cursor.description]
+    wanted = ["table", "type", "key", "rows", "Extra"]
+    print("    " + " | ".join(wanted))
+    for row in cursor.fetchall():
+        record = dict(zip(columns, row))
+        print("    " + " | ".join(str(record.get(name)) for name in wanted))
+
+
+def _best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=10000)
+    parser.add_argument("--invitees", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--reseed", action="store_true")
+    args = parser.parse_args()
+    database = os.environ.get("BENCH_DB_NAME", "General_meetings_bench")
+
+    admin = _connect()
+    cursor = admin.cursor()
+    if args.reseed:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
+    admin.close()
+
+    conn = _connect(database)
+    _seed(conn, args.meetings, args.invitees)
+    cursor = conn.cursor()
+    cursor.execute("SET SESSION group_concat_max_len = 1048576")
+
+    def run_old():
+        cursor.execute(OLD_LISTING_QUERY)
+        cursor.fetchall()
+
+    first_page = parse_meeting_filters(lambda name, default="": default)
+    meetings, _ = fetch_meeting_page(conn, first_page)
+    deep = fetch_meeting_page(conn, {**first_page, "limit": args.meetings // 2})[0][-1]
+    deep_page = {**first_page, "after": decode_cursor(encode_cursor(deep))}
+
+    print("\nOld listing query (all meetings, one statement):")
+    _explain(conn, OLD_LISTING_QUERY)
+    print("\nNew page query (first page):")
+    _explain(conn, *build_meeting_page_query(first_page))
+    print("\nNew page query (page halfway through history):")
+    _explain(conn, *build_meeting_page_query(deep_page))
+    ids = [meeting["id"] for meeting in meetings]
+    placeholders = ", ".join(["%s"] * len(ids))
+    print("\nNew child query (invitee responses for one page):")
+    _explain(
+        conn,
+        f"SELECT meeting_id, invitee_email, status FROM meeting_invitee_responses "
+        f"WHERE meeting_id IN ({placeholders}) ORDER BY meeting_id, invitee_email",
+        ids,
+    )
+
+    print(f"\nTimings, best of {args.repeat}:")
+    old = _best_of(run_old, args.repeat)
+    print(f"  old GROUP_CONCAT query, all {args.meetings} meetings   {old * 1000:10.1f} ms")
+    new_first = _best_of(lambda: fetch_meeting_page(conn, first_page), args.repeat)
+    print(f"  fetch_meeting_page, first page of {first_page['limit']}          {new_first * 1000:10.1f} ms")
+    new_deep = _best_of(lambda: fetch_meeting_page(conn, deep_page), args.repeat)
+    print(f"  fetch_meeting_page, page halfway through history {new_deep * 1000:10.1f} ms")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Throughput and latency of the threaded and asyncio server modes under idle keep-alive load.
+
+Each mode serves a handler that sleeps for --db-ms to stand in for a MySQL
+round trip. While --idle connections sit open doing nothing, --clients
+threads send requests over their own keep-alive connections for --seconds.
+
+Run: python bench_server_modes.py [--idle 500] [--clients 32]
+"""
+import argparse
+import http.client
+import multiprocessing
+import socket
+import statistics
+import threading
+import time
+
+from server import KeepAliveRequestHandler, create_server
+
+BODY = b'{"ok": true}'
+
+
+class BenchHandler(KeepAliveRequestHandler):
+    keepalive_timeout = 60
+    keepalive_max_requests = 1_000_000
+    db_seconds = 0.005
+
+    def do_GET(self):
+        time.sleep(self.db_seconds)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(mode, threads, db_seconds, ready):
+    BenchHandler.db_seconds = db_seconds
+    server = create_server(BenchHandler, host="127.0.0.1", port=0, mode=mode, threads=threads)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _client(port, stop, latencies, errors):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            conn.request("GET", "/bench")
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                raise ConnectionError(f"HTTP {response.status}")
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def run(mode, args):
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(mode, args.threads, args.db_ms / 1000, ready), daemon=True)
+    process.start()
+    port = ready.get(timeout=10)
+    idle = []
+    try:
+        for _ in range(args.idle):
+            idle.append(socket.create_connection(("127.0.0.1", port)))
+        time.sleep(0.2)
+
+        stop = threading.Event()
+        latencies, errors = [], []
+        clients = [threading.Thread(target=_client, args=(port, stop, latencies, errors)) for _ in range(args.clients)]
+        started = time.perf_counter()
+        for client in clients:
+            client.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        for sock in idle:
+            sock.close()
+        process.terminate()
+        process.join()
+
+    if not latencies:
+        print(f"  {mode:<9} no request completed ({len(errors)} errors)")
+        return
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"  {mode:<9} {len(latencies) / elapsed:9.0f} req/s   p50 {statistics.median(latencies) * 1000:7.1f} ms"
+          f"   p99 {p99 * 1000:7.1f} ms   errors {len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--idle", type=int, default=500, help="idle keep-alive connections held open")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent active clients")
+    parser.add_argument("--threads", type=int, default=16, help="--threads passed to the server")
+    parser.add_argument("--db-ms", type=float, default=5.0, help="simulated database time per request")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.idle} idle connections, {args.clients} active clients, {args.threads} threads, "
+          f"{args.db_ms:g} ms per request:")
+    for mode in ("threaded", "asyncio"):
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import secrets
+import threading
+from collections import deque
+from itertools import islice
+
+from json_encoding import dumps
+
+
+class TooManySubscribersError(Exception):
+    """Every event stream slot is taken."""
+
+
+def format_event(event):
+    """Server-Sent Events framing of one (id, type, data) event."""
+    event_id, event_type, data = event
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id.encode("ascii"), event_type.encode("ascii"), dumps(data))
+
+
+class ChangeBus:
+    """In-process publish/subscribe of data changes for /api/events.
+
+    Write paths publish small (type, data) events after they commit.
+    Streams do not get a queue each: the last ``history`` events are kept in
+    one ring buffer and every stream remembers how far it has read, so a
+    slow client costs nothing and a reconnecting one resumes from its
+    Last-Event-ID. Event ids carry a per-process epoch; an id from another
+    process or one that has fallen out of the buffer asks the client to
+    reload instead.
+    """
+
+    def __init__(self, history=1000, max_subscribers=8):
+        self.epoch = secrets.token_hex(4)
+        self.max_subscribers = max_subscribers
+        self._events = deque(maxlen=history)
+        self._sequence = 0
+        self._changed = threading.Condition()
+        self.subscribers = 0
+        self.published = 0
+
+    def publish(self, event_type, data):
+        with self._changed:
+            self._sequence += 1
+            self._events.append((self._sequence, event_type, data))
+            self.published += 1
+            self._changed.notify_all()
+
+    def event_id(self, sequence):
+        return f"{self.epoch}-{sequence}"
+
+    def position(self, last_event_id=None):
+        """Sequence a stream starts reading after, or None when the client must reload.
+
+        Without a Last-Event-ID the stream starts at the newest event.
+        """
+        with self._changed:
+            if not last_event_id:
+                return self._sequence
+            epoch, _, sequence = last_event_id.partition("-")
+            if epoch != self.epoch or not sequence.isdigit() or int(sequence) > self._sequence:
+                return None
+            sequence = int(sequence)
+            oldest = self._events[0][0] if self._events else self._sequence + 1
+            return sequence if sequence >= oldest - 1 else None
+
+    def wait(self, after, timeout):
+        """Events published after sequence ``after``, waiting up to ``timeout`` seconds for one.
+
+        Returns:
+            Tuple (events as (id, type, data), new position), or (None,
+            position) when the stream fell behind the buffer and the client
+            must reload.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._sequence > after, timeout)
+            if self._sequence == after:
+                return [], after
+            oldest = self._events[0][0]
+            if after < oldest - 1:
+                return None, self._sequence
+            events = [
+                (self.event_id(sequence), event_type, data)
+                for sequence, event_type, data in islice(self._events, after - oldest + 1, None)
+            ]
+            return events, self._sequence
+
+    def subscribe(self):
+        """Take a stream slot; use as ``with bus.subscribe():``."""
+        with self._changed:
+            if self.subscribers >= self.max_subscribers:
+                raise TooManySubscribersError(f"At most {self.max_subscribers} event streams are open.")
+            self.subscribers += 1
+        return _Subscription(self)
+
+    def _unsubscribe(self):
+        with self._changed:
+            self.subscribers -= 1
+
+    def stats(self):
+        with self._changed:
+            return {
+                "subscribers": self.subscribers,
+                "max_subscribers": self.max_subscribers,
+                "published": self.published,
+                "buffered": len(self._events),
+            }
+
+
+class _Subscription:
+    def __init__(self, bus):
+        self._bus = bus
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._bus._unsubscribe()
@@ -8,6 +8,7 @@ CREATE TABLE IF NOT EXISTS members (
   id INT AUTO_INCREMENT PRIMARY KEY,
   full_name VARCHAR(255) NOT NULL,
   email VARCHAR(255) NOT NULL UNIQUE,
+  feed_token VARCHAR(64) NULL UNIQUE,
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -40,7 +41,21 @@ CREATE TABLE IF NOT EXISTS meeting_schedules (
   schedule_type ENUM('one-time', 'recurring') NOT NULL,
   recurrence_rule TEXT,
   recurrence_end_date DATE,
+  recurrence_exdates TEXT,
+  occurrences_until DATE NULL,
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  KEY idx_meeting_schedules_start (starts_at, start_time, meeting_id),
+  KEY idx_meeting_schedules_type_start (schedule_type, starts_at, start_time, meeting_id),
+  FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS meeting_occurrences (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  meeting_id INT NOT NULL,
+  occurrence_start DATETIME NOT NULL,
+  occurrence_end DATETIME NOT NULL,
+  UNIQUE KEY uq_meeting_occurrences (meeting_id, occurrence_start),
+  KEY idx_meeting_occurrences_start (occurrence_start, meeting_id),
   FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE
 );
 
@@ -90,9 +105,33 @@ CREATE TABLE IF NOT EXISTS meeting_attachments (
   file_name VARCHAR(255) NOT NULL,
   file_type VARCHAR(128),
   file_size BIGINT NOT NULL,
-  file_data LONGBLOB NOT NULL,
+  content_sha256 CHAR(64) NULL,
+  file_data LONGBLOB NULL,
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  KEY idx_meeting_attachments_sha256 (content_sha256),
   FOREIGN KEY (meeting_id, medical_record_number, doctor_name, department_name) 
     REFERENCES meeting_patient_details(meeting_id, medical_record_number, doctor_name, department_name) 
     ON DELETE CASCADE
-);
\ No newline at end of file
+);
+CREATE TABLE IF NOT EXISTS attachment_blobs (
+  content_sha256 CHAR(64) PRIMARY KEY,
+  file_size BIGINT NOT NULL,
+  ref_count INT NOT NULL DEFAULT 0,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS email_outbox (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  meeting_id INT NULL,
+  recipient VARCHAR(255) NOT NULL,
+  subject VARCHAR(998) NOT NULL,
+  message LONGBLOB NOT NULL,
+  status ENUM('Pending', 'Sending', 'Sent', 'Failed') NOT NULL DEFAULT 'Pending',
+  attempts INT NOT NULL DEFAULT 0,
+  next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  locked_until DATETIME NULL,
+  last_error TEXT,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  sent_at DATETIME NULL,
+  KEY idx_email_outbox_due (status, next_attempt_at),
+  FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE SET NULL
+);
@@ -0,0 +1,67 @@
+"""Bring databases created by older versions of 0001's schema up to it.
+
+This is what ensure_schema_updates() did on every start before migrations
+existed. Every step checks information_schema first, so on a database
+created from 0001 it changes nothing.
+"""
+import secrets
+
+SCHEDULE_COLUMNS = [
+    ("teams_join_url", "ALTER TABLE meeting_schedules ADD COLUMN teams_join_url VARCHAR(2048) NULL"),
+    ("recurrence_exdates", "ALTER TABLE meeting_schedules ADD COLUMN recurrence_exdates TEXT NULL AFTER recurrence_end_date"),
+    # NULL makes ensure_occurrence_horizon() backfill the meeting.
+    ("occurrences_until", "ALTER TABLE meeting_schedules ADD COLUMN occurrences_until DATE NULL AFTER recurrence_exdates"),
+]
+INDEXES = [
+    ("meeting_schedules", "idx_meeting_schedules_start", "starts_at, start_time, meeting_id"),
+    ("meeting_schedules", "idx_meeting_schedules_type_start", "schedule_type, starts_at, start_time, meeting_id"),
+    ("meeting_attachments", "idx_meeting_attachments_sha256", "content_sha256"),
+]
+
+
+def _columns(cursor, table_name):
+    cursor.execute(
+        """
+        SELECT COLUMN_NAME, IS_NULLABLE
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table_name,),
+    )
+    return dict(cursor.fetchall())
+
+
+def apply(conn):
+    cursor = conn.cursor()
+
+    schedule_columns = _columns(cursor, "meeting_schedules")
+    for column, statement in SCHEDULE_COLUMNS:
+        if column not in schedule_columns:
+            cursor.execute(statement)
+
+    attachment_columns = _columns(cursor, "meeting_attachments")
+    if "content_sha256" not in attachment_columns:
+        cursor.execute("ALTER TABLE meeting_attachments ADD COLUMN content_sha256 CHAR(64) NULL AFTER file_size")
+    if attachment_columns.get("file_data") == "NO":
+        # Content lives in the attachment store; file_data only holds rows
+        # that migrate_attachments.py has not moved out yet.
+        cursor.execute("ALTER TABLE meeting_attachments MODIFY file_data LONGBLOB NULL")
+
+    if "feed_token" not in _columns(cursor, "members"):
+        cursor.execute("ALTER TABLE members ADD COLUMN feed_token VARCHAR(64) NULL UNIQUE AFTER email")
+    cursor.execute("SELECT id FROM members WHERE feed_token IS NULL")
+    for (member_id,) in cursor.fetchall():
+        # Same format as member_feeds.new_feed_token().
+        cursor.execute("UPDATE members SET feed_token = %s WHERE id = %s", (secrets.token_urlsafe(24), member_id))
+
+    for table_name, index_name, columns in INDEXES:
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+            """,
+            (table_name, index_name),
+        )
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"ALTER TABLE {table_name} ADD INDEX {index_name} ({columns})")
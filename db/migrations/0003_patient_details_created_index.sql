@@ -0,0 +1,4 @@
+-- GET /api/patient-details streams patients newest first in keyset pages
+-- on (created_at, id); without this index every page sorts the table.
+ALTER TABLE meeting_patient_details
+  ADD INDEX idx_meeting_patient_details_created (created_at, id);
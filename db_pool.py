@@ -0,0 +1,225 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class PoolClosedError(Exception):
+    """Raised when a connection is requested from a pool that has been closed."""
+
+
+class PooledConnection:
+    """Proxy around a driver connection that returns it to the pool on close().
+
+    Handlers keep the existing ``conn = get_db_connection(); try: ... finally:
+    conn.close()`` shape; only ``close()`` changes meaning.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise AttributeError(f"Connection already returned to pool: {name}")
+        return getattr(raw, name)
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _ping(raw):
+    ping = getattr(raw, "ping", None)
+    if ping is not None:
+        ping(reconnect=False)
+    elif hasattr(raw, "is_connected") and not raw.is_connected():
+        raise ConnectionError("connection is not alive")
+
+
+def _rollback_and_reset(raw):
+    raw.rollback()
+    reset_session = getattr(raw, "reset_session", None)
+    if reset_session is not None:
+        reset_session()
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of database connections.
+
+    Args:
+        connect: Zero-argument callable returning a new driver connection.
+        size: Maximum number of open connections.
+        timeout: Seconds to wait for a free connection before PoolTimeoutError.
+        healthcheck_idle: Connections idle longer than this (seconds) are
+            pinged on checkout. 0 pings on every checkout.
+        max_lifetime: Connections older than this (seconds) are recycled.
+            0 disables recycling.
+        check: Callable raising if a connection is dead. Defaults to a
+            driver ping.
+        reset: Callable clearing per-use state when a connection is returned.
+            Defaults to rollback plus session reset.
+    """
+
+    def __init__(self, connect, size=10, timeout=5.0, healthcheck_idle=5.0, max_lifetime=1800.0,
+                 check=_ping, reset=_rollback_and_reset):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self._connect = connect
+        self._size = size
+        self._timeout = timeout
+        self._healthcheck_idle = healthcheck_idle
+        self._max_lifetime = max_lifetime
+        self._check = check
+        self._reset_connection = reset
+        self._idle = deque()
+        self._born = {}
+        self._open = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_seconds": 0.0,
+            "connects": 0,
+            "connect_errors": 0,
+            "healthcheck_failures": 0,
+            "reset_failures": 0,
+            "recycled": 0,
+        }
+
+    def acquire(self, timeout=None):
+        timeout = self._timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosedError("Connection pool is closed")
+                if self._idle:
+                    raw, idle_since = self._idle.pop()
+                    break
+                if self._open < self._size:
+                    self._open += 1
+                    raw, idle_since = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"No connection available within {timeout:g}s (pool size {self._size})"
+                    )
+                if not waited:
+                    waited = True
+                    self._stats["waits"] += 1
+                self._cond.wait(remaining)
+            if waited:
+                self._stats["wait_seconds"] += time.monotonic() - started
+
+        if raw is not None and not self._checkout_ok(raw, idle_since):
+            self._close_raw(raw)
+            raw = None
+
+        if raw is None:
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._stats["connect_errors"] += 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._born[id(raw)] = time.monotonic()
+                self._stats["connects"] += 1
+
+        with self._cond:
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+        return PooledConnection(self, raw)
+
+    def _checkout_ok(self, raw, idle_since):
+        now = time.monotonic()
+        born = self._born.get(id(raw), now)
+        if self._max_lifetime and now - born > self._max_lifetime:
+            with self._cond:
+                self._stats["recycled"] += 1
+            return False
+        if now - idle_since < self._healthcheck_idle:
+            return True
+        try:
+            self._check(raw)
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["healthcheck_failures"] += 1
+            return False
+
+    def _reset(self, raw):
+        try:
+            self._reset_connection(raw)
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["reset_failures"] += 1
+            return False
+
+    def _close_raw(self, raw):
+        with self._cond:
+            self._born.pop(id(raw), None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _release(self, raw):
+        healthy = not self._closed and self._reset(raw)
+        if not healthy:
+            self._close_raw(raw)
+        with self._cond:
+            self._in_use -= 1
+            if healthy and not self._closed:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+    def close(self):
+        """Close idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for raw in idle:
+            self._close_raw(raw)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "size": self._size,
+                    "open": self._open,
+                    "idle": len(self._idle),
+                    "in_use": self._in_use,
+                }
+            )
+        stats["wait_seconds"] = round(stats["wait_seconds"], 6)
+        return stats
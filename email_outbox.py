@@ -0,0 +1,281 @@
+import random
+import smtplib
+import threading
+
+from db_pool import ConnectionPool
+
+
+def open_smtp_session(settings):
+    """Open an authenticated SMTP session (implicit SSL on 465, STARTTLS otherwise)."""
+    if settings["port"] == 465:
+        session = smtplib.SMTP_SSL(settings["host"], settings["port"], timeout=10)
+    else:
+        session = smtplib.SMTP(settings["host"], settings["port"], timeout=10)
+        if settings["use_tls"]:
+            session.starttls()
+    session.login(settings["user"], settings["password"])
+    return session
+
+
+def _smtp_alive(session):
+    code, _ = session.noop()
+    if code != 250:
+        raise smtplib.SMTPServerDisconnected(f"NOOP returned {code}")
+
+
+def _smtp_reset(session):
+    session.rset()
+
+
+def create_smtp_pool(settings, size=2, healthcheck_idle=30.0, max_lifetime=600.0):
+    """Pool of reusable, already-authenticated SMTP sessions."""
+    return ConnectionPool(
+        lambda: open_smtp_session(settings),
+        size=size,
+        timeout=30.0,
+        healthcheck_idle=healthcheck_idle,
+        max_lifetime=max_lifetime,
+        check=_smtp_alive,
+        reset=_smtp_reset,
+    )
+
+
+def enqueue_messages(cursor, messages, meeting_id=None):
+    """Insert EmailMessage objects into the outbox using the caller's transaction.
+
+    The messages are only visible to the dispatcher once the caller commits.
+    """
+    rows = [
+        (meeting_id, str(msg["To"]), str(msg["Subject"])[:998], msg.as_bytes())
+        for msg in messages
+    ]
+    if rows:
+        cursor.executemany(
+            "INSERT INTO email_outbox (meeting_id, recipient, subject, message) VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+    return len(rows)
+
+
+def _is_permanent(error):
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+class OutboxStore:
+    """SQL access for the email_outbox table.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED and leased for
+    ``lease_seconds``, so several dispatchers (threads or pre-forked worker
+    processes) never send the same row twice. A lease that expires, e.g.
+    because the process died mid-batch, makes the row claimable again.
+
+    Due, lease and sent times all come from the database's NOW(), the same
+    clock as the next_attempt_at default, so the app and MySQL may run in
+    different time zones.
+    """
+
+    def __init__(self, get_connection, lease_seconds=300):
+        self._get_connection = get_connection
+        self._lease_seconds = int(lease_seconds)
+
+    def claim(self, limit):
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                """
+                SELECT id, recipient, message, attempts
+                FROM email_outbox
+                WHERE (status = 'Pending' AND next_attempt_at <= NOW())
+                   OR (status = 'Sending' AND locked_until < NOW())
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                (limit,),
+            )
+            rows = cursor.fetchall()
+            if rows:
+                ids = [row["id"] for row in rows]
+                placeholders = ", ".join(["%s"] * len(ids))
+                cursor.execute(
+                    f"UPDATE email_outbox SET status = 'Sending', locked_until = NOW() + INTERVAL %s SECOND "
+                    f"WHERE id IN ({placeholders})",
+                    (self._lease_seconds, *ids),
+                )
+            conn.commit()
+            return rows
+        finally:
+            conn.close()
+
+    def mark_sent(self, ids):
+        if not ids:
+            return
+        placeholders = ", ".join(["%s"] * len(ids))
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                UPDATE email_outbox
+                SET status = 'Sent', sent_at = NOW(), attempts = attempts + 1, locked_until = NULL, last_error = NULL
+                WHERE id IN ({placeholders})
+                """,
+                ids,
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def mark_failed(self, failures):
+        """Record failed attempts.
+
+        Args:
+            failures: Iterable of (id, status, retry_seconds, error) where
+                status is 'Pending' (retry ``retry_seconds`` from now) or
+                'Failed' (give up).
+        """
+        failures = list(failures)
+        if not failures:
+            return
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                UPDATE email_outbox
+                SET status = %s, next_attempt_at = NOW() + INTERVAL %s SECOND, attempts = attempts + 1,
+                    locked_until = NULL, last_error = %s
+                WHERE id = %s
+                """,
+                [
+                    (status, int(retry_seconds), error[:2000], row_id)
+                    for row_id, status, retry_seconds, error in failures
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class OutboxDispatcher:
+    """Background threads that drain the outbox over pooled SMTP sessions.
+
+    Each thread claims a batch, sends it over one SMTP session and records the
+    outcome. Failed sends are retried with exponential backoff (plus jitter)
+    until ``max_attempts``; 5xx responses other than auth errors fail at once.
+    """
+
+    def __init__(self, store, smtp_pool, sender, workers=2, batch_size=20, poll_interval=5.0,
+                 max_attempts=6, backoff_base=30.0, backoff_max=3600.0):
+        self.store = store
+        self.smtp_pool = smtp_pool
+        self.sender = sender
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._stats_lock = threading.Lock()
+        self._stats = {"batches": 0, "sent": 0, "retried": 0, "failed": 0, "errors": 0}
+
+    def start(self):
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"email-outbox-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=10.0):
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.smtp_pool.close()
+
+    def wake(self):
+        """Ask the dispatcher to look for new messages now instead of at the next poll."""
+        self._wake.set()
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _run(self):
+        while not self._stopping.is_set():
+            # Cleared before claiming so a wake() during the batch is not lost.
+            self._wake.clear()
+            try:
+                processed = self.dispatch_once()
+            except Exception as error:
+                print(f"[EMAIL OUTBOX] Dispatch failed: {error}")
+                self._count("errors")
+                processed = 0
+            if processed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+
+    def backoff(self, attempts):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** max(0, attempts - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    def dispatch_once(self):
+        """Claim and send one batch. Returns the number of rows claimed."""
+        rows = self.store.claim(self.batch_size)
+        if not rows:
+            return 0
+        self._count("batches")
+
+        sent = []
+        failures = []
+        session = None
+        for index, row in enumerate(rows):
+            if session is None:
+                try:
+                    session = self.smtp_pool.acquire()
+                except Exception as error:
+                    # Server unreachable or login refused: the rest of the batch would fail the same way.
+                    failures.extend(self._failure(pending, error) for pending in rows[index:])
+                    break
+            try:
+                session.sendmail(self.sender, [row["recipient"]], bytes(row["message"]))
+                sent.append(row["id"])
+            except Exception as error:
+                failures.append(self._failure(row, error))
+                broken = isinstance(error, smtplib.SMTPServerDisconnected) or (
+                    isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+                )
+                if broken:
+                    # Returning a broken session fails its reset, so the pool drops it.
+                    session.close()
+                    session = None
+        if session is not None:
+            session.close()
+
+        self.store.mark_sent(sent)
+        self.store.mark_failed(failures)
+        self._count("sent", len(sent))
+        return len(rows)
+
+    def _failure(self, row, error):
+        attempts = row["attempts"] + 1
+        message = f"{type(error).__name__}: {error}"
+        if _is_permanent(error) or attempts >= self.max_attempts:
+            self._count("failed")
+            print(f"[EMAIL OUTBOX] Giving up on message {row['id']} to {row['recipient']}: {message}")
+            return row["id"], "Failed", 0, message
+        self._count("retried")
+        return row["id"], "Pending", self.backoff(attempts), message
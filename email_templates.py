@@ -0,0 +1,88 @@
+import html
+import re
+from functools import lru_cache
+from pathlib import Path
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+class CompiledTemplate:
+    """A template split once into literal text and ``{{name}}`` slots.
+
+    partial() fills some slots and returns a new, smaller template, so values
+    shared by many renders (e.g. meeting details) are substituted and escaped
+    once and only the per-recipient slots are filled in render().
+    Values are HTML-escaped when ``autoescape`` is set.
+    """
+
+    __slots__ = ("literals", "fields", "autoescape")
+
+    def __init__(self, literals, fields, autoescape):
+        # Always one more literal than fields: lit0 field0 lit1 field1 ... litN
+        self.literals = literals
+        self.fields = fields
+        self.autoescape = autoescape
+
+    @classmethod
+    def compile(cls, source, autoescape=False):
+        literals = []
+        fields = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            literals.append(source[position:match.start()])
+            fields.append(match.group(1))
+            position = match.end()
+        literals.append(source[position:])
+        return cls(literals, fields, autoescape)
+
+    def _value(self, value):
+        text = "" if value is None else str(value)
+        return html.escape(text) if self.autoescape else text
+
+    def partial(self, values):
+        literals = [self.literals[0]]
+        fields = []
+        for name, literal in zip(self.fields, self.literals[1:]):
+            if name in values:
+                literals[-1] += self._value(values[name]) + literal
+            else:
+                fields.append(name)
+                literals.append(literal)
+        return CompiledTemplate(literals, fields, self.autoescape)
+
+    def render(self, values):
+        missing = [name for name in self.fields if name not in values]
+        if missing:
+            raise KeyError(f"Missing template value(s): {', '.join(sorted(set(missing)))}")
+        parts = [self.literals[0]]
+        for name, literal in zip(self.fields, self.literals[1:]):
+            parts.append(self._value(values[name]))
+            parts.append(literal)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=32)
+def get_template(name):
+    """Load and compile a template from the templates directory (cached per process).
+
+    Templates ending in ``.html`` are autoescaped.
+    """
+    source = (TEMPLATE_DIR / name).read_text(encoding="utf-8")
+    return CompiledTemplate.compile(source, autoescape=name.endswith(".html"))
+
+
+def meeting_template_values(meeting_payload):
+    """Meeting-level values shared by every email for one meeting."""
+    return {
+        "id": meeting_payload.get("id"),
+        "name": meeting_payload.get("name"),
+        "startsAt": meeting_payload.get("startsAt"),
+        "startTime": meeting_payload.get("startTime"),
+        "endTime": meeting_payload.get("endTime"),
+        "timezone": meeting_payload.get("timezone"),
+        "teamsJoinUrl": meeting_payload.get("teamsJoinUrl"),
+        "scheduleType": meeting_payload.get("scheduleType"),
+        "recurrenceRule": meeting_payload.get("recurrenceRule") or "N/A",
+        "recurrenceEndDate": meeting_payload.get("recurrenceEndDate") or "N/A",
+    }
@@ -0,0 +1,303 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+
+# Invitees with these responses are treated as booked for a meeting's occurrences.
+BUSY_STATUSES = ("Accept", "Pending")
+MAX_FREE_BUSY_RANGE_DAYS = 62
+MAX_FREE_BUSY_ATTENDEES = 100
+
+OCCURRENCES_QUERY = """
+    SELECT meeting_id, occurrence_start, occurrence_end
+    FROM meeting_occurrences
+    WHERE occurrence_start >= %s AND occurrence_start < %s
+"""
+# Invitees come from meeting_invites, which is always written, and their
+# status from meeting_invitee_responses, which only exists once invitation
+# emails were sent; an invitee without a response row counts as Pending.
+INVITES_QUERY = """
+    SELECT mi.meeting_id, mi.emails
+    FROM meeting_invites mi
+    WHERE EXISTS (
+        SELECT 1 FROM meeting_occurrences mo
+        WHERE mo.meeting_id = mi.meeting_id AND mo.occurrence_start >= %s AND mo.occurrence_start < %s
+    )
+"""
+RESPONSES_QUERY = """
+    SELECT mir.meeting_id, mir.invitee_email, mir.status
+    FROM meeting_invitee_responses mir
+    WHERE EXISTS (
+        SELECT 1 FROM meeting_occurrences mo
+        WHERE mo.meeting_id = mir.meeting_id AND mo.occurrence_start >= %s AND mo.occurrence_start < %s
+    )
+"""
+
+
+def split_emails(value):
+    """Lower-cased, de-duplicated addresses from a comma-separated string, in order."""
+    emails = []
+    for email in (value or "").split(","):
+        email = email.strip().lower()
+        if email and email not in emails:
+            emails.append(email)
+    return emails
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or touching (start, end) pairs; input must be sorted by start."""
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(interval) for interval in merged]
+
+
+class BusyIndex:
+    """In-memory busy intervals per attendee, for conflict checks and free/busy.
+
+    Each attendee has a list of (start, end, meeting_id) occurrences sorted
+    by start. Together with the attendee's longest occurrence that bounds
+    every overlap search to one bisect and a short forward scan, so checking
+    a new meeting never touches the database.
+
+    The index mirrors meeting_occurrences for the dates it covers
+    (``start`` to ``until``). It is rebuilt from the database with
+    rebuild(), grown with extend() when the occurrence horizon moves, and
+    kept current by add_meeting() and set_attendance() as this process
+    writes.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Writes seen while rebuild() reads the database, replayed onto the new index.
+        self._replay = None
+        self._reset(None, None)
+
+    def _reset(self, start, until):
+        self.start = start
+        self.until = until
+        self.built_at = None if start is None else self._clock()
+        self._occurrences = {}
+        self._attendees = {}
+        self._intervals = {}
+        self._longest = {}
+
+    @property
+    def loaded(self):
+        return self.start is not None
+
+    def age(self):
+        """Seconds since the last rebuild, or None before the first."""
+        return None if self.built_at is None else self._clock() - self.built_at
+
+    def rebuild(self, conn, start, until):
+        """Replace the index with the occurrences from ``start`` to ``until`` (dates, inclusive)."""
+        with self._lock:
+            self._replay = []
+        try:
+            occurrences, attendees = _load(conn, start, until)
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+        with self._lock:
+            replay, self._replay = self._replay, None
+            self._reset(start, until)
+            self._merge(occurrences, attendees)
+            for write, args in replay:
+                write(*args)
+
+    def extend(self, conn, until):
+        """Add the occurrences after the current ``until`` up to the new one."""
+        if not self.loaded or until <= self.until:
+            return
+        occurrences, attendees = _load(conn, self.until + timedelta(days=1), until)
+        with self._lock:
+            self._merge(occurrences, attendees)
+            self.until = until
+
+    def _merge(self, occurrences, attendees):
+        for meeting_id, intervals in occurrences.items():
+            known = meeting_id in self._occurrences
+            self._occurrences.setdefault(meeting_id, []).extend(intervals)
+            emails = self._attendees.setdefault(meeting_id, set())
+            if not known:
+                emails.update(attendees.get(meeting_id, ()))
+            for email in emails:
+                self._add(email, meeting_id, intervals)
+
+    def _add(self, email, meeting_id, intervals):
+        entries = self._intervals.setdefault(email, [])
+        for start, end in intervals:
+            insort(entries, (start, end, meeting_id))
+            if end - start > self._longest.get(email, timedelta(0)):
+                self._longest[email] = end - start
+
+    def add_meeting(self, meeting_id, intervals, emails):
+        """Record a just-committed meeting's occurrences for its invitees."""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((self._add_meeting, (meeting_id, intervals, emails)))
+            if self.loaded:
+                self._add_meeting(meeting_id, intervals, emails)
+
+    def _add_meeting(self, meeting_id, intervals, emails):
+        # A replayed write may find the meeting already loaded from the database.
+        for email in self._attendees.pop(meeting_id, ()):
+            self._remove(email, meeting_id)
+        intervals = [(start, end) for start, end in intervals if self.start <= start.date() <= self.until]
+        self._occurrences[meeting_id] = intervals
+        self._attendees[meeting_id] = set(emails)
+        for email in emails:
+            self._add(email, meeting_id, intervals)
+
+    def set_attendance(self, meeting_id, email, status):
+        """Apply a recorded response: busy statuses book the attendee, others free them."""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((self._set_attendance, (meeting_id, email.lower(), status)))
+            if self.loaded:
+                self._set_attendance(meeting_id, email.lower(), status)
+
+    def _set_attendance(self, meeting_id, email, status):
+        if meeting_id not in self._occurrences:
+            return
+        emails = self._attendees[meeting_id]
+        if status in BUSY_STATUSES and email not in emails:
+            emails.add(email)
+            self._add(email, meeting_id, self._occurrences[meeting_id])
+        elif status not in BUSY_STATUSES and email in emails:
+            emails.discard(email)
+            self._remove(email, meeting_id)
+
+    def _remove(self, email, meeting_id):
+        self._intervals[email] = [entry for entry in self._intervals.get(email, ()) if entry[2] != meeting_id]
+
+    def _overlapping(self, email, start, end):
+        entries = self._intervals.get(email)
+        if not entries:
+            return
+        # Nothing starting earlier than start - longest can still be running at start.
+        for position in range(bisect_left(entries, (start - self._longest[email],)), len(entries)):
+            entry = entries[position]
+            if entry[0] >= end:
+                return
+            if entry[1] > start:
+                yield entry
+
+    def conflicts(self, emails, intervals, exclude_meeting_id=None):
+        """Booked occurrences of ``emails`` that overlap any of ``intervals``.
+
+        Returns:
+            List of dicts with email, meetingId, start and end, ordered by
+            attendee and then start.
+        """
+        found = []
+        with self._lock:
+            for email in emails:
+                seen = set()
+                for start, end in intervals:
+                    for entry in self._overlapping(email, start, end):
+                        if entry[2] != exclude_meeting_id and entry not in seen:
+                            seen.add(entry)
+                            found.append(
+                                {"email": email, "meetingId": entry[2], "start": entry[0], "end": entry[1]}
+                            )
+        return found
+
+    def busy_blocks(self, email, start, end):
+        """Merged (start, end) blocks in which ``email`` is booked, clipped to the range."""
+        with self._lock:
+            intervals = [(max(s, start), min(e, end)) for s, e, _ in self._overlapping(email, start, end)]
+        intervals.sort()
+        return merge_intervals(intervals)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "attendees": len(self._intervals),
+                "meetings": len(self._occurrences),
+                "intervals": sum(len(entries) for entries in self._intervals.values()),
+                "from": self.start,
+                "until": self.until,
+            }
+
+
+def _load(conn, start, until):
+    """Occurrences and booked invitees for occurrences starting from ``start`` to ``until``."""
+    params = (start, until + timedelta(days=1))
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(OCCURRENCES_QUERY, params)
+    occurrences = {}
+    for row in cursor.fetchall():
+        occurrences.setdefault(row["meeting_id"], []).append((row["occurrence_start"], row["occurrence_end"]))
+
+    cursor.execute(INVITES_QUERY, params)
+    attendees = {}
+    for row in cursor.fetchall():
+        attendees.setdefault(row["meeting_id"], set()).update(split_emails(row["emails"]))
+    cursor.execute(RESPONSES_QUERY, params)
+    for row in cursor.fetchall():
+        emails = attendees.setdefault(row["meeting_id"], set())
+        if row["status"] in BUSY_STATUSES:
+            emails.add(row["invitee_email"].lower())
+        else:
+            emails.discard(row["invitee_email"].lower())
+    return occurrences, attendees
+
+
+def parse_free_busy_filters(get_param, today):
+    """Validate /api/free-busy query parameters.
+
+    Args:
+        get_param: Callable(name, default) returning a decoded query parameter
+        today: Current date; the index holds no occurrences before it
+
+    Returns:
+        Dict with emails (list), start and end (inclusive dates).
+
+    Raises:
+        ValueError: With a message suitable for a 400 response.
+    """
+    emails = split_emails(get_param("emails", ""))
+    if not emails:
+        raise ValueError("emails is required (comma-separated).")
+    if len(emails) > MAX_FREE_BUSY_ATTENDEES:
+        raise ValueError(f"At most {MAX_FREE_BUSY_ATTENDEES} emails per request.")
+    filters = {"emails": emails}
+    for param, key in (("from", "start"), ("to", "end")):
+        value = get_param(param, "")
+        if not value:
+            raise ValueError(f"{param} is required (YYYY-MM-DD).")
+        try:
+            filters[key] = date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"{param} must be a date (YYYY-MM-DD).") from None
+    if filters["end"] < filters["start"]:
+        raise ValueError("to must not be before from.")
+    if filters["start"] < today:
+        raise ValueError("from must not be in the past.")
+    if (filters["end"] - filters["start"]).days >= MAX_FREE_BUSY_RANGE_DAYS:
+        raise ValueError(f"The range may span at most {MAX_FREE_BUSY_RANGE_DAYS} days.")
+    return filters
+
+
+def free_busy(index, filters):
+    """Busy blocks per requested attendee in API shape."""
+    start = datetime.combine(filters["start"], datetime.min.time())
+    end = datetime.combine(filters["end"] + timedelta(days=1), datetime.min.time())
+    return {
+        "from": filters["start"].isoformat(),
+        "to": filters["end"].isoformat(),
+        "attendees": {
+            email: [
+                {"start": block_start.isoformat(), "end": block_end.isoformat()}
+                for block_start, block_end in index.busy_blocks(email, start, end)
+            ]
+            for email in filters["emails"]
+        },
+    }
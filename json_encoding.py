@@ -0,0 +1,66 @@
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json
+    orjson = None
+
+# Items per chunk when a JSON array is streamed.
+STREAM_CHUNK_ITEMS = 500
+
+# Column types MySQL hands back that JSON has no type for. Dates and times
+# are ISO 8601; TIME columns arrive as timedelta and keep str()'s "8:00:00".
+_CONVERSIONS = {
+    date: date.isoformat,
+    datetime: datetime.isoformat,
+    time: time.isoformat,
+    timedelta: str,
+    Decimal: str,
+}
+
+
+def _default(value):
+    return _CONVERSIONS.get(type(value), str)(value)
+
+
+def encoder_name():
+    return "orjson" if orjson is not None else "json"
+
+
+def dumps(data):
+    """Encode ``data`` to compact UTF-8 JSON bytes.
+
+    orjson is used when installed; it writes date, datetime and time
+    itself and only calls back for timedelta and Decimal. The stdlib
+    fallback produces the same text.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iter_json_array(items, chunk_items=STREAM_CHUNK_ITEMS):
+    """Encode an iterable as a JSON array in pieces of ``chunk_items`` elements.
+
+    Joined, the pieces equal dumps(list(items)). Items are pulled as they
+    are encoded, so a generator reading from the database is never held
+    in memory as a whole, and neither is the encoded output.
+    """
+    items = iter(items)
+    batch = list(islice(items, chunk_items))
+    if not batch:
+        yield b"[]"
+        return
+    opening = b"["
+    while batch:
+        # One batch of look-ahead tells whether this piece closes the array.
+        following = list(islice(items, chunk_items))
+        # Each batch is encoded as an array and its brackets swapped for the
+        # separators of the whole array.
+        piece = dumps(batch)
+        yield opening + piece[1:-1] + (b"" if following else b"]")
+        opening = b","
+        batch = following
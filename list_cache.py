@@ -0,0 +1,140 @@
+import hashlib
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+import zlib
+
+from rsvp import TTLCache
+
+
+class LocalCacheVersions:
+    """Version counters for cache dependencies, private to this process."""
+
+    name = "local"
+
+    def __init__(self):
+        self._token = secrets.token_hex(8)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    @property
+    def scope(self):
+        """Identifies whose counters these are; forked workers each count their own writes."""
+        return f"{self._token}-{os.getpid()}"
+
+    def get(self, names):
+        with self._lock:
+            return tuple(self._versions.get(name, 0) for name in names)
+
+    def bump(self, names):
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+
+class SharedCacheVersions:
+    """Version counters in shared memory, seen by every process forked after creation.
+
+    Dependency names are hashed into ``slots`` counters. Two names sharing a
+    slot only cost each other a few extra misses.
+    """
+
+    name = "shared"
+
+    def __init__(self, slots=65536):
+        # Inherited by every worker forked from this process, like the counters.
+        self.scope = secrets.token_hex(8)
+        self._slots = multiprocessing.Array("Q", slots)
+
+    def _slot(self, name):
+        return zlib.crc32(name.encode("utf-8")) % len(self._slots)
+
+    def get(self, names):
+        return tuple(self._slots[self._slot(name)] for name in names)
+
+    def bump(self, names):
+        # The lock is shared too: two workers bumping the same slot must not
+        # both write the same new value.
+        with self._slots.get_lock():
+            for name in names:
+                self._slots[self._slot(name)] += 1
+
+
+CACHE_VERSION_BACKENDS = {
+    "local": LocalCacheVersions,
+    "shared": SharedCacheVersions,
+}
+
+
+def create_cache_versions(backend, **options):
+    try:
+        versions_class = CACHE_VERSION_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown cache version backend {backend!r}; expected one of {', '.join(CACHE_VERSION_BACKENDS)}."
+        ) from None
+    return versions_class(**options)
+
+
+class ListCache:
+    """Read-through cache for list endpoints, invalidated by version bumps.
+
+    Every entry is keyed by the versions of what it depends on, read before
+    the database is. A write bumps the names it changed after committing,
+    which makes every entry built from older data unreachable; those age
+    out of the LRU/TTL store. A read racing a write therefore stores its
+    result under the old versions, where no later read looks.
+
+    Entries stay per process. Only the versions need to be shared for
+    several workers to see each other's invalidations.
+    """
+
+    def __init__(self, ttl, max_entries=1000, versions=None, clock=time.monotonic):
+        self.versions = versions if versions is not None else LocalCacheVersions()
+        self._ttl = ttl
+        self._clock = clock
+        self._entries = TTLCache(ttl, max_entries, clock)
+        self.invalidations = 0
+
+    def key(self, name, params=(), depends_on=()):
+        """Key for ``name`` with ``params``, valid until any of ``depends_on`` is invalidated."""
+        return (name, params, self.versions.get(depends_on))
+
+    def etag(self, key):
+        """Strong ETag for a response built under ``key``, without hashing the body.
+
+        It changes whenever one of the key's dependencies is invalidated,
+        and differs between processes that keep separate versions. Local
+        versions never see another worker's writes, so their tags also roll
+        over every ``ttl`` seconds; a revalidating client then gets the
+        current entry, which is itself at most ``ttl`` old.
+        """
+        scope = self.versions.scope
+        if self.versions.name == "local":
+            scope = (scope, int(self._clock() // self._ttl))
+        digest = hashlib.sha256(repr((scope, key)).encode("utf-8")).hexdigest()
+        return f'"{digest[:32]}"'
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value):
+        self._entries.set(key, value)
+
+    def get_or_load(self, key, load):
+        """Cached value for ``key``, or ``load()`` stored under it. Values must not be modified."""
+        value = self._entries.get(key)
+        if value is None:
+            value = load()
+            self._entries.set(key, value)
+        return value
+
+    def invalidate(self, *names):
+        """Call after the write commits."""
+        self.versions.bump(names)
+        self.invalidations += len(names)
+
+    def stats(self):
+        return {**self._entries.stats(), "invalidations": self.invalidations, "versions": self.versions.name}
@@ -0,0 +1,383 @@
+import base64
+import json
+from datetime import date
+
+from recurrence import parse_exdates
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_SEARCH_LENGTH = 255
+DEFAULT_OPTIONS_LIMIT = 20
+SCHEDULE_TYPES = ("one-time", "recurring")
+MEETING_COLUMNS = """me.id, me.name,
+               ms.starts_at, ms.start_time, ms.end_time, ms.timezone,
+               ms.teams_join_url, ms.schedule_type, ms.recurrence_rule, ms.recurrence_end_date,
+               ms.recurrence_exdates"""
+
+
+def encode_cursor(row):
+    """Opaque cursor for the (starts_at, start_time, id) position of a listed meeting."""
+    position = [str(row["startsAt"]), str(row["startTime"]), int(row["id"])]
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        starts_at, start_time, meeting_id = json.loads(base64.urlsafe_b64decode(padded))
+        date.fromisoformat(starts_at)
+        return starts_at, str(start_time), int(meeting_id)
+    except Exception:
+        raise ValueError("Invalid cursor.") from None
+
+
+def parse_meeting_filters(get_param):
+    """Validate /api/meetings query parameters.
+
+    Args:
+        get_param: Callable(name, default) returning a raw query parameter
+
+    Returns:
+        Dict with limit, after (decoded cursor or None), dateFrom, dateTo,
+        scheduleType, teamId, and the name, patientName and mrn substring
+        searches (None when not given).
+
+    Raises:
+        ValueError: With a message suitable for a 400 response.
+    """
+    limit_raw = get_param("limit", "")
+    try:
+        limit = int(limit_raw) if limit_raw else DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise ValueError("limit must be an integer.") from None
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+
+    filters = {
+        "limit": limit,
+        "after": None,
+        "dateFrom": None,
+        "dateTo": None,
+        "scheduleType": None,
+        "teamId": None,
+        "name": None,
+        "patientName": None,
+        "mrn": None,
+    }
+
+    cursor = get_param("cursor", "")
+    if cursor:
+        filters["after"] = decode_cursor(cursor)
+
+    for param, key in (("from", "dateFrom"), ("to", "dateTo")):
+        value = get_param(param, "")
+        if value:
+            try:
+                filters[key] = date.fromisoformat(value).isoformat()
+            except ValueError:
+                raise ValueError(f"{param} must be a date (YYYY-MM-DD).") from None
+
+    schedule_type = get_param("scheduleType", "")
+    if schedule_type:
+        if schedule_type not in SCHEDULE_TYPES:
+            raise ValueError("scheduleType must be one-time or recurring.")
+        filters["scheduleType"] = schedule_type
+
+    team_id = get_param("teamId", "")
+    if team_id:
+        try:
+            filters["teamId"] = int(team_id)
+        except ValueError:
+            raise ValueError("teamId must be an integer.") from None
+
+    for param in ("name", "patientName", "mrn"):
+        filters[param] = _search_term(get_param, param)
+
+    return filters
+
+
+def _search_term(get_param, param):
+    value = get_param(param, "").strip()
+    if len(value) > MAX_SEARCH_LENGTH:
+        raise ValueError(f"{param} must be at most {MAX_SEARCH_LENGTH} characters.")
+    return value or None
+
+
+def _contains(value):
+    """LIKE pattern matching ``value`` anywhere, with its wildcards escaped."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def build_meeting_page_query(filters, columns=MEETING_COLUMNS):
+    """SELECT for one page of meetings, newest first, using keyset pagination.
+
+    Fetches ``limit + 1`` rows so the caller can tell whether another page
+    exists. The ORDER BY matches idx_meeting_schedules_start /
+    idx_meeting_schedules_type_start so a page is an index range scan.
+
+    Returns:
+        Tuple (sql: str, params: list)
+    """
+    conditions = []
+    params = []
+
+    if filters["scheduleType"]:
+        conditions.append("ms.schedule_type = %s")
+        params.append(filters["scheduleType"])
+    if filters["dateFrom"]:
+        conditions.append("ms.starts_at >= %s")
+        params.append(filters["dateFrom"])
+    if filters["dateTo"]:
+        conditions.append("ms.starts_at <= %s")
+        params.append(filters["dateTo"])
+    if filters["after"]:
+        starts_at, start_time, meeting_id = filters["after"]
+        # Expanded row comparison: MySQL only uses the index for this form.
+        conditions.append(
+            "(ms.starts_at < %s OR (ms.starts_at = %s AND (ms.start_time < %s"
+            " OR (ms.start_time = %s AND ms.meeting_id < %s))))"
+        )
+        params.extend([starts_at, starts_at, start_time, start_time, meeting_id])
+    if filters["teamId"]:
+        # Invitees are in meeting_invites for every meeting;
+        # meeting_invitee_responses only has rows once invitation emails
+        # were sent, so it would miss meetings created with email off.
+        conditions.append(
+            """EXISTS (
+                SELECT 1
+                FROM meeting_invites mi
+                JOIN team_members tm ON tm.team_id = %s
+                JOIN members m ON m.id = tm.member_id
+                WHERE mi.meeting_id = ms.meeting_id AND FIND_IN_SET(m.email, REPLACE(mi.emails, ' ', ''))
+            )"""
+        )
+        params.append(filters["teamId"])
+    # Substring searches follow the column collation, case-insensitive by
+    # default. Patient name and MRN must match the same patient.
+    if filters["name"]:
+        conditions.append("me.name LIKE %s")
+        params.append(_contains(filters["name"]))
+    if filters["patientName"] or filters["mrn"]:
+        patient_conditions = []
+        for key, column in (("patientName", "mpd.patient_name"), ("mrn", "mpd.medical_record_number")):
+            if filters[key]:
+                patient_conditions.append(f"{column} LIKE %s")
+                params.append(_contains(filters[key]))
+        conditions.append(
+            f"""EXISTS (
+                SELECT 1
+                FROM meeting_patient_details mpd
+                WHERE mpd.meeting_id = ms.meeting_id AND {' AND '.join(patient_conditions)}
+            )"""
+        )
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""
+        SELECT {columns}
+        FROM meeting_schedules ms
+        JOIN meetings me ON me.id = ms.meeting_id
+        {where}
+        ORDER BY ms.starts_at DESC, ms.start_time DESC, ms.meeting_id DESC
+        LIMIT %s
+    """
+    params.append(filters["limit"] + 1)
+    return sql, params
+
+
+def _in_clause(ids):
+    return ", ".join(["%s"] * len(ids))
+
+
+def fetch_meeting_page(conn, filters):
+    """Load one page of meetings with their patients, attachments, invitees and RSVPs.
+
+    One query selects the page; each child table is then read with a single
+    ``WHERE meeting_id IN (...)`` query and attached in Python. This avoids
+    the cartesian row explosion of joining every child table at once and the
+    group_concat_max_len truncation and delimiter parsing that came with it.
+
+    Returns:
+        Tuple (meetings: list of dicts in API shape, has_more: bool)
+    """
+    page_query, params = build_meeting_page_query(filters)
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(page_query, params)
+    page = cursor.fetchall()
+    has_more = len(page) > filters["limit"]
+    page = page[:filters["limit"]]
+    if not page:
+        return [], False
+    return _assemble_meetings(cursor, page), has_more
+
+
+def fetch_meeting_page_ids(conn, filters):
+    """Ids of one page of meetings, for callers that cache the meetings themselves.
+
+    Returns:
+        Tuple (meeting ids in page order, has_more: bool)
+    """
+    page_query, params = build_meeting_page_query(filters, columns="ms.meeting_id AS id")
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(page_query, params)
+    ids = [row["id"] for row in cursor.fetchall()]
+    return ids[:filters["limit"]], len(ids) > filters["limit"]
+
+
+def fetch_meeting_options(conn, search="", limit=DEFAULT_OPTIONS_LIMIT):
+    """Id, name and start of the newest meetings matching ``search``, for pickers.
+
+    ``search`` matches the name anywhere, or the id exactly when it is a
+    number (optionally written "#12").
+    """
+    conditions = []
+    params = []
+    search = search.strip()
+    if search:
+        match = [("me.name LIKE %s", _contains(search))]
+        if search.lstrip("#").isdigit():
+            match.append(("me.id = %s", int(search.lstrip("#"))))
+        conditions.append("(" + " OR ".join(condition for condition, _ in match) + ")")
+        params.extend(value for _, value in match)
+    where = f"WHERE {conditions[0]}" if conditions else ""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(
+        f"""
+        SELECT me.id, me.name, ms.starts_at
+        FROM meeting_schedules ms
+        JOIN meetings me ON me.id = ms.meeting_id
+        {where}
+        ORDER BY ms.starts_at DESC, ms.start_time DESC, ms.meeting_id DESC
+        LIMIT %s
+        """,
+        params + [limit],
+    )
+    return [{"id": row["id"], "name": row["name"], "startsAt": row["starts_at"]} for row in cursor.fetchall()]
+
+
+def fetch_meetings_by_id(conn, meeting_ids):
+    """Meetings in the same shape as fetch_meeting_page(), e.g. to publish one that just changed."""
+    if not meeting_ids:
+        return []
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(
+        f"""
+        SELECT {MEETING_COLUMNS}
+        FROM meeting_schedules ms
+        JOIN meetings me ON me.id = ms.meeting_id
+        WHERE ms.meeting_id IN ({_in_clause(meeting_ids)})
+        ORDER BY ms.starts_at DESC, ms.start_time DESC, ms.meeting_id DESC
+        """,
+        list(meeting_ids),
+    )
+    rows = cursor.fetchall()
+    return _assemble_meetings(cursor, rows) if rows else []
+
+
+def _assemble_meetings(cursor, page):
+    meetings = {}
+    for row in page:
+        meetings[row["id"]] = {
+            "id": row["id"],
+            "name": row["name"],
+            "patients": [],
+            "attachments": [],
+            "attachmentCount": 0,
+            "attachmentNames": None,
+            "invitees": None,
+            "responses": {},
+            "startsAt": row["starts_at"],
+            "startTime": row["start_time"],
+            "endTime": row["end_time"],
+            "timezone": row["timezone"],
+            "teamsJoinUrl": row["teams_join_url"],
+            "scheduleType": row["schedule_type"],
+            "recurrenceRule": row["recurrence_rule"],
+            "recurrenceEndDate": row["recurrence_end_date"],
+            "recurrenceExceptions": list(parse_exdates(row["recurrence_exdates"])),
+        }
+    ids = list(meetings)
+    placeholders = _in_clause(ids)
+
+    cursor.execute(
+        f"""
+        SELECT id, meeting_id, patient_name, medical_record_number, patient_date_of_birth,
+               doctor_name, department_name, meeting_agenda_note, patient_description
+        FROM meeting_patient_details
+        WHERE meeting_id IN ({placeholders})
+        ORDER BY meeting_id, patient_name, id
+        """,
+        ids,
+    )
+    for row in cursor.fetchall():
+        meetings[row["meeting_id"]]["patients"].append(
+            {
+                "patientDetailId": row["id"],
+                "patientName": row["patient_name"],
+                "medicalRecordNumber": row["medical_record_number"],
+                "patientDateOfBirth": row["patient_date_of_birth"],
+                "doctorName": row["doctor_name"],
+                "departmentName": row["department_name"],
+                "meetingAgendaNote": row["meeting_agenda_note"] or None,
+                "patientDescription": row["patient_description"] or None,
+            }
+        )
+
+    # Only metadata: file_data is never read for the listing.
+    cursor.execute(
+        f"""
+        SELECT id, meeting_id, file_name, file_type, file_size
+        FROM meeting_attachments
+        WHERE meeting_id IN ({placeholders})
+        ORDER BY meeting_id, file_name, id
+        """,
+        ids,
+    )
+    attachment_names = {}
+    for row in cursor.fetchall():
+        meetings[row["meeting_id"]]["attachmentCount"] += 1
+        meetings[row["meeting_id"]]["attachments"].append(
+            {
+                "id": row["id"],
+                "fileName": row["file_name"],
+                "fileType": row["file_type"],
+                "fileSize": row["file_size"],
+            }
+        )
+        names = attachment_names.setdefault(row["meeting_id"], [])
+        if not names or names[-1] != row["file_name"]:
+            names.append(row["file_name"])
+    for meeting_id, names in attachment_names.items():
+        meetings[meeting_id]["attachmentNames"] = ", ".join(names)
+
+    cursor.execute(
+        f"""
+        SELECT meeting_id, emails
+        FROM meeting_invites
+        WHERE meeting_id IN ({placeholders})
+        ORDER BY meeting_id, id
+        """,
+        ids,
+    )
+    invitees = {}
+    for row in cursor.fetchall():
+        emails = invitees.setdefault(row["meeting_id"], [])
+        if row["emails"] not in emails:
+            emails.append(row["emails"])
+    for meeting_id, emails in invitees.items():
+        meetings[meeting_id]["invitees"] = "; ".join(emails)
+
+    cursor.execute(
+        f"""
+        SELECT meeting_id, invitee_email, status
+        FROM meeting_invitee_responses
+        WHERE meeting_id IN ({placeholders})
+        ORDER BY meeting_id, invitee_email
+        """,
+        ids,
+    )
+    for row in cursor.fetchall():
+        meetings[row["meeting_id"]]["responses"][row["invitee_email"]] = row["status"]
+
+    return list(meetings.values())
@@ -0,0 +1,112 @@
+import hashlib
+import secrets
+import threading
+import time
+from datetime import timezone
+from email.utils import format_datetime
+
+from rsvp import TTLCache
+
+# iCalendar PARTSTAT of the member for each meeting_invitee_responses status;
+# invitees without a response row have not answered yet.
+PARTSTATS = {"Accept": "ACCEPTED", "Tentative": "TENTATIVE", "Pending": "NEEDS-ACTION", None: "NEEDS-ACTION"}
+
+MEMBER_BY_FEED_TOKEN_QUERY = "SELECT id, full_name AS fullName, email FROM members WHERE feed_token = %s"
+
+# Declined meetings are left out. Invitees are in meeting_invites for every
+# meeting and in meeting_invitee_responses once invitation emails went out.
+FEED_MEETINGS_QUERY = """
+    SELECT me.id, me.name, me.created_at AS createdAt,
+           ms.starts_at AS startsAt, ms.start_time AS startTime, ms.end_time AS endTime, ms.timezone,
+           ms.schedule_type AS scheduleType, ms.recurrence_rule AS recurrenceRule,
+           ms.recurrence_end_date AS recurrenceEndDate, ms.recurrence_exdates AS recurrenceExceptions,
+           ms.teams_join_url AS teamsJoinUrl,
+           mir.status AS responseStatus, mir.responded_at AS respondedAt
+    FROM meetings me
+    JOIN meeting_schedules ms ON ms.meeting_id = me.id
+    LEFT JOIN meeting_invitee_responses mir ON mir.meeting_id = me.id AND mir.invitee_email = %s
+    WHERE (mir.id IS NOT NULL
+           OR EXISTS (
+               SELECT 1 FROM meeting_invites mi
+               WHERE mi.meeting_id = me.id AND FIND_IN_SET(%s, REPLACE(mi.emails, ' ', ''))
+           ))
+      AND (mir.status IS NULL OR mir.status <> 'Decline')
+    ORDER BY ms.starts_at, ms.start_time, me.id
+"""
+
+
+def new_feed_token():
+    """Unguessable token that identifies a member's feed URL."""
+    return secrets.token_urlsafe(24)
+
+
+def feed_url(token):
+    return f"/api/feeds/{token}.ics"
+
+
+def fetch_feed_meetings(conn, email):
+    """Meetings ``email`` is invited to and has not declined, oldest first."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(FEED_MEETINGS_QUERY, (email, email))
+    return cursor.fetchall()
+
+
+def feed_last_modified(meetings):
+    """Latest creation or response time among the feed's meetings, or None.
+
+    DATETIME columns carry no zone; they are read as UTC, which keeps the
+    value stable even if it is off by the database's UTC offset.
+    """
+    times = [meeting["createdAt"] for meeting in meetings] + [
+        meeting["respondedAt"] for meeting in meetings if meeting.get("respondedAt")
+    ]
+    latest = max(times, default=None)
+    return latest.replace(tzinfo=timezone.utc) if latest else None
+
+
+class MemberFeed:
+    """One member's rendered calendar feed with its validators."""
+
+    def __init__(self, email, body, last_modified):
+        self.email = email
+        self.body = body
+        # The body only changes with the meetings, so the ETag is the same
+        # in every process and after every rebuild.
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.last_modified = last_modified
+        self.last_modified_header = format_datetime(last_modified, usegmt=True) if last_modified else None
+
+
+class FeedCache:
+    """Rendered member feeds by feed token.
+
+    Entries expire after ``ttl`` seconds, which bounds how long a change
+    made by another worker process goes unseen. Writes in this process
+    drop the affected members' entries right away with invalidate().
+    """
+
+    def __init__(self, ttl, max_entries=10000, clock=time.monotonic):
+        self._feeds = TTLCache(ttl, max_entries, clock)
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self.invalidations = 0
+
+    def get(self, token):
+        return self._feeds.get(token)
+
+    def set(self, token, feed):
+        with self._lock:
+            self._tokens[feed.email] = token
+        self._feeds.set(token, feed)
+
+    def invalidate(self, emails):
+        """Drop the feeds of the members with these addresses."""
+        with self._lock:
+            tokens = [self._tokens.pop(email.lower(), None) for email in emails]
+        for token in tokens:
+            if token is not None:
+                self._feeds.invalidate(token)
+                self.invalidations += 1
+
+    def stats(self):
+        return {**self._feeds.stats(), "invalidations": self.invalidations}
@@ -0,0 +1,78 @@
+"""Move attachment content out of meeting_attachments.file_data into the attachment store.
+
+Rows are processed in batches of --batch-size: each blob is read on its own,
+written to the store, referenced in attachment_blobs, and the row's file_data
+is cleared; every batch is one transaction. Safe to stop and re-run.
+
+Run: python migrate_attachments.py [--batch-size 50] [--gc]
+Run OPTIMIZE TABLE meeting_attachments afterwards to give the space back.
+"""
+import argparse
+import hashlib
+import time
+
+from app import get_attachment_store, get_db_connection
+from attachment_store import add_reference, collect_garbage
+
+
+def migrate_batch(conn, store, batch_size):
+    """Move up to ``batch_size`` blobs. Returns (rows moved, bytes moved)."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id FROM meeting_attachments WHERE file_data IS NOT NULL ORDER BY id LIMIT %s",
+        (batch_size,),
+    )
+    ids = [row[0] for row in cursor.fetchall()]
+    moved_bytes = 0
+    for attachment_id in ids:
+        cursor.execute(
+            "SELECT file_data FROM meeting_attachments WHERE id = %s AND file_data IS NOT NULL FOR UPDATE",
+            (attachment_id,),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            continue
+        data = bytes(row[0])
+        sha256 = hashlib.sha256(data).hexdigest()
+        add_reference(cursor, sha256, len(data))
+        store.put_bytes(data)
+        cursor.execute(
+            """
+            UPDATE meeting_attachments
+            SET content_sha256 = %s, file_size = %s, file_data = NULL
+            WHERE id = %s
+            """,
+            (sha256, len(data), attachment_id),
+        )
+        moved_bytes += len(data)
+    conn.commit()
+    return len(ids), moved_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--gc", action="store_true", help="also remove content no attachment references")
+    args = parser.parse_args()
+
+    store = get_attachment_store()
+    conn = get_db_connection()
+    try:
+        total_rows = total_bytes = 0
+        started = time.monotonic()
+        while True:
+            rows, moved = migrate_batch(conn, store, args.batch_size)
+            if not rows:
+                break
+            total_rows += rows
+            total_bytes += moved
+            print(f"[MIGRATE] {total_rows} attachments, {total_bytes / 1024 / 1024:.1f} MB moved")
+        print(f"[MIGRATE] Done in {time.monotonic() - started:.1f}s: {total_rows} attachments moved to the store.")
+        if args.gc:
+            print(f"[MIGRATE] Garbage collection: {collect_garbage(conn, store)}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Apply pending schema migrations from db/migrations.
+
+Each migration runs once, in version order, and is recorded in
+schema_migrations with its checksum and run time. Databases created before
+migrations existed are brought up to date by 0002 without losing data.
+The server only checks that nothing is pending; it does not change the schema
+unless started with --migrate.
+
+Run: python migrate_schema.py [--status]
+"""
+import argparse
+
+from app import get_db_connection
+from migrations import MigrationError, apply_migrations, applied_migrations, load_migrations, migration_status
+
+
+def print_status(conn, migrations):
+    status = migration_status(migrations, applied_migrations(conn))
+    pending = {migration.version for migration in status["pending"]}
+    changed = {migration.version for migration in status["changed"]}
+    for migration in migrations:
+        state = "pending" if migration.version in pending else "CHANGED" if migration.version in changed else "applied"
+        print(f"[MIGRATE] {state:<8} {migration.path.name}")
+    for version in status["unknown"]:
+        print(f"[MIGRATE] unknown  {version:04d} (applied, no file in this checkout)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations without applying")
+    args = parser.parse_args()
+
+    migrations = load_migrations()
+    conn = get_db_connection()
+    try:
+        if args.status:
+            print_status(conn, migrations)
+            return
+        applied = apply_migrations(conn, migrations)
+    except MigrationError as error:
+        raise SystemExit(f"[MIGRATE] {error}")
+    finally:
+        conn.close()
+    print(f"[MIGRATE] {len(applied)} migration(s) applied, schema at version {migrations[-1].version:04d}")
+
+
+if __name__ == "__main__":
+    main()
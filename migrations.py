@@ -0,0 +1,208 @@
+import hashlib
+import importlib.util
+import re
+import time
+from pathlib import Path
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "db" / "migrations"
+# NNNN_description.sql, or NNNN_description.py with an apply(conn) function
+# for changes plain SQL cannot make conditionally.
+MIGRATION_FILE_RE = re.compile(r"^(?P<version>\d{4})_(?P<name>[a-z0-9_]+)\.(?P<kind>sql|py)$")
+ER_NO_SUCH_TABLE = 1146
+# Serializes concurrent migrate runs against one database.
+MIGRATION_LOCK_NAME = "schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 60
+
+SCHEMA_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+      version INT PRIMARY KEY,
+      name VARCHAR(255) NOT NULL,
+      checksum CHAR(64) NOT NULL,
+      execution_ms INT NOT NULL,
+      applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+class MigrationError(Exception):
+    """The migration files or the database's migration history are inconsistent."""
+
+
+class SchemaOutOfDateError(MigrationError):
+    """The database lacks migrations this code expects; run migrate_schema.py."""
+
+
+class Migration:
+    """One numbered migration file."""
+
+    def __init__(self, path):
+        match = MIGRATION_FILE_RE.match(path.name)
+        self.path = path
+        self.version = int(match.group("version"))
+        self.name = match.group("name")
+        self.kind = match.group("kind")
+        # Line endings are normalized so a Windows checkout has the same checksum.
+        self.checksum = hashlib.sha256(path.read_bytes().replace(b"\r\n", b"\n")).hexdigest()
+
+    def __repr__(self):
+        return f"<Migration {self.version:04d}_{self.name}.{self.kind}>"
+
+    def apply(self, conn):
+        if self.kind == "sql":
+            cursor = conn.cursor()
+            for statement in split_sql(self.path.read_text(encoding="utf-8")):
+                cursor.execute(statement)
+            conn.commit()
+            return
+        spec = importlib.util.spec_from_file_location(f"migration_{self.version:04d}", self.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.apply(conn)
+        conn.commit()
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """Migrations in ``directory`` ordered by version.
+
+    Raises:
+        MigrationError: Two files share a version number.
+    """
+    migrations = {}
+    for path in sorted(Path(directory).iterdir()):
+        if not MIGRATION_FILE_RE.match(path.name):
+            continue
+        migration = Migration(path)
+        if migration.version in migrations:
+            raise MigrationError(f"Migrations {migrations[migration.version].path.name} and {path.name} share a version.")
+        migrations[migration.version] = migration
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def split_sql(text):
+    """Statements of an SQL script, split on semicolons outside quotes and comments."""
+    statements = []
+    current = []
+    quote = None
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if quote:
+            current.append(char)
+            if char == "\\" and quote != "`" and index + 1 < len(text):
+                current.append(text[index + 1])
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+            current.append(char)
+        elif text.startswith("--", index) or char == "#":
+            index = text.find("\n", index)
+            if index == -1:
+                break
+            current.append("\n")
+        elif text.startswith("/*", index):
+            end = text.find("*/", index + 2)
+            index = len(text) if end == -1 else end + 1
+            current.append(" ")
+        elif char == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        index += 1
+    statements.append("".join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+def applied_migrations(conn):
+    """{version: checksum} recorded in schema_migrations; empty if the table does not exist."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT version, checksum FROM schema_migrations ORDER BY version")
+    except Exception as error:
+        if getattr(error, "errno", None) == ER_NO_SUCH_TABLE:
+            return {}
+        raise
+    return dict(cursor.fetchall())
+
+
+def migration_status(migrations, applied):
+    """Compare migration files with the database's history.
+
+    Returns:
+        Dict with pending (migrations not applied yet), changed (applied
+        ones whose file has been edited since) and unknown (versions the
+        database has but these files do not, i.e. the code is older).
+    """
+    known = {migration.version for migration in migrations}
+    return {
+        "pending": [migration for migration in migrations if migration.version not in applied],
+        "changed": [
+            migration for migration in migrations
+            if migration.version in applied and applied[migration.version] != migration.checksum
+        ],
+        "unknown": sorted(version for version in applied if version not in known),
+    }
+
+
+def _check_history(status):
+    if status["changed"]:
+        names = ", ".join(migration.path.name for migration in status["changed"])
+        raise MigrationError(f"Applied migrations were edited afterwards: {names}. Add a new migration instead.")
+
+
+def check_schema(conn, migrations):
+    """Startup check: one query against schema_migrations.
+
+    Returns:
+        Number of applied migrations.
+
+    Raises:
+        SchemaOutOfDateError: Migrations are pending.
+        MigrationError: An applied migration file was edited.
+    """
+    applied = applied_migrations(conn)
+    status = migration_status(migrations, applied)
+    _check_history(status)
+    if status["pending"]:
+        names = ", ".join(migration.path.name for migration in status["pending"])
+        raise SchemaOutOfDateError(f"Pending schema migrations: {names}. Run: python migrate_schema.py")
+    if status["unknown"]:
+        print(f"[MIGRATIONS] Database has migrations this code does not know: {status['unknown']}")
+    return len(applied)
+
+
+def apply_migrations(conn, migrations, log=print):
+    """Apply pending migrations in order, recording each in schema_migrations.
+
+    MySQL commits DDL implicitly, so a failing migration leaves the ones
+    before it applied and recorded; fix it and run again.
+
+    Returns:
+        List of the migrations applied.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+    if cursor.fetchone()[0] != 1:
+        raise MigrationError("Another migration run holds the schema_migrations lock.")
+    try:
+        cursor.execute(SCHEMA_MIGRATIONS_TABLE)
+        status = migration_status(migrations, applied_migrations(conn))
+        _check_history(status)
+        for migration in status["pending"]:
+            started = time.perf_counter()
+            migration.apply(conn)
+            elapsed_ms = round((time.perf_counter() - started) * 1000)
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, checksum, execution_ms) VALUES (%s, %s, %s, %s)",
+                (migration.version, migration.name, migration.checksum, elapsed_ms),
+            )
+            conn.commit()
+            log(f"[MIGRATIONS] Applied {migration.path.name} in {elapsed_ms} ms")
+        return status["pending"]
+    finally:
+        cursor = conn.cursor()
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
+        cursor.fetchall()
@@ -0,0 +1,208 @@
+from datetime import date, datetime, time, timedelta
+
+from recurrence import RecurrenceError, parse_date, series_from_meeting
+
+MAX_CALENDAR_RANGE_DAYS = 366
+# How far ahead /api/calendar may look; the index is materialized up to the requested end.
+MAX_CALENDAR_LOOKAHEAD_DAYS = 366 * 5
+
+SCHEDULE_QUERY = """
+    SELECT ms.meeting_id AS id, ms.starts_at AS startsAt, ms.start_time AS startTime, ms.end_time AS endTime,
+           ms.schedule_type AS scheduleType, ms.recurrence_rule AS recurrenceRule,
+           ms.recurrence_end_date AS recurrenceEndDate, ms.recurrence_exdates AS recurrenceExceptions,
+           ms.occurrences_until AS occurrencesUntil
+    FROM meeting_schedules ms
+    WHERE ms.occurrences_until IS NULL
+       OR (ms.schedule_type = 'recurring'
+           AND ms.occurrences_until < %s
+           AND (ms.recurrence_end_date IS NULL OR ms.recurrence_end_date > ms.occurrences_until))
+    ORDER BY ms.meeting_id
+    LIMIT %s
+"""
+INSERT_OCCURRENCE_SQL = """
+    INSERT IGNORE INTO meeting_occurrences (meeting_id, occurrence_start, occurrence_end)
+    VALUES (%s, %s, %s)
+"""
+
+
+def time_of_day(value):
+    """MySQL TIME (timedelta), datetime.time or ``H:MM[:SS]`` text as a time."""
+    if isinstance(value, timedelta):
+        return (datetime.min + value).time()
+    if isinstance(value, time):
+        return value
+    hours, minutes = str(value).split(":")[:2]
+    return time(int(hours), int(minutes))
+
+
+def occurrence_rows(meeting, start, end):
+    """Yield (meeting_id, start, end) rows for a meeting's occurrences from ``start`` to ``end``.
+
+    Times are wall-clock times in the meeting's timezone, like starts_at
+    and start_time in meeting_schedules.
+    """
+    series = series_from_meeting(meeting)
+    starts, ends = time_of_day(meeting["startTime"]), time_of_day(meeting["endTime"])
+    for day in series.between(start, end):
+        yield meeting["id"], datetime.combine(day, starts), datetime.combine(day, ends)
+
+
+def materialize_meeting(cursor, meeting, horizon_end):
+    """Rebuild the occurrence rows of one created or edited meeting up to ``horizon_end``.
+
+    Runs in the caller's transaction, so the index changes together with
+    the schedule.
+
+    Returns:
+        Number of occurrence rows written.
+    """
+    cursor.execute("DELETE FROM meeting_occurrences WHERE meeting_id = %s", (meeting["id"],))
+    rows = list(occurrence_rows(meeting, meeting["startsAt"], horizon_end))
+    if rows:
+        cursor.executemany(INSERT_OCCURRENCE_SQL, rows)
+    cursor.execute(
+        "UPDATE meeting_schedules SET occurrences_until = %s WHERE meeting_id = %s",
+        (horizon_end, meeting["id"]),
+    )
+    return len(rows)
+
+
+def extend_horizon(conn, horizon_end, batch_size=200):
+    """Materialize occurrences up to ``horizon_end`` for every schedule still behind it.
+
+    Only the dates after a schedule's occurrences_until are added, so
+    moving a rolling horizon forward by a day costs one day of rows.
+    Schedules never materialized (older databases) are backfilled from
+    their first date. Commits after each batch.
+
+    Returns:
+        Dict with the number of meetings and occurrence rows processed.
+    """
+    cursor = conn.cursor(dictionary=True)
+    writer = conn.cursor()
+    totals = {"meetings": 0, "occurrences": 0}
+    while True:
+        cursor.execute(SCHEDULE_QUERY, (horizon_end, batch_size))
+        schedules = cursor.fetchall()
+        if not schedules:
+            return totals
+        for schedule in schedules:
+            done = schedule["occurrencesUntil"]
+            start = done + timedelta(days=1) if done else parse_date(schedule["startsAt"])
+            try:
+                rows = list(occurrence_rows(schedule, start, horizon_end))
+            except RecurrenceError as error:
+                print(f"[OCCURRENCES] Meeting {schedule['id']} has an unusable recurrence rule: {error}")
+                rows = []
+            if rows:
+                writer.executemany(INSERT_OCCURRENCE_SQL, rows)
+            writer.execute(
+                "UPDATE meeting_schedules SET occurrences_until = %s WHERE meeting_id = %s",
+                (horizon_end, schedule["id"]),
+            )
+            totals["meetings"] += 1
+            totals["occurrences"] += len(rows)
+        conn.commit()
+
+
+def parse_calendar_filters(get_param, today):
+    """Validate /api/calendar query parameters.
+
+    Args:
+        get_param: Callable(name, default) returning a decoded query parameter
+        today: Current date, which bounds how far ahead ``to`` may be
+
+    Returns:
+        Dict with start and end (inclusive dates), teamId and email.
+
+    Raises:
+        ValueError: With a message suitable for a 400 response.
+    """
+    filters = {"teamId": None, "email": None}
+    for param, key in (("from", "start"), ("to", "end")):
+        value = get_param(param, "")
+        if not value:
+            raise ValueError(f"{param} is required (YYYY-MM-DD).")
+        try:
+            filters[key] = date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"{param} must be a date (YYYY-MM-DD).") from None
+    if filters["end"] < filters["start"]:
+        raise ValueError("to must not be before from.")
+    if (filters["end"] - filters["start"]).days >= MAX_CALENDAR_RANGE_DAYS:
+        raise ValueError(f"The range may span at most {MAX_CALENDAR_RANGE_DAYS} days.")
+    if filters["end"] > today + timedelta(days=MAX_CALENDAR_LOOKAHEAD_DAYS):
+        raise ValueError(f"to may be at most {MAX_CALENDAR_LOOKAHEAD_DAYS} days ahead.")
+
+    team_id = get_param("teamId", "")
+    if team_id:
+        try:
+            filters["teamId"] = int(team_id)
+        except ValueError:
+            raise ValueError("teamId must be an integer.") from None
+    email = get_param("email", "").strip().lower()
+    if email:
+        filters["email"] = email
+    return filters
+
+
+def build_calendar_query(filters):
+    """SQL and parameters for the occurrences in a date range.
+
+    The range condition is on occurrence_start alone, so MySQL reads only
+    the matching slice of idx_meeting_occurrences_start however much
+    history the table holds.
+    """
+    conditions = ["mo.occurrence_start >= %s", "mo.occurrence_start < %s"]
+    params = [filters["start"], filters["end"] + timedelta(days=1)]
+    # Invitees are in meeting_invites for every meeting; response rows
+    # exist only once invitation emails were sent.
+    if filters["teamId"]:
+        conditions.append(
+            """EXISTS (
+                SELECT 1
+                FROM meeting_invites mi
+                JOIN team_members tm ON tm.team_id = %s
+                JOIN members m ON m.id = tm.member_id
+                WHERE mi.meeting_id = mo.meeting_id AND FIND_IN_SET(m.email, REPLACE(mi.emails, ' ', ''))
+            )"""
+        )
+        params.append(filters["teamId"])
+    if filters["email"]:
+        conditions.append(
+            """EXISTS (
+                SELECT 1
+                FROM meeting_invites mi
+                WHERE mi.meeting_id = mo.meeting_id AND FIND_IN_SET(%s, REPLACE(mi.emails, ' ', ''))
+            )"""
+        )
+        params.append(filters["email"])
+    sql = f"""
+        SELECT mo.meeting_id, me.name, mo.occurrence_start, mo.occurrence_end,
+               ms.timezone, ms.schedule_type, ms.teams_join_url
+        FROM meeting_occurrences mo
+        JOIN meetings me ON me.id = mo.meeting_id
+        JOIN meeting_schedules ms ON ms.meeting_id = mo.meeting_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY mo.occurrence_start, mo.meeting_id
+    """
+    return sql, params
+
+
+def fetch_calendar(conn, filters):
+    """Occurrences in the filtered range, in API shape, ordered by start."""
+    sql, params = build_calendar_query(filters)
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(sql, params)
+    return [
+        {
+            "meetingId": row["meeting_id"],
+            "name": row["name"],
+            "start": row["occurrence_start"].isoformat(),
+            "end": row["occurrence_end"].isoformat(),
+            "timezone": row["timezone"],
+            "scheduleType": row["schedule_type"],
+            "teamsJoinUrl": row["teams_join_url"],
+        }
+        for row in cursor.fetchall()
+    ]
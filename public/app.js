@@ -10,6 +10,7 @@ const memberTeams = document.getElementById('memberTeams');
 const inviteeEmail = document.getElementById('inviteeEmail');
 const emailSuggestions = document.getElementById('emailSuggestions');
 const patientMeetingId = document.getElementById('patientMeetingId');
+const patientMeetingSearch = document.getElementById('patientMeetingSearch');
 const patientAttachments = document.getElementById('patientAttachments');
 const message = document.getElementById('message');
 const scheduleType = document.getElementById('scheduleType');
@@ -20,9 +21,29 @@ const filterMeetingName = document.getElementById('filterMeetingName');
 const filterPatientName = document.getElementById('filterPatientName');
 const filterMRN = document.getElementById('filterMRN');
 const clearFiltersBtn = document.getElementById('clearFiltersBtn');
-
-// Store all meetings data
+const loadMoreMeetingsBtn = document.getElementById('loadMoreMeetingsBtn');
+
+// Calendar elements
+const calendarForm = document.getElementById('calendarForm');
+const calendarFrom = document.getElementById('calendarFrom');
+const calendarTo = document.getElementById('calendarTo');
+const calendarTeam = document.getElementById('calendarTeam');
+const calendarEmail = document.getElementById('calendarEmail');
+const calendarList = document.getElementById('calendarList');
+
+// Store all loaded list data and the cursor of the next meetings page
+let allTeams = [];
+let allMembers = [];
 let allMeetings = [];
+let allPatientDetails = [];
+let nextMeetingsCursor = null;
+// Bumped for every first-page load so a slower, older response is dropped.
+let meetingsGeneration = 0;
+
+// /api/events pushes other users' changes into the lists. Saves still
+// refetch what they changed: the stream only carries the writes of the
+// worker process it is connected to, which may not be the one that saved.
+const liveUpdates = 'EventSource' in window;
 
 const showMessage = (text, isError = false) => {
   message.textContent = text;
@@ -48,50 +69,193 @@ const parseInviteeEmails = (raw) => {
   return { emails: unique, invalid };
 };
 
-const toBase64 = (file) =>
-  new Promise((resolve, reject) => {
-    const reader = new FileReader();
-    reader.onload = () => {
-      const result = String(reader.result || '');
-      const [, base64Content = ''] = result.split(',');
-      resolve(base64Content);
-    };
-    reader.onerror = () => reject(new Error(`Failed to read file: ${file.name}`));
-    reader.readAsDataURL(file);
-  });
+// Last body, ETag and headers of each GET, so an unchanged list comes back
+// as an empty 304. The body is kept as text because the page modifies the
+// parsed lists in place.
+const validatedResponses = new Map();
 
-const fetchJSON = async (url, options = {}) => {
+const fetchJSONResponse = async (url, options = {}) => {
+  const isGet = !options.method || options.method === 'GET';
+  const cached = isGet ? validatedResponses.get(url) : undefined;
   const response = await fetch(url, {
-    headers: { 'Content-Type': 'application/json' },
     ...options,
+    headers: {
+      'Content-Type': 'application/json',
+      ...(cached ? { 'If-None-Match': cached.etag } : {}),
+      ...options.headers,
+    },
   });
 
-  const data = await response.json();
+  if (response.status === 304 && cached) {
+    return { data: JSON.parse(cached.body), headers: cached.headers };
+  }
+  const body = await response.text();
+  const data = JSON.parse(body);
   if (!response.ok) {
-    throw new Error(data.error || 'Request failed');
+    const error = new Error(data.error || 'Request failed');
+    error.status = response.status;
+    error.data = data;
+    throw error;
   }
 
-  return data;
+  const etag = response.headers.get('ETag');
+  if (isGet && etag) {
+    validatedResponses.set(url, { etag, body, headers: response.headers });
+  }
+  return { data, headers: response.headers };
+};
+
+const fetchJSON = async (url, options = {}) => (await fetchJSONResponse(url, options)).data;
+
+const uploadAttachment = (patientDetailId, file) =>
+  fetchJSON(`/api/patient-details/${patientDetailId}/attachments?fileName=${encodeURIComponent(file.name)}`, {
+    method: 'POST',
+    headers: { 'Content-Type': file.type || 'application/octet-stream' },
+    body: file,
+  });
+
+const renderTeams = () => {
+  const selectedTeam = calendarTeam.value;
+  teamList.innerHTML = allTeams.map((team) => `<li>${team.name}</li>`).join('');
+  memberTeams.innerHTML = allTeams.map((team) => `<option value="${team.id}">${team.name}</option>`).join('');
+  calendarTeam.innerHTML =
+    '<option value="">All teams</option>' +
+    allTeams.map((team) => `<option value="${team.id}">${team.name}</option>`).join('');
+  calendarTeam.value = selectedTeam;
 };
 
 const refreshTeams = async () => {
-  const teams = await fetchJSON('/api/teams');
-  teamList.innerHTML = teams.map((team) => `<li>${team.name}</li>`).join('');
-  memberTeams.innerHTML = teams.map((team) => `<option value="${team.id}">${team.name}</option>`).join('');
+  allTeams = await fetchJSON('/api/teams');
+  renderTeams();
 };
 
-const refreshMembers = async () => {
-  const members = await fetchJSON('/api/members');
-  memberList.innerHTML = members
-    .map((member) => `<li>${member.fullName} (${member.email}) - Teams: ${member.teams || 'None'}</li>`)
+const isoDate = (day) => day.toISOString().slice(0, 10);
+
+const setCalendarToThisWeek = () => {
+  const today = new Date();
+  const monday = new Date(Date.UTC(today.getFullYear(), today.getMonth(), today.getDate() - ((today.getDay() + 6) % 7)));
+  const sunday = new Date(monday);
+  sunday.setUTCDate(monday.getUTCDate() + 6);
+  calendarFrom.value = isoDate(monday);
+  calendarTo.value = isoDate(sunday);
+};
+
+const refreshCalendar = async () => {
+  const params = new URLSearchParams({ from: calendarFrom.value, to: calendarTo.value });
+  if (calendarTeam.value) {
+    params.set('teamId', calendarTeam.value);
+  }
+  if (calendarEmail.value.trim()) {
+    params.set('email', calendarEmail.value.trim());
+  }
+  const occurrences = await fetchJSON(`/api/calendar?${params}`);
+  calendarList.innerHTML = occurrences.length
+    ? occurrences
+        .map(
+          (occurrence) =>
+            `<li><strong>${occurrence.start.slice(0, 10)}</strong> ${occurrence.start.slice(11, 16)} - ` +
+            `${occurrence.end.slice(11, 16)} (${occurrence.timezone}) #${occurrence.meetingId} ${occurrence.name}` +
+            `${occurrence.teamsJoinUrl ? ` <a href="${occurrence.teamsJoinUrl}" target="_blank" rel="noopener noreferrer">Join</a>` : ''}</li>`
+        )
+        .join('')
+    : '<li>No meetings in this range.</li>';
+};
+
+const renderMembers = () => {
+  memberList.innerHTML = allMembers
+    .map((member) => {
+      const feed = member.feedUrl
+        ? ` - <a href="${new URL(member.feedUrl, window.location.href).href.replace(/^https?:/, 'webcal:')}">Subscribe to calendar</a>`
+        : '';
+      return `<li>${member.fullName} (${member.email}) - Teams: ${member.teams || 'None'}${feed}</li>`;
+    })
     .join('');
 };
 
+const refreshMembers = async () => {
+  allMembers = await fetchJSON('/api/members');
+  renderMembers();
+};
+
+// The name, patient and MRN filters are applied by /api/meetings, so they
+// search every meeting and not only the pages loaded so far.
+const meetingFilterValues = () => ({
+  name: filterMeetingName.value.trim(),
+  patientName: filterPatientName.value.trim(),
+  mrn: filterMRN.value.trim(),
+});
+
+const meetingFiltersActive = () => Object.values(meetingFilterValues()).some(Boolean);
+
+const fetchMeetingsPage = async (cursor = null) => {
+  const params = new URLSearchParams();
+  Object.entries(meetingFilterValues()).forEach(([name, value]) => {
+    if (value) {
+      params.set(name, value);
+    }
+  });
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
+  const query = params.toString();
+  const { data, headers } = await fetchJSONResponse(query ? `/api/meetings?${query}` : '/api/meetings');
+  return { meetings: data, nextCursor: headers.get('X-Next-Cursor') };
+};
+
+const showMeetings = () => {
+  loadMoreMeetingsBtn.classList.toggle('hidden', !nextMeetingsCursor);
+  applyMeetingFilters();
+  updateEmailSuggestions(allMeetings);
+};
+
 const refreshMeetings = async () => {
-  const meetings = await fetchJSON('/api/meetings');
+  const generation = ++meetingsGeneration;
+  const { meetings, nextCursor } = await fetchMeetingsPage();
+  if (generation !== meetingsGeneration) {
+    return;
+  }
   allMeetings = meetings;
-  renderMeetings(meetings);
+  nextMeetingsCursor = nextCursor;
+  showMeetings();
+};
 
+const loadMoreMeetings = async () => {
+  if (!nextMeetingsCursor) {
+    return;
+  }
+  const generation = meetingsGeneration;
+  const { meetings, nextCursor } = await fetchMeetingsPage(nextMeetingsCursor);
+  if (generation !== meetingsGeneration) {
+    return;
+  }
+  allMeetings = allMeetings.concat(meetings);
+  nextMeetingsCursor = nextCursor;
+  showMeetings();
+};
+
+// The patient form picks its meeting from its own search, not from the
+// loaded pages of the meeting list.
+let meetingOptionsGeneration = 0;
+
+const refreshMeetingOptions = async () => {
+  const generation = ++meetingOptionsGeneration;
+  const search = patientMeetingSearch.value.trim();
+  const options = await fetchJSON(search ? `/api/meeting-options?q=${encodeURIComponent(search)}` : '/api/meeting-options');
+  if (generation !== meetingOptionsGeneration) {
+    return;
+  }
+  const selected = patientMeetingId.value;
+  patientMeetingId.innerHTML =
+    '<option value="">Select meeting</option>' +
+    options
+      .map((meeting) => `<option value="${meeting.id}">#${meeting.id} - ${meeting.name} (${meeting.startsAt})</option>`)
+      .join('');
+  if (options.some((meeting) => String(meeting.id) === selected)) {
+    patientMeetingId.value = selected;
+  }
+};
+
+const updateEmailSuggestions = (meetings) => {
   // Populate email suggestions from all unique invitee emails
   const uniqueEmails = new Set();
   meetings.forEach((meeting) => {
@@ -106,12 +270,15 @@ const refreshMeetings = async () => {
   emailSuggestions.innerHTML = Array.from(uniqueEmails)
     .map((email) => `<option value="${email}">`)
     .join('');
-
-  patientMeetingId.innerHTML =
-    '<option value="">Select meeting</option>' +
-    meetings.map((meeting) => `<option value="${meeting.id}">#${meeting.id} - ${meeting.name}</option>`).join('');
 };
 
+const attachmentLinks = (attachments = []) =>
+  attachments.length
+    ? ` (${attachments
+        .map((attachment) => `<a href="/api/attachments/${attachment.id}" target="_blank" rel="noopener">${attachment.fileName}</a>`)
+        .join(', ')})`
+    : '';
+
 const renderMeetings = (meetings, nameFilter = '', patientFilter = '', mrnFilter = '') => {
   meetingList.innerHTML = meetings
     .map(
@@ -170,8 +337,10 @@ const renderMeetings = (meetings, nameFilter = '', patientFilter = '', mrnFilter
           `${meeting.startTime && meeting.endTime ? ` (${meeting.startTime} - ${meeting.endTime})` : ''} (${meeting.timezone})` +
           `${meeting.recurrenceRule ? ` | Rule: ${meeting.recurrenceRule}` : ''}` +
           `${meeting.recurrenceEndDate ? ` | Ends: ${meeting.recurrenceEndDate}` : ''}` +
+          `${meeting.recurrenceExceptions && meeting.recurrenceExceptions.length ? ` | Skips: ${meeting.recurrenceExceptions.join(', ')}` : ''}` +
+          `${meeting.scheduleType === 'recurring' && meeting.nextOccurrence ? ` | Next: ${meeting.nextOccurrence}` : ''}` +
           `${meeting.teamsJoinUrl ? `<br/>Microsoft Teams: <a href="${meeting.teamsJoinUrl}" target="_blank" rel="noopener noreferrer">Join / Open Meeting</a>` : ''}` +
-          `<br/>Attachments: ${meeting.attachmentCount || 0}${meeting.attachmentNames ? ` (${meeting.attachmentNames})` : ''}` +
+          `<br/>Attachments: ${meeting.attachmentCount || 0}${attachmentLinks(meeting.attachments)}` +
           `<br/>Invitees: ${meeting.invitees || 'None'}` +
           `${responseHtml}` +
           `<br/><strong>Patients:</strong>${patientsHtml}</li>`
@@ -181,40 +350,33 @@ const renderMeetings = (meetings, nameFilter = '', patientFilter = '', mrnFilter
     .join('');
 };
 
+// allMeetings already holds only matching meetings; within each one, show
+// just the patients the patient name / MRN filters match.
 const applyMeetingFilters = () => {
-  const nameFilter = filterMeetingName.value.toLowerCase().trim();
-  const patientFilter = filterPatientName.value.toLowerCase().trim();
-  const mrnFilter = filterMRN.value.toLowerCase().trim();
-
-  const filtered = allMeetings.filter((meeting) => {
-    // Filter by meeting name
-    if (nameFilter && !meeting.name.toLowerCase().includes(nameFilter)) {
-      return false;
-    }
+  const { name, patientName, mrn } = meetingFilterValues();
+  renderMeetings(allMeetings, name, patientName, mrn);
+};
 
-    // Filter by patient name and/or MRN (if no patients match, exclude this meeting)
-    if (patientFilter || mrnFilter) {
-      const hasMatchingPatient = meeting.patients && meeting.patients.some((patient) => {
-        const patientNameMatch = !patientFilter || patient.patientName.toLowerCase().includes(patientFilter);
-        const mrnMatch = !mrnFilter || patient.medicalRecordNumber.toLowerCase().includes(mrnFilter);
-        return patientNameMatch && mrnMatch;
-      });
+let meetingSearchTimer = null;
 
-      if (!hasMatchingPatient) {
-        return false;
-      }
-    }
+const searchMeetings = () => {
+  clearTimeout(meetingSearchTimer);
+  meetingSearchTimer = setTimeout(() => {
+    refreshMeetings().catch((error) => showMessage(error.message, true));
+  }, 250);
+};
 
-    return true;
-  });
+let meetingOptionsTimer = null;
 
-  renderMeetings(filtered, nameFilter, patientFilter, mrnFilter);
+const searchMeetingOptions = () => {
+  clearTimeout(meetingOptionsTimer);
+  meetingOptionsTimer = setTimeout(() => {
+    refreshMeetingOptions().catch((error) => showMessage(error.message, true));
+  }, 250);
 };
 
-const refreshPatientDetails = async () => {
-  const details = await fetchJSON('/api/patient-details');
-
-  patientDetailsList.innerHTML = details
+const renderPatientDetails = () => {
+  patientDetailsList.innerHTML = allPatientDetails
     .map(
       (detail) =>
         `<li><strong>${detail.patientName}</strong> (MRN: ${detail.medicalRecordNumber}, DOB: ${detail.patientDateOfBirth})` +
@@ -226,6 +388,110 @@ const refreshPatientDetails = async () => {
     .join('');
 };
 
+const refreshPatientDetails = async () => {
+  allPatientDetails = await fetchJSON('/api/patient-details');
+  renderPatientDetails();
+};
+
+// Same order as /api/meetings: newest start first, then highest id.
+const meetingSortKey = (meeting) => `${meeting.startsAt} ${String(meeting.startTime).padStart(8, '0')}`;
+const compareMeetings = (a, b) => meetingSortKey(b).localeCompare(meetingSortKey(a)) || b.id - a.id;
+
+const findMeeting = (meetingId) => allMeetings.find((meeting) => meeting.id === meetingId);
+
+const changeHandlers = {
+  'team.created': (team) => {
+    if (!allTeams.some((existing) => existing.id === team.id)) {
+      allTeams = [...allTeams, team].sort((a, b) => a.name.localeCompare(b.name));
+      renderTeams();
+    }
+  },
+  'member.created': (member) => {
+    if (!allMembers.some((existing) => existing.id === member.id)) {
+      allMembers = [...allMembers, member].sort((a, b) => a.fullName.localeCompare(b.fullName));
+      renderMembers();
+    }
+  },
+  'meeting.created': (meeting) => {
+    refreshMeetingOptions().catch((error) => showMessage(error.message, true));
+    if (meetingFiltersActive()) {
+      // Only the server knows whether the new meeting matches the filters.
+      searchMeetings();
+      refreshCalendar().catch((error) => showMessage(error.message, true));
+      return;
+    }
+    const last = allMeetings[allMeetings.length - 1];
+    // A meeting that sorts after the loaded pages shows up with "Load More".
+    const inLoadedRange = !nextMeetingsCursor || !last || compareMeetings(meeting, last) < 0;
+    if (inLoadedRange && !findMeeting(meeting.id)) {
+      allMeetings = [...allMeetings, meeting].sort(compareMeetings);
+      showMeetings();
+    }
+    refreshCalendar().catch((error) => showMessage(error.message, true));
+  },
+  'patient.created': (detail) => {
+    if (!allPatientDetails.some((existing) => existing.id === detail.id)) {
+      allPatientDetails = [detail, ...allPatientDetails];
+      renderPatientDetails();
+    }
+    const { patientName, mrn } = meetingFilterValues();
+    if (patientName || mrn) {
+      // The new patient may make another meeting match the search.
+      searchMeetings();
+      return;
+    }
+    const meeting = findMeeting(detail.meetingId);
+    if (meeting && !meeting.patients.some((patient) => patient.patientDetailId === detail.id)) {
+      const { id, meetingId, meetingName, ...patient } = detail;
+      meeting.patients.push({ patientDetailId: id, ...patient });
+      applyMeetingFilters();
+    }
+  },
+  'attachment.created': ({ meetingId, ...attachment }) => {
+    const meeting = findMeeting(meetingId);
+    if (meeting && !meeting.attachments.some((existing) => existing.id === attachment.id)) {
+      meeting.attachments.push(attachment);
+      meeting.attachmentCount = meeting.attachments.length;
+      applyMeetingFilters();
+    }
+  },
+  'rsvp.recorded': ({ meetingId, email, status }) => {
+    const meeting = findMeeting(meetingId);
+    if (meeting) {
+      meeting.responses = { ...meeting.responses, [email]: status };
+      applyMeetingFilters();
+    }
+  },
+  // The server could not replay what this page missed: reload everything.
+  reset: () => loadAll(),
+};
+
+// Changes received while loadAll() is fetching; applied once it finishes.
+let pendingChanges = null;
+
+const connectEvents = () => {
+  const source = new EventSource('/api/events');
+  Object.keys(changeHandlers).forEach((type) => {
+    source.addEventListener(type, (event) => {
+      const data = JSON.parse(event.data);
+      if (pendingChanges) {
+        if (type !== 'reset') {
+          pendingChanges.push([type, data]);
+        }
+        return;
+      }
+      changeHandlers[type](data);
+    });
+  });
+  source.onerror = () => {
+    // EventSource reconnects dropped streams itself but gives up after an
+    // error status such as 503 when every stream slot is taken.
+    if (source.readyState === EventSource.CLOSED) {
+      setTimeout(connectEvents, 5000);
+    }
+  };
+};
+
 teamForm.addEventListener('submit', async (event) => {
   event.preventDefault();
   try {
@@ -262,6 +528,18 @@ memberForm.addEventListener('submit', async (event) => {
   }
 });
 
+const describeConflicts = ({ error, conflicts, conflictCount }) => {
+  const lines = conflicts.map(
+    (conflict) =>
+      `${conflict.email}: ${conflict.meetingName || `Meeting ${conflict.meetingId}`}, ` +
+      `${conflict.start.replace('T', ' ').slice(0, 16)} - ${conflict.end.slice(11, 16)}`
+  );
+  if (conflictCount > conflicts.length) {
+    lines.push(`...and ${conflictCount - conflicts.length} more`);
+  }
+  return `${error}\n\n${lines.join('\n')}\n\nCreate the meeting anyway?`;
+};
+
 meetingForm.addEventListener('submit', async (event) => {
   event.preventDefault();
   const emailInput = inviteeEmail.value;
@@ -286,17 +564,28 @@ meetingForm.addEventListener('submit', async (event) => {
       scheduleType: scheduleType.value,
       recurrenceRule: document.getElementById('recurrenceRule').value || null,
       recurrenceEndDate: document.getElementById('recurrenceEndDate').value || null,
+      recurrenceExceptions: document.getElementById('recurrenceExceptions').value || null,
       inviteeEmail: emails.length > 0 ? emails.join(', ') : null,
     };
 
-    await fetchJSON('/api/meetings', {
-      method: 'POST',
-      body: JSON.stringify(payload),
-    });
+    try {
+      await fetchJSON('/api/meetings', {
+        method: 'POST',
+        body: JSON.stringify(payload),
+      });
+    } catch (error) {
+      if (error.status !== 409 || !window.confirm(describeConflicts(error.data))) {
+        throw error;
+      }
+      await fetchJSON('/api/meetings', {
+        method: 'POST',
+        body: JSON.stringify({ ...payload, allowConflicts: true }),
+      });
+    }
 
     meetingForm.reset();
     recurringFields.classList.add('hidden');
-    await Promise.all([refreshMeetings(), refreshPatientDetails()]);
+    await Promise.all([refreshMeetings(), refreshMeetingOptions(), refreshCalendar()]);
     showMessage('Meeting created successfully.');
   } catch (error) {
     showMessage(error.message, true);
@@ -315,15 +604,8 @@ patientDetailsForm.addEventListener('submit', async (event) => {
     }
 
     const attachmentFiles = [...patientAttachments.files];
-    const attachments = await Promise.all(
-      attachmentFiles.map(async (file) => ({
-        fileName: file.name,
-        fileType: file.type || null,
-        fileData: await toBase64(file),
-      }))
-    );
-
-    await fetchJSON('/api/patient-details', {
+
+    const patientDetail = await fetchJSON('/api/patient-details', {
       method: 'POST',
       body: JSON.stringify({
         meetingId: meetingIdValue,
@@ -334,10 +616,15 @@ patientDetailsForm.addEventListener('submit', async (event) => {
         doctorName: document.getElementById('doctorName').value,
         departmentName: document.getElementById('departmentName').value,
         meetingAgendaNote: document.getElementById('meetingAgendaNote').value || null,
-        attachments,
       }),
     });
 
+    // Files go up as raw request bodies, one per request, so the browser
+    // streams them instead of base64-encoding them into the JSON payload.
+    for (const file of attachmentFiles) {
+      await uploadAttachment(patientDetail.id, file);
+    }
+
     patientDetailsForm.reset();
     await Promise.all([refreshPatientDetails(), refreshMeetings()]);
     showMessage('Patient added to meeting successfully!');
@@ -355,26 +642,62 @@ scheduleType.addEventListener('change', () => {
 });
 
 // Filter event listeners
-filterMeetingName.addEventListener('input', applyMeetingFilters);
-filterPatientName.addEventListener('input', applyMeetingFilters);
-filterMRN.addEventListener('input', applyMeetingFilters);
+filterMeetingName.addEventListener('input', searchMeetings);
+filterPatientName.addEventListener('input', searchMeetings);
+filterMRN.addEventListener('input', searchMeetings);
+patientMeetingSearch.addEventListener('input', searchMeetingOptions);
 
 clearFiltersBtn.addEventListener('click', () => {
   filterMeetingName.value = '';
   filterPatientName.value = '';
   filterMRN.value = '';
-  renderMeetings(allMeetings);
+  searchMeetings();
 });
 
-const init = async () => {
+calendarForm.addEventListener('submit', async (event) => {
+  event.preventDefault();
+  try {
+    await refreshCalendar();
+  } catch (error) {
+    showMessage(error.message, true);
+  }
+});
+
+loadMoreMeetingsBtn.addEventListener('click', async () => {
+  loadMoreMeetingsBtn.disabled = true;
+  try {
+    await loadMoreMeetings();
+  } catch (error) {
+    showMessage(error.message, true);
+  } finally {
+    loadMoreMeetingsBtn.disabled = false;
+  }
+});
+
+const loadAll = async () => {
+  pendingChanges = [];
   try {
     await refreshTeams();
     await refreshMembers();
     await refreshMeetings();
+    await refreshMeetingOptions();
     await refreshPatientDetails();
+    await refreshCalendar();
   } catch (error) {
     showMessage(error.message, true);
+  } finally {
+    const changes = pendingChanges;
+    pendingChanges = null;
+    changes.forEach(([type, data]) => changeHandlers[type](data));
+  }
+};
+
+const init = async () => {
+  setCalendarToThisWeek();
+  if (liveUpdates) {
+    connectEvents();
   }
+  await loadAll();
 };
 
 init();
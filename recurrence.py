@@ -0,0 +1,394 @@
+import calendar
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+# Consecutive periods without a match before a rule is treated as exhausted
+# (about eight years each), so BYMONTH=2;BYMONTHDAY=30 ends instead of looping.
+MAX_EMPTY_PERIODS = {"DAILY": 366 * 8, "WEEKLY": 53 * 8, "MONTHLY": 12 * 8, "YEARLY": 8}
+
+
+class RecurrenceError(ValueError):
+    """The recurrence rule or an exception date cannot be parsed."""
+
+
+def parse_date(value):
+    """Date from a date, datetime, ``YYYY-MM-DD`` or iCalendar ``YYYYMMDD[THHMMSS[Z]]`` value."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    try:
+        if len(text) >= 8 and text[:8].isdigit():
+            return datetime.strptime(text[:8], "%Y%m%d").date()
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        raise RecurrenceError(f"Invalid date: {text!r}") from None
+
+
+def parse_exdates(value):
+    """Exception dates from a list or a comma-separated string; empty for None."""
+    if not value:
+        return ()
+    items = value.split(",") if isinstance(value, str) else value
+    return tuple(sorted({parse_date(item) for item in items if str(item).strip()}))
+
+
+def format_exdates(dates):
+    """Inverse of parse_exdates() for the recurrence_exdates column."""
+    return ",".join(day.isoformat() for day in dates) or None
+
+
+def _int_list(name, value, low, high):
+    numbers = []
+    for item in value.split(","):
+        try:
+            number = int(item)
+        except ValueError:
+            raise RecurrenceError(f"{name} must be a list of integers.") from None
+        if not low <= abs(number) <= high:
+            raise RecurrenceError(f"{name} values must be between {low} and {high} (or negative).")
+        numbers.append(number)
+    return tuple(numbers)
+
+
+class RecurrenceRule:
+    """An RFC 5545 RRULE at day granularity.
+
+    Supports FREQ (DAILY, WEEKLY, MONTHLY, YEARLY), INTERVAL, COUNT, UNTIL,
+    BYDAY (with ordinals such as ``-1FR`` for MONTHLY and YEARLY),
+    BYMONTHDAY, BYMONTH and WKST. Meetings keep their time of day in
+    meeting_schedules, so the time-of-day parts (BYHOUR and friends) are
+    rejected rather than silently ignored.
+    """
+
+    def __init__(self, freq, interval=1, count=None, until=None, by_day=(), by_month_day=(), by_month=(),
+                 week_start=0):
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.by_day = tuple(by_day)
+        self.by_month_day = tuple(by_month_day)
+        self.by_month = tuple(by_month)
+        self.week_start = week_start
+        self._weekdays = {weekday for _, weekday in self.by_day}
+
+    @classmethod
+    def parse(cls, text):
+        """Parse ``FREQ=WEEKLY;BYDAY=MO,WE`` (an ``RRULE:`` prefix is allowed).
+
+        Raises:
+            RecurrenceError: With a message suitable for a 400 response.
+        """
+        text = (text or "").strip()
+        if text.upper().startswith("RRULE:"):
+            text = text[6:]
+        parts = {}
+        for item in text.split(";"):
+            if not item.strip():
+                continue
+            name, sep, value = item.strip().partition("=")
+            name = name.upper()
+            if not sep or not value:
+                raise RecurrenceError(f"Malformed recurrence rule part: {item!r}")
+            if name in parts:
+                raise RecurrenceError(f"{name} is given more than once.")
+            parts[name] = value.strip().upper()
+
+        freq = parts.pop("FREQ", None)
+        if freq not in FREQUENCIES:
+            raise RecurrenceError(f"FREQ must be one of {', '.join(FREQUENCIES)}.")
+        options = {}
+        if "INTERVAL" in parts:
+            options["interval"] = _int_list("INTERVAL", parts.pop("INTERVAL"), 1, 1000)[0]
+            if options["interval"] < 1:
+                raise RecurrenceError("INTERVAL must be positive.")
+        if "COUNT" in parts:
+            options["count"] = _int_list("COUNT", parts.pop("COUNT"), 1, 100000)[0]
+            if options["count"] < 1:
+                raise RecurrenceError("COUNT must be positive.")
+        if "UNTIL" in parts:
+            if "count" in options:
+                raise RecurrenceError("COUNT and UNTIL cannot both be given.")
+            options["until"] = parse_date(parts.pop("UNTIL"))
+        if "BYMONTH" in parts:
+            options["by_month"] = _int_list("BYMONTH", parts.pop("BYMONTH"), 1, 12)
+            if any(month < 0 for month in options["by_month"]):
+                raise RecurrenceError("BYMONTH values must be between 1 and 12.")
+        if "BYMONTHDAY" in parts:
+            if freq == "WEEKLY":
+                raise RecurrenceError("BYMONTHDAY cannot be used with FREQ=WEEKLY.")
+            options["by_month_day"] = _int_list("BYMONTHDAY", parts.pop("BYMONTHDAY"), 1, 31)
+        if "BYDAY" in parts:
+            by_day = []
+            for item in parts.pop("BYDAY").split(","):
+                ordinal, weekday = item[:-2], item[-2:]
+                if weekday not in WEEKDAYS:
+                    raise RecurrenceError(f"Invalid BYDAY value: {item!r}")
+                if ordinal:
+                    if freq not in ("MONTHLY", "YEARLY"):
+                        raise RecurrenceError("BYDAY ordinals need FREQ=MONTHLY or FREQ=YEARLY.")
+                    ordinal = _int_list("BYDAY", ordinal, 1, 53)[0]
+                by_day.append((ordinal or 0, WEEKDAYS.index(weekday)))
+            options["by_day"] = by_day
+        if "WKST" in parts:
+            week_start = parts.pop("WKST")
+            if week_start not in WEEKDAYS:
+                raise RecurrenceError(f"Invalid WKST value: {week_start!r}")
+            options["week_start"] = WEEKDAYS.index(week_start)
+        if parts:
+            raise RecurrenceError(f"Unsupported recurrence rule part(s): {', '.join(sorted(parts))}")
+        return cls(freq, **options)
+
+    def format(self, until=None):
+        """RRULE value text; ``until`` replaces the rule's own UNTIL (e.g. a UTC date-time)."""
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.count:
+            parts.append(f"COUNT={self.count}")
+        if until is not None:
+            parts.append(f"UNTIL={until}")
+        elif self.until:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%d')}")
+        if self.by_month:
+            parts.append("BYMONTH=" + ",".join(map(str, self.by_month)))
+        if self.by_month_day:
+            parts.append("BYMONTHDAY=" + ",".join(map(str, self.by_month_day)))
+        if self.by_day:
+            parts.append("BYDAY=" + ",".join(f"{ordinal or ''}{WEEKDAYS[weekday]}" for ordinal, weekday in self.by_day))
+        if self.week_start:
+            parts.append(f"WKST={WEEKDAYS[self.week_start]}")
+        return ";".join(parts)
+
+    def __str__(self):
+        return self.format()
+
+    # Periods are numbered from the one containing dtstart: day, week
+    # (starting on WKST), month or year, ``interval`` units apart.
+
+    def _period_index(self, dtstart, day):
+        if self.freq == "DAILY":
+            units = (day - dtstart).days
+        elif self.freq == "WEEKLY":
+            units = (day - self._week_of(dtstart)).days // 7
+        elif self.freq == "MONTHLY":
+            units = (day.year * 12 + day.month) - (dtstart.year * 12 + dtstart.month)
+        else:
+            units = day.year - dtstart.year
+        return units // self.interval
+
+    def _week_of(self, day):
+        return day - timedelta(days=(day.weekday() - self.week_start) % 7)
+
+    def _weekdays_in(self, first, length):
+        """Days matching BYDAY in ``length`` days from ``first``; ordinals count within that span."""
+        days = set()
+        for ordinal, weekday in self.by_day:
+            offsets = range((weekday - first.weekday()) % 7, length, 7)
+            if not ordinal:
+                days.update(first + timedelta(days=offset) for offset in offsets)
+            elif -len(offsets) <= ordinal <= len(offsets):
+                days.add(first + timedelta(days=offsets[ordinal - 1 if ordinal > 0 else ordinal]))
+        return days
+
+    def _month_days(self, year, month, dtstart):
+        length = calendar.monthrange(year, month)[1]
+        if self.by_month_day:
+            numbers = {number if number > 0 else length + number + 1 for number in self.by_month_day}
+            days = [date(year, month, number) for number in numbers if 1 <= number <= length]
+            if self.by_day:
+                days = [day for day in days if day.weekday() in self._weekdays]
+            return days
+        if self.by_day:
+            return list(self._weekdays_in(date(year, month, 1), length))
+        return [date(year, month, dtstart.day)] if dtstart.day <= length else []
+
+    def _period_dates(self, dtstart, index):
+        step = index * self.interval
+        if self.freq == "DAILY":
+            day = dtstart + timedelta(days=step)
+            length = calendar.monthrange(day.year, day.month)[1]
+            if self.by_month and day.month not in self.by_month:
+                return []
+            if self.by_month_day and not any(
+                    day.day == (number if number > 0 else length + number + 1) for number in self.by_month_day):
+                return []
+            if self.by_day and day.weekday() not in self._weekdays:
+                return []
+            return [day]
+        if self.freq == "WEEKLY":
+            week = self._week_of(dtstart) + timedelta(weeks=step)
+            weekdays = self._weekdays or {dtstart.weekday()}
+            days = [week + timedelta(days=(weekday - self.week_start) % 7) for weekday in weekdays]
+            return [day for day in days if not self.by_month or day.month in self.by_month]
+        if self.freq == "MONTHLY":
+            year, month = divmod(dtstart.year * 12 + dtstart.month - 1 + step, 12)
+            month += 1
+            if self.by_month and month not in self.by_month:
+                return []
+            return self._month_days(year, month, dtstart)
+        year = dtstart.year + step
+        if self.by_month:
+            return [day for month in self.by_month for day in self._month_days(year, month, dtstart)]
+        if self.by_month_day:
+            return [day for month in range(1, 13) for day in self._month_days(year, month, dtstart)]
+        if self.by_day:
+            return list(self._weekdays_in(date(year, 1, 1), 366 if calendar.isleap(year) else 365))
+        if dtstart.month == 2 and dtstart.day == 29 and not calendar.isleap(year):
+            return []
+        return [dtstart.replace(year=year)]
+
+    def iter_dates(self, dtstart, skip_to=None):
+        """Lazily yield matching dates on or after ``dtstart`` in order, without COUNT or UNTIL.
+
+        ``skip_to`` starts at the period containing that date instead of at
+        dtstart; only valid when COUNT does not need the earlier dates.
+        """
+        index = max(0, self._period_index(dtstart, skip_to)) if skip_to and skip_to > dtstart else 0
+        empty = 0
+        while empty < MAX_EMPTY_PERIODS[self.freq]:
+            try:
+                days = sorted(day for day in self._period_dates(dtstart, index) if day >= dtstart)
+            except OverflowError:
+                return
+            empty = 0 if days else empty + 1
+            yield from days
+            index += 1
+
+
+class RecurrenceSeries:
+    """The dates of one meeting: its first date, an optional rule, an end date and exception dates.
+
+    The first date is always the first occurrence and counts towards
+    COUNT, as in RFC 5545. ``until`` (recurrence_end_date) and the rule's
+    UNTIL both apply, inclusively. Exception dates are skipped but still
+    count towards COUNT, like EXDATE.
+    """
+
+    def __init__(self, dtstart, rule=None, until=None, exdates=()):
+        self.dtstart = parse_date(dtstart)
+        self.rule = rule
+        self.until = parse_date(until) if until else None
+        self.exdates = frozenset(parse_exdates(exdates))
+        ends = [day for day in (self.until, rule.until if rule else None) if day]
+        self.last_possible = min(ends) if ends else None
+        self.key = (self.dtstart, str(rule) if rule else None, self.until, tuple(sorted(self.exdates)))
+
+    def between(self, start, end):
+        """Lazily yield occurrence dates from ``start`` to ``end`` inclusive."""
+        start, end = parse_date(start), parse_date(end)
+        if self.last_possible and self.last_possible < end:
+            end = self.last_possible
+        if self.rule is None:
+            candidates = iter((self.dtstart,))
+        else:
+            skip_to = None if self.rule.count else start
+            later = (day for day in self.rule.iter_dates(self.dtstart, skip_to) if day > self.dtstart)
+            candidates = _chain_first(self.dtstart, later)
+        count = self.rule.count if self.rule else None
+        produced = 0
+        for day in candidates:
+            if day > end:
+                return
+            produced += 1
+            if count and produced > count:
+                return
+            if day >= start and day not in self.exdates:
+                yield day
+
+    def next_after(self, day, horizon_days=366 * 5):
+        """First occurrence on or after ``day`` within the horizon, or None."""
+        day = parse_date(day)
+        return next(self.between(day, day + timedelta(days=horizon_days)), None)
+
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+
+def series_from_meeting(meeting):
+    """RecurrenceSeries for an API-shaped meeting dict (startsAt, scheduleType, recurrenceRule, ...).
+
+    Raises:
+        RecurrenceError: The stored rule or exception dates cannot be parsed.
+    """
+    rule = None
+    if meeting.get("scheduleType") == "recurring" and meeting.get("recurrenceRule"):
+        rule = RecurrenceRule.parse(meeting["recurrenceRule"])
+    return RecurrenceSeries(
+        meeting["startsAt"],
+        rule,
+        meeting.get("recurrenceEndDate") if rule else None,
+        meeting.get("recurrenceExceptions") if rule else (),
+    )
+
+
+class OccurrenceCache:
+    """LRU cache of expanded occurrence dates, one entry per meeting and calendar year.
+
+    An entry remembers the series it was expanded from, so a changed rule,
+    end date or exception list is re-expanded on the next lookup even
+    without invalidate().
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _year(self, meeting_id, series, year):
+        key = (meeting_id, year)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == series.key:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        dates = tuple(series.between(date(year, 1, 1), date(year, 12, 31)))
+        with self._lock:
+            self._entries[key] = (series.key, dates)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return dates
+
+    def between(self, meeting_id, series, start, end):
+        """Occurrence dates from ``start`` to ``end`` inclusive, as a list."""
+        start, end = parse_date(start), parse_date(end)
+        if series.last_possible and series.last_possible < end:
+            end = series.last_possible
+        result = []
+        for year in range(max(start.year, series.dtstart.year), end.year + 1):
+            dates = self._year(meeting_id, series, year)
+            result.extend(dates[bisect_left(dates, start):bisect_right(dates, end)])
+        return result
+
+    def next_after(self, meeting_id, series, day, horizon_years=5):
+        day = parse_date(day)
+        for year in range(max(day.year, series.dtstart.year), day.year + horizon_years + 1):
+            if series.last_possible and year > series.last_possible.year:
+                break
+            dates = self._year(meeting_id, series, year)
+            index = bisect_left(dates, day)
+            if index < len(dates):
+                return dates[index]
+        return None
+
+    def invalidate(self, meeting_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == meeting_id]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,96 @@
+import gzip
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+from static_assets import negotiate_encoding
+
+
+class ResponseCompressor:
+    """gzip/brotli for dynamic responses, negotiated per request.
+
+    Complete bodies are compressed when they are at least ``min_size``
+    bytes. Streamed bodies are compressed chunk by chunk, flushing after
+    each one so the client can decode what has arrived while the rest is
+    still being encoded. Levels default lower than for static assets:
+    these bodies are compressed on every request.
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self._lock = threading.Lock()
+        self._counts = {encoding: {"responses": 0, "bytes_in": 0, "bytes_out": 0} for encoding in self.encodings}
+        self.below_min_size = 0
+
+    def negotiate(self, accept_encoding):
+        """Encoding this client gets for a body worth compressing, or "identity"."""
+        return negotiate_encoding(accept_encoding, self.encodings)
+
+    def choose(self, accept_encoding, size):
+        """Encoding for a complete body of ``size`` bytes."""
+        encoding = self.negotiate(accept_encoding)
+        if encoding != "identity" and size < self.min_size:
+            with self._lock:
+                self.below_min_size += 1
+            return "identity"
+        return encoding
+
+    def compress(self, body, encoding):
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        self._record(encoding, len(body), len(compressed))
+        return compressed
+
+    def compress_stream(self, chunks, encoding):
+        """Compressed pieces of ``chunks``, one per input chunk plus the trailer."""
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            compress, finish = compressor.compress, compressor.flush
+            flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        bytes_in = bytes_out = 0
+        try:
+            for chunk in chunks:
+                piece = compress(chunk) + flush()
+                bytes_in += len(chunk)
+                bytes_out += len(piece)
+                yield piece
+            piece = finish()
+            bytes_out += len(piece)
+            yield piece
+        finally:
+            self._record(encoding, bytes_in, bytes_out)
+
+    def _record(self, encoding, bytes_in, bytes_out):
+        with self._lock:
+            counts = self._counts[encoding]
+            counts["responses"] += 1
+            counts["bytes_in"] += bytes_in
+            counts["bytes_out"] += bytes_out
+
+    def stats(self):
+        with self._lock:
+            by_encoding = {encoding: dict(counts) for encoding, counts in self._counts.items()}
+            below_min_size = self.below_min_size
+        bytes_in = sum(counts["bytes_in"] for counts in by_encoding.values())
+        bytes_out = sum(counts["bytes_out"] for counts in by_encoding.values())
+        return {
+            "responses": sum(counts["responses"] for counts in by_encoding.values()),
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "bytes_saved": bytes_in - bytes_out,
+            "below_min_size": below_min_size,
+            "min_size": self.min_size,
+            "by_encoding": by_encoding,
+        }
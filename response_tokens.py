@@ -0,0 +1,93 @@
+import base64
+import hashlib
+import hmac
+import re
+import struct
+import time
+
+# secrets.token_urlsafe(32), as issued before tokens were signed.
+LEGACY_TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{43}$")
+KEY_ID_RE = re.compile(r"^[A-Za-z0-9]{1,16}$")
+# meeting id, invitee (meeting_invitee_responses) id, expiry as unix time
+_PAYLOAD = struct.Struct(">IIQ")
+_SIGNATURE_BYTES = 16
+
+
+class TokenError(ValueError):
+    """The token is malformed, forged, signed with an unknown key or expired."""
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def parse_token_keys(value):
+    """Parse ``"kid:secret,kid:secret"``; the first key signs, all of them verify.
+
+    Returns:
+        Tuple (keys: dict of key id -> secret bytes, active key id), or
+        ({}, None) when ``value`` is empty.
+    """
+    keys = {}
+    active = None
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        key_id, sep, secret = item.strip().partition(":")
+        if not sep or not KEY_ID_RE.match(key_id) or len(secret) < 16:
+            raise ValueError("RESPONSE_TOKEN_KEYS entries must be kid:secret with a secret of 16+ characters.")
+        keys[key_id] = secret.encode("utf-8")
+        active = active or key_id
+    return keys, active
+
+
+class ResponseTokenSigner:
+    """HMAC-SHA256 signed RSVP tokens: ``<kid>.<payload>.<signature>``.
+
+    The payload carries the meeting id, the invitee row id and an expiry, so
+    a token can be checked without touching the database. Rotate keys by
+    putting a new key first in the list and keeping the old ones until the
+    tokens they signed have expired.
+    """
+
+    def __init__(self, keys, active_key_id, ttl_seconds):
+        if active_key_id not in keys:
+            raise ValueError(f"Active token key {active_key_id!r} is not configured.")
+        self.keys = dict(keys)
+        self.active_key_id = active_key_id
+        self.ttl_seconds = ttl_seconds
+
+    def _sign(self, key_id, message):
+        return hmac.new(self.keys[key_id], message, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+    def issue(self, meeting_id, invitee_id, now=None):
+        expires = int((time.time() if now is None else now) + self.ttl_seconds)
+        payload = _b64encode(_PAYLOAD.pack(meeting_id, invitee_id, expires))
+        signed = f"{self.active_key_id}.{payload}"
+        return f"{signed}.{_b64encode(self._sign(self.active_key_id, signed.encode('ascii')))}"
+
+    def verify(self, token, now=None):
+        """Return (meeting_id, invitee_id) for a valid token.
+
+        Raises:
+            TokenError: For anything else; no detail is given to the caller.
+        """
+        parts = token.split(".")
+        if len(parts) != 3 or parts[0] not in self.keys:
+            raise TokenError("Invalid response token.")
+        key_id, payload, signature = parts
+        try:
+            expected = self._sign(key_id, f"{key_id}.{payload}".encode("ascii"))
+            valid = hmac.compare_digest(expected, _b64decode(signature))
+            meeting_id, invitee_id, expires = _PAYLOAD.unpack(_b64decode(payload))
+        except (ValueError, UnicodeEncodeError, struct.error):
+            raise TokenError("Invalid response token.") from None
+        if not valid:
+            raise TokenError("Invalid response token.")
+        if expires < (time.time() if now is None else now):
+            raise TokenError("Response token has expired.")
+        return meeting_id, invitee_id
@@ -0,0 +1,142 @@
+import re
+import threading
+import time
+from urllib.parse import parse_qs, unquote
+
+# {name} matches one path segment, {name:int} a run of digits passed as int.
+PARAM_RE = re.compile(r"\{(?P<name>[A-Za-z_][A-Za-z0-9_]*)(?::(?P<kind>int|str))?\}")
+PARAM_PATTERNS = {"str": "[^/]+", "int": "[0-9]+"}
+PARAM_CONVERTERS = {"str": unquote, "int": int}
+
+
+class Route:
+    """One registered (method, path pattern) -> handler."""
+
+    def __init__(self, method, pattern, handler, name=None):
+        self.method = method
+        self.pattern = pattern
+        self.handler = handler
+        self.name = name or f"{method} {pattern}"
+        self.converters = {}
+        regex = []
+        position = 0
+        for match in PARAM_RE.finditer(pattern):
+            kind = match.group("kind") or "str"
+            regex.append(re.escape(pattern[position:match.start()]))
+            regex.append(f"(?P<{match.group('name')}>{PARAM_PATTERNS[kind]})")
+            self.converters[match.group("name")] = PARAM_CONVERTERS[kind]
+            position = match.end()
+        regex.append(re.escape(pattern[position:]))
+        self.is_static = not self.converters
+        self.regex = re.compile("^" + "".join(regex) + "$")
+        # Literal text before the first parameter, used to skip routes cheaply.
+        self.prefix = pattern.split("{", 1)[0]
+
+    def match(self, path):
+        """Converted path parameters if ``path`` matches, else None."""
+        if not path.startswith(self.prefix):
+            return None
+        match = self.regex.match(path)
+        if match is None:
+            return None
+        return {name: self.converters[name](value) for name, value in match.groupdict().items()}
+
+
+class RouteTimings:
+    """Timing hook that keeps a count, total and maximum per route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def __call__(self, route, elapsed):
+        with self._lock:
+            entry = self._routes.setdefault(route.name, {"count": 0, "totalMs": 0.0, "maxMs": 0.0})
+            entry["count"] += 1
+            entry["totalMs"] += elapsed * 1000
+            entry["maxMs"] = max(entry["maxMs"], elapsed * 1000)
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {**entry, "avgMs": entry["totalMs"] / entry["count"]}
+                for name, entry in self._routes.items()
+            }
+
+
+class Router:
+    """Method + path dispatch table for a request handler class.
+
+    Static paths are found with one dict lookup; patterned paths are tried in
+    registration order, so register the more specific of two overlapping
+    patterns first (``/x/{token}.ics`` before ``/x/{token}``). Handlers are
+    called as ``handler(request_handler, **path_params)``. Every hook added
+    with add_hook() is called as ``hook(route, elapsed_seconds)`` after each
+    dispatched request, including ones that raised.
+    """
+
+    def __init__(self):
+        self._static = {}
+        self._patterns = {}
+        self._hooks = []
+
+    def add(self, method, pattern, handler, name=None):
+        route = Route(method.upper(), pattern, handler, name)
+        if route.is_static:
+            if (route.method, pattern) in self._static:
+                raise ValueError(f"Route already registered: {route.method} {pattern}")
+            self._static[(route.method, pattern)] = route
+        else:
+            self._patterns.setdefault(route.method, []).append(route)
+        return route
+
+    def route(self, method, pattern, name=None):
+        """Decorator form of add()."""
+        def register(handler):
+            self.add(method, pattern, handler, name)
+            return handler
+        return register
+
+    def add_hook(self, hook):
+        self._hooks.append(hook)
+
+    def match(self, method, path):
+        """Return (route, path_params) for a request, or (None, None)."""
+        route = self._static.get((method, path))
+        if route is not None:
+            return route, {}
+        for route in self._patterns.get(method, ()):
+            params = route.match(path)
+            if params is not None:
+                return route, params
+        return None, None
+
+    def allowed_methods(self, path):
+        """Methods registered for ``path`` under any method, for a 405 Allow header."""
+        methods = set()
+        for method, pattern in self._static:
+            if pattern == path:
+                methods.add(method)
+        for method, routes in self._patterns.items():
+            if any(route.match(path) is not None for route in routes):
+                methods.add(method)
+        return sorted(methods)
+
+    def dispatch(self, request_handler, method, path):
+        """Call the handler for ``method`` and ``path``; False when no route matches."""
+        route, params = self.match(method, path)
+        if route is None:
+            return False
+        started = time.perf_counter()
+        try:
+            route.handler(request_handler, **params)
+        finally:
+            elapsed = time.perf_counter() - started
+            for hook in self._hooks:
+                hook(route, elapsed)
+        return True
+
+
+def parse_query(query):
+    """Decode a query string into a dict of name -> first value."""
+    return {name: values[0] for name, values in parse_qs(query, keep_blank_values=True).items()}
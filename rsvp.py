@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+
+from response_tokens import LEGACY_TOKEN_RE, TokenError
+
+RESPONSE_ACTIONS = {"accept": "Accept", "decline": "Decline", "tentative": "Tentative"}
+
+INVITATION_COLUMNS = """
+    SELECT mir.id AS inviteeId,
+           mir.invitee_email AS inviteeEmail,
+           me.id, me.name,
+           ms.starts_at AS startsAt,
+           ms.start_time AS startTime,
+           ms.end_time AS endTime,
+           ms.timezone,
+           ms.schedule_type AS scheduleType,
+           ms.recurrence_rule AS recurrenceRule,
+           ms.recurrence_end_date AS recurrenceEndDate,
+           ms.recurrence_exdates AS recurrenceExceptions,
+           ms.teams_join_url AS teamsJoinUrl
+    FROM meeting_invitee_responses mir
+    JOIN meetings me ON me.id = mir.meeting_id
+    JOIN meeting_schedules ms ON ms.meeting_id = me.id
+"""
+SIGNED_INVITATION_QUERY = INVITATION_COLUMNS + "WHERE mir.id = %s AND mir.meeting_id = %s"
+LEGACY_INVITATION_QUERY = INVITATION_COLUMNS + "WHERE mir.response_token = %s"
+
+# Conditional on the current status so the statement is idempotent: a
+# repeated click matches no row, and of two concurrent clicks only the one
+# that actually changes the row sees rowcount == 1.
+RECORD_RESPONSE_SQL = """
+    UPDATE meeting_invitee_responses
+    SET status = %s, responded_at = %s
+    WHERE id = %s AND status <> %s
+"""
+
+
+class TTLCache:
+    """Small thread-safe cache whose entries expire ``ttl`` seconds after being set.
+
+    Holds at most ``max_entries``; the least recently used entry is dropped first.
+    """
+
+    def __init__(self, ttl, max_entries=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + self.ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+class RsvpService:
+    """Token checks, invitation lookups and response recording for RSVP links.
+
+    Signed tokens are verified in Python and malformed legacy tokens are
+    rejected by shape, so bad links never reach MySQL. Tokens map to
+    (invitee, meeting) for as long as the invitation exists, and meeting
+    details change rarely, so both are cached for ``ttl`` seconds. A warm
+    click costs a single UPDATE.
+    """
+
+    def __init__(self, ttl=30.0, max_entries=10000, signer=None):
+        self.signer = signer
+        self.tokens = TTLCache(ttl, max_entries)
+        self.meetings = TTLCache(ttl, max_entries)
+        self.rejected = 0
+        # Lookups run on every worker thread; += alone would drop counts.
+        self._rejected_lock = threading.Lock()
+
+    def _parse(self, token):
+        if "." in token:
+            if self.signer is None:
+                raise TokenError("Invalid response token.")
+            meeting_id, invitee_id = self.signer.verify(token)
+            return SIGNED_INVITATION_QUERY, (invitee_id, meeting_id)
+        if LEGACY_TOKEN_RE.match(token):
+            return LEGACY_INVITATION_QUERY, (token,)
+        raise TokenError("Invalid response token.")
+
+    def lookup(self, get_connection, token):
+        """Return (invitee_id, invitee_email, meeting dict) for a response token, or None.
+
+        ``get_connection`` is only called on a cache miss. The meeting dict
+        is shared between requests and must not be modified.
+
+        Raises:
+            TokenError: The token is malformed, forged or expired.
+        """
+        try:
+            query, params = self._parse(token)
+        except TokenError:
+            with self._rejected_lock:
+                self.rejected += 1
+            raise
+
+        invitation = self.tokens.get(token)
+        if invitation is not None:
+            meeting_id, invitee_id, invitee_email = invitation
+            meeting = self.meetings.get(meeting_id)
+            if meeting is not None:
+                return invitee_id, invitee_email, meeting
+
+        conn = get_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        invitee_id = row.pop("inviteeId")
+        invitee_email = row.pop("inviteeEmail")
+        self.tokens.set(token, (row["id"], invitee_id, invitee_email))
+        self.meetings.set(row["id"], row)
+        return invitee_id, invitee_email, row
+
+    def record(self, cursor, invitee_id, status, now):
+        """Set the response status; True only if this call changed it."""
+        cursor.execute(RECORD_RESPONSE_SQL, (status, now, invitee_id, status))
+        return cursor.rowcount == 1
+
+    def invalidate_meeting(self, meeting_id):
+        self.meetings.invalidate(meeting_id)
+
+    def stats(self):
+        with self._rejected_lock:
+            rejected = self.rejected
+        return {"tokens": self.tokens.stats(), "meetings": self.meetings.stats(), "rejected": rejected}
@@ -0,0 +1,309 @@
+import json
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from async_server import AsyncioHTTPServer
+
+
+SERVER_MODES = ("single", "threaded", "asyncio")
+
+
+def _busy_response():
+    body = json.dumps({"error": "Server is busy, please retry shortly."}).encode("utf-8")
+    head = (
+        "HTTP/1.1 503 Service Unavailable\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Retry-After: 1\r\n"
+        "Connection: close\r\n"
+        "\r\n"
+    ).encode("ascii")
+    return head + body
+
+
+class KeepAliveRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler that keeps connections open between requests.
+
+    Every response must be framed (Content-Length, or chunked encoding).
+    A connection is closed after ``keepalive_max_requests`` requests, after
+    ``keepalive_timeout`` idle seconds, or straight away when the server
+    cannot spare the thread: single mode, requests queued behind this
+    connection, or a shutdown in progress. The idle wait is re-checked
+    every ``keepalive_poll_interval`` seconds, so a connection waiting for
+    its next request gives its worker back as soon as work is queued.
+    ``request_timeout`` bounds each read once a request has started.
+    """
+
+    protocol_version = "HTTP/1.1"
+    keepalive_timeout = 5.0
+    keepalive_poll_interval = 0.1
+    keepalive_max_requests = 100
+    request_timeout = 30.0
+    # Headers and body go out as separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK (~40 ms) on every kept-alive request.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.requests_handled = 0
+
+    def _server_wants_connection_back(self):
+        should_close = getattr(self.server, "should_close_idle", None)
+        return should_close is None or should_close()
+
+    def _wait_for_next_request(self):
+        """Wait for the next request on an idle connection; False to close it."""
+        if self._server_wants_connection_back():
+            return False
+        # A pipelined request may already be buffered. With a zero timeout
+        # the peek only takes what the socket has ready; b"" means nothing yet
+        # (or EOF, which the wait below then sees straight away).
+        self.connection.settimeout(0.0)
+        try:
+            if self.rfile.peek(1):
+                return True
+        except OSError:
+            return False
+        # Timeouts on rfile itself would leave it unreadable, so the wait
+        # peeks at the socket, in slices, asking the server in between.
+        deadline = time.monotonic() + self.keepalive_timeout
+        while not self._server_wants_connection_back():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.connection.settimeout(min(self.keepalive_poll_interval, remaining))
+            try:
+                return self.connection.recv(1, socket.MSG_PEEK) != b""
+            except TimeoutError:
+                continue
+            except OSError:
+                return False
+        return False
+
+    def handle_one_request(self):
+        if self.requests_handled and not self._wait_for_next_request():
+            self.close_connection = True
+            return
+        self.connection.settimeout(self.request_timeout)
+        super().handle_one_request()
+        self.requests_handled += 1
+
+    def send_error(self, code, message=None, explain=None):
+        # The base class writes its own "Connection: close" for error pages.
+        self._sending_error = True
+        try:
+            super().send_error(code, message, explain)
+        finally:
+            self._sending_error = False
+
+    def send_response(self, code, message=None):
+        super().send_response(code, message)
+        if getattr(self, "_sending_error", False):
+            return
+        if (self.close_connection
+                or self.requests_handled + 1 >= self.keepalive_max_requests
+                or getattr(self.server, "should_close_idle", None) is None):
+            self.send_header("Connection", "close")
+            return
+        if self.request_version != "HTTP/1.1":
+            self.send_header("Connection", "keep-alive")
+        self.send_header("Keep-Alive", f"timeout={max(1, round(self.keepalive_timeout))}, max={self.keepalive_max_requests}")
+
+
+class BoundedThreadPoolServer(HTTPServer):
+    """HTTPServer that hands accepted connections to a fixed pool of worker threads.
+
+    Accepted connections wait in a bounded queue. When the queue is full the
+    connection is answered with 503 straight away instead of piling up.
+    server_close() drains queued and in-flight requests before returning.
+    """
+
+    def __init__(self, server_address, handler_class, threads=16, queue_size=64,
+                 drain_timeout=30.0, bind_and_activate=True):
+        super().__init__(server_address, handler_class, bind_and_activate)
+        self.threads = threads
+        self.drain_timeout = drain_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._workers = []
+        self._stats_lock = threading.Lock()
+        self._stats = {"accepted": 0, "rejected": 0, "in_flight": 0, "completed": 0}
+        self._draining = False
+
+    def _start_workers(self):
+        # Started lazily so pre-forked children get their own threads.
+        if self._workers:
+            return
+        for index in range(self.threads):
+            worker = threading.Thread(target=self._work, name=f"http-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def serve_forever(self, poll_interval=0.5):
+        self._start_workers()
+        super().serve_forever(poll_interval)
+
+    def process_request(self, request, client_address):
+        try:
+            self._queue.put_nowait((request, client_address))
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            try:
+                request.sendall(_busy_response())
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        with self._stats_lock:
+            self._stats["accepted"] += 1
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            request, client_address = item
+            with self._stats_lock:
+                self._stats["in_flight"] += 1
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._stats_lock:
+                    self._stats["in_flight"] -= 1
+                    self._stats["completed"] += 1
+
+    def should_close_idle(self):
+        """True when an idle keep-alive connection should give its worker back."""
+        return self._draining or not self._queue.empty()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({"threads": self.threads, "queued": self._queue.qsize(), "queue_size": self._queue.maxsize})
+        return stats
+
+    def server_close(self):
+        self._draining = True
+        super().server_close()
+        deadline = time.monotonic() + self.drain_timeout
+        for _ in self._workers:
+            try:
+                self._queue.put(None, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        pending = sum(1 for worker in self._workers if worker.is_alive())
+        if pending:
+            print(f"[SERVER] Drain timeout reached with {pending} worker(s) still busy")
+        self._workers = []
+
+
+def create_server(handler_class, host="0.0.0.0", port=3000, mode="threaded",
+                  threads=16, queue_size=64, drain_timeout=30.0):
+    if mode not in SERVER_MODES:
+        raise ValueError(f"Unknown server mode: {mode}. Expected one of {', '.join(SERVER_MODES)}.")
+    if mode == "single":
+        return HTTPServer((host, port), handler_class)
+    if mode == "asyncio":
+        return AsyncioHTTPServer((host, port), handler_class, threads=threads, drain_timeout=drain_timeout)
+    return BoundedThreadPoolServer(
+        (host, port),
+        handler_class,
+        threads=threads,
+        queue_size=queue_size,
+        drain_timeout=drain_timeout,
+    )
+
+
+def _install_shutdown_handlers(server):
+    def handle(signum, frame):
+        # shutdown() blocks until serve_forever() returns, so it cannot run
+        # on the thread that is executing serve_forever().
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
+
+
+def serve(server, on_start=None, on_stop=None):
+    """Run a server in this process until SIGTERM/SIGINT, then drain and close.
+
+    ``on_start``/``on_stop`` run in the serving process, e.g. to start and stop
+    per-process background workers.
+    """
+    _install_shutdown_handlers(server)
+    if on_start is not None:
+        on_start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if on_stop is not None:
+            on_stop()
+
+
+def serve_prefork(server, workers, before_fork=None, on_start=None, on_stop=None):
+    """Fork ``workers`` processes that all accept on the server's listening socket.
+
+    The parent only supervises: it restarts children that exit unexpectedly and
+    forwards SIGTERM/SIGINT so every child drains before exiting.
+    """
+    if workers <= 1 or not hasattr(os, "fork"):
+        if workers > 1:
+            print("[SERVER] os.fork is unavailable on this platform, running a single process")
+        serve(server, on_start, on_stop)
+        return
+
+    if before_fork is not None:
+        before_fork()
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                serve(server, on_start, on_stop)
+            except Exception as error:
+                print(f"[SERVER] Worker {os.getpid()} crashed: {error}")
+                code = 1
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(workers):
+        spawn()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"[SERVER] Started {workers} worker processes")
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"[SERVER] Worker {pid} exited, starting a replacement")
+            spawn()
+    server.socket.close()
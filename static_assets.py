@@ -0,0 +1,207 @@
+import gzip
+import hashlib
+import re
+import threading
+import time
+from email.utils import formatdate
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+MIME_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".htm": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".mjs": "application/javascript; charset=utf-8",
+    ".json": "application/json",
+    ".map": "application/json",
+    ".webmanifest": "application/manifest+json",
+    ".txt": "text/plain; charset=utf-8",
+    ".xml": "application/xml",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".ico": "image/x-icon",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".otf": "font/otf",
+    ".pdf": "application/pdf",
+    ".wasm": "application/wasm",
+    ".ics": "text/calendar; charset=utf-8",
+}
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/manifest+json",
+                      "application/xml", "image/svg+xml", "application/wasm")
+FINGERPRINT_RE = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{10})(?P<suffix>\.[A-Za-z0-9]+)$")
+# Local stylesheet/script references in HTML that get rewritten to fingerprinted URLs.
+ASSET_REFERENCE_RE = re.compile(r'(?P<attr>href|src)="(?P<path>[^":?#]+\.(?:css|js))"')
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+class StaticAsset:
+    """One file from the public directory, with its pre-compressed variants."""
+
+    def __init__(self, relative_path, body, mtime, content_type, dependencies=None):
+        self.relative_path = relative_path
+        self.mtime = mtime
+        self.content_type = content_type
+        self.dependencies = dependencies or {}
+        digest = hashlib.sha256(body).hexdigest()
+        self.fingerprint = digest[:10]
+        self.etag = f'"{digest[:32]}"'
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.variants = {"identity": body}
+        self.checked_at = time.monotonic()
+
+    @property
+    def fingerprinted_path(self):
+        stem, dot, suffix = self.relative_path.rpartition(".")
+        return f"/{stem}.{self.fingerprint}.{suffix}" if dot else f"/{self.relative_path}"
+
+    def variant(self, encoding):
+        """(body, etag) for a content encoding picked by negotiate_encoding()."""
+        return self.variants[encoding], encoded_etag(self.etag, encoding)
+
+
+def encoded_etag(etag, encoding):
+    """ETag of a content-coded variant; a strong tag must differ per encoding."""
+    if encoding == "identity":
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Pick the best of ``available`` encodings for an Accept-Encoding header.
+
+    Prefers br over gzip when the client weights them equally; falls back to
+    identity.
+    """
+    weights = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+    best, best_quality = "identity", 0.0
+    for encoding in ("br", "gzip"):
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if encoding in available and quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class StaticAssetCache:
+    """In-memory cache of public files, re-read when their mtime changes.
+
+    Each file is read and compressed once; afterwards a request costs one
+    ``stat`` at most every ``check_interval`` seconds. HTML pages get their
+    local ``.css``/``.js`` references rewritten to fingerprinted URLs
+    (``/app.<hash>.js``), which are then safe to cache forever.
+    """
+
+    def __init__(self, root, check_interval=1.0, min_compress_size=512, gzip_level=9, brotli_quality=11):
+        self.root = Path(root).resolve()
+        self.check_interval = check_interval
+        self.min_compress_size = min_compress_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, relative_path):
+        file_path = (self.root / relative_path).resolve()
+        if not file_path.is_relative_to(self.root) or not file_path.is_file():
+            return None
+        return file_path
+
+    def _is_fresh(self, asset):
+        if time.monotonic() - asset.checked_at < self.check_interval:
+            return True
+        file_path = self._resolve(asset.relative_path)
+        if file_path is None or file_path.stat().st_mtime != asset.mtime:
+            return False
+        for dependency, fingerprint in asset.dependencies.items():
+            current = self.get(dependency)
+            if current is None or current.fingerprint != fingerprint:
+                return False
+        asset.checked_at = time.monotonic()
+        return True
+
+    def _load(self, relative_path, file_path):
+        mtime = file_path.stat().st_mtime
+        body = file_path.read_bytes()
+        content_type = MIME_TYPES.get(file_path.suffix.lower(), "application/octet-stream")
+        dependencies = {}
+        if content_type.startswith("text/html"):
+            body, dependencies = self._rewrite_references(relative_path, body)
+        asset = StaticAsset(relative_path, body, mtime, content_type, dependencies)
+        if content_type.startswith(COMPRESSIBLE_TYPES) and len(body) >= self.min_compress_size:
+            asset.variants["gzip"] = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            if brotli is not None:
+                asset.variants["br"] = brotli.compress(body, quality=self.brotli_quality)
+        return asset
+
+    def _rewrite_references(self, relative_path, body):
+        base = Path(relative_path).parent
+        dependencies = {}
+
+        def replace(match):
+            dependency = (base / match.group("path").lstrip("/")).as_posix()
+            asset = self.get(dependency)
+            if asset is None:
+                return match.group(0)
+            dependencies[dependency] = asset.fingerprint
+            return f'{match.group("attr")}="{asset.fingerprinted_path}"'
+
+        text = ASSET_REFERENCE_RE.sub(replace, body.decode("utf-8"))
+        return text.encode("utf-8"), dependencies
+
+    def get(self, relative_path):
+        """Current StaticAsset for a path relative to the root, or None."""
+        asset = self._assets.get(relative_path)
+        if asset is not None and self._is_fresh(asset):
+            return asset
+        file_path = self._resolve(relative_path)
+        if file_path is None:
+            self._assets.pop(relative_path, None)
+            return None
+        asset = self._load(relative_path, file_path)
+        with self._lock:
+            self._assets[relative_path] = asset
+        return asset
+
+    def lookup(self, url_path):
+        """Map a request path to (asset, cache_control).
+
+        Fingerprinted URLs are cached for a year when the hash matches the
+        current file; a stale hash still gets the current file, but only
+        with a revalidating Cache-Control.
+        """
+        relative_path = "index.html" if url_path in ("", "/") else url_path.lstrip("/")
+        asset = self.get(relative_path)
+        if asset is not None:
+            return asset, REVALIDATE_CACHE_CONTROL
+        match = FINGERPRINT_RE.match(relative_path)
+        if match:
+            asset = self.get(match.group("stem") + match.group("suffix"))
+            if asset is not None:
+                immutable = asset.fingerprint == match.group("hash")
+                return asset, IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        return None, None
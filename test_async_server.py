@@ -0,0 +1,137 @@
+import http.client
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from async_server import AsyncioHTTPServer
+from server import KeepAliveRequestHandler
+
+
+class EchoHandler(KeepAliveRequestHandler):
+    keepalive_timeout = 5
+    keepalive_max_requests = 100
+    release = threading.Event()
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/slow":
+            self.release.wait(timeout=5)
+        self._reply({"path": self.path, "thread": threading.current_thread().name, "count": self.requests_handled})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self._reply({"received": len(body)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def async_server():
+    EchoHandler.release = threading.Event()
+    server = AsyncioHTTPServer(("127.0.0.1", 0), EchoHandler, threads=2, drain_timeout=5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    EchoHandler.release.set()
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+def _connection(server):
+    return http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+
+
+def test_requests_run_on_executor_threads_over_one_connection(async_server):
+    conn = _connection(async_server)
+    bodies = []
+    for path in ("/a", "/b"):
+        conn.request("GET", path)
+        response = conn.getresponse()
+        assert response.getheader("Keep-Alive") == "timeout=5, max=100"
+        bodies.append(json.loads(response.read()))
+
+    conn.close()
+
+    assert [body["count"] for body in bodies] == [0, 1]
+    assert all(body["thread"].startswith("async-http-worker") for body in bodies)
+    assert async_server.stats()["accepted"] == 1
+
+
+def test_request_body_is_streamed_to_the_handler(async_server):
+    conn = _connection(async_server)
+    payload = b"x" * 300_000
+    conn.request("POST", "/upload", body=payload)
+    assert json.loads(conn.getresponse().read()) == {"received": len(payload)}
+    conn.close()
+
+
+def test_idle_connections_do_not_hold_executor_threads(async_server):
+    idle = [socket.create_connection(async_server.server_address) for _ in range(50)]
+    try:
+        deadline = time.monotonic() + 2
+        while async_server.stats()["open_connections"] < 50 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        conn = _connection(async_server)
+        conn.request("GET", "/ping")
+        assert json.loads(conn.getresponse().read())["path"] == "/ping"
+        assert async_server.stats()["open_connections"] == 51
+        conn.close()
+    finally:
+        for sock in idle:
+            sock.close()
+
+
+def test_pipelined_requests_are_answered_in_order(async_server):
+    sock = socket.create_connection(async_server.server_address, timeout=5)
+    sock.sendall(b"GET /a HTTP/1.1\r\nHost: x\r\n\r\nGET /b HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+    data = b""
+    while chunk := sock.recv(4096):
+        data += chunk
+    sock.close()
+
+    assert data.index(b'"/a"') < data.index(b'"/b"')
+    assert data.count(b"HTTP/1.1 200 OK") == 2
+
+
+def test_shutdown_finishes_in_flight_request():
+    EchoHandler.release = threading.Event()
+    server = AsyncioHTTPServer(("127.0.0.1", 0), EchoHandler, threads=2, drain_timeout=5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    result = {}
+
+    def slow_request():
+        conn = _connection(server)
+        conn.request("GET", "/slow")
+        result["status"] = conn.getresponse().status
+        conn.close()
+
+    client = threading.Thread(target=slow_request)
+    client.start()
+    deadline = time.monotonic() + 2
+    while server.stats()["in_flight"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    stopper = threading.Thread(target=server.shutdown)
+    stopper.start()
+    time.sleep(0.1)
+    EchoHandler.release.set()
+    stopper.join(timeout=5)
+    client.join(timeout=5)
+    server.server_close()
+
+    thread.join(timeout=5)
+    assert result == {"status": 200}
+    assert not thread.is_alive()
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+from attachment_store import (
+    AttachmentStore,
+    FileSystemAttachmentStore,
+    add_reference,
+    collect_garbage,
+    create_attachment_store,
+)
+
+
+def _spool(store, data):
+    path = store.spool_dir / f"spool-{hashlib.md5(data).hexdigest()}"
+    path.write_bytes(data)
+    return path, hashlib.sha256(data).hexdigest()
+
+
+def test_put_file_stores_content_by_digest(tmp_path):
+    store = FileSystemAttachmentStore(tmp_path)
+    path, sha256 = _spool(store, b"%PDF scan")
+
+    target = store.put_file(path, sha256)
+
+    assert target == tmp_path / sha256[:2] / sha256[2:4] / sha256
+    assert not path.exists()
+    with store.open(sha256) as handle:
+        assert handle.read() == b"%PDF scan"
+    assert store.local_path(sha256) == target
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = FileSystemAttachmentStore(tmp_path)
+    first = store.put_bytes(b"same bytes")
+    path, sha256 = _spool(store, b"same bytes")
+    store.put_file(path, sha256)
+
+    assert first == sha256
+    assert [digest for digest, _ in store.iter_digests()] == [sha256]
+    assert list(store.spool_dir.iterdir()) == []
+
+
+def test_delete_is_idempotent(tmp_path):
+    store = FileSystemAttachmentStore(tmp_path)
+    sha256 = store.put_bytes(b"x")
+    store.delete(sha256)
+    store.delete(sha256)
+    assert not store.exists(sha256)
+
+
+@pytest.mark.parametrize("digest", ["../../etc/passwd", "A" * 64, "ab"])
+def test_invalid_digest_is_rejected(tmp_path, digest):
+    with pytest.raises(ValueError):
+        FileSystemAttachmentStore(tmp_path).open(digest)
+
+
+def test_unknown_backend_is_rejected(tmp_path):
+    assert isinstance(create_attachment_store("filesystem", root=tmp_path), FileSystemAttachmentStore)
+    with pytest.raises(ValueError, match="filesystem"):
+        create_attachment_store("s3")
+
+
+def test_backend_missing_a_method_fails_when_created():
+    class WriteOnlyStore(AttachmentStore):
+        def put_file(self, path, sha256):
+            pass
+
+        def put_bytes(self, data):
+            return hashlib.sha256(data).hexdigest()
+
+    with pytest.raises(TypeError, match="open"):
+        WriteOnlyStore()
+
+
+class BlobTables:
+    """Stand-in connection holding attachment_blobs and meeting_attachments in dicts."""
+
+    def __init__(self, blobs, references):
+        self.blobs = blobs
+        self.references = references
+        self._rows = []
+
+    def cursor(self):
+        return self
+
+    def commit(self):
+        pass
+
+    def execute(self, query, params=()):
+        query = " ".join(query.split())
+        if query.startswith("INSERT INTO attachment_blobs"):
+            sha256, _ = params
+            self.blobs[sha256] = self.blobs.get(sha256, 0) + 1
+        elif "HAVING" in query:
+            self._rows = [(sha, ) for sha, count in self.blobs.items() if self.references.get(sha, 0) != count]
+        elif query.startswith("SELECT ref_count"):
+            self._rows = [(self.blobs[params[0]],)] if params[0] in self.blobs else []
+        elif query.startswith("SELECT COUNT(*)"):
+            self._rows = [(self.references.get(params[0], 0),)]
+        elif query.startswith("UPDATE attachment_blobs"):
+            self.blobs[params[1]] = params[0]
+        elif query.startswith("DELETE FROM attachment_blobs"):
+            del self.blobs[params[0]]
+        elif query.startswith("SELECT 1"):
+            self._rows = [(1,)] if params[0] in self.blobs else []
+        else:
+            raise AssertionError(query)
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+def test_add_reference_counts_each_attachment():
+    tables = BlobTables({}, {})
+    add_reference(tables, "a" * 64, 10)
+    add_reference(tables, "a" * 64, 10)
+    assert tables.blobs == {"a" * 64: 2}
+
+
+def test_collect_garbage_recounts_and_deletes_unreferenced_content(tmp_path):
+    store = FileSystemAttachmentStore(tmp_path)
+    kept = store.put_bytes(b"still attached")
+    cascaded = store.put_bytes(b"meeting was deleted")
+    orphan = store.put_bytes(b"upload rolled back")
+    fresh_orphan = store.put_bytes(b"upload in progress")
+    old = time.time() - 7200
+    for digest in (kept, cascaded, orphan):
+        os.utime(store.local_path(digest), (old, old))
+
+    tables = BlobTables({kept: 3, cascaded: 1}, {kept: 2})
+    result = collect_garbage(tables, store)
+
+    assert result == {"deleted": 1, "recounted": 1, "orphans": 1}
+    assert tables.blobs == {kept: 2}
+    assert store.exists(kept)
+    assert not store.exists(cascaded)
+    assert not store.exists(orphan)
+    assert store.exists(fresh_orphan)
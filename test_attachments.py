@@ -0,0 +1,110 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from attachments import (
+    IncompleteUploadError,
+    RangeNotSatisfiableError,
+    UploadTooLargeError,
+    content_disposition,
+    etag_matches,
+    iter_request_body,
+    parse_byte_range,
+    spool_upload,
+)
+
+
+def test_content_length_body_is_read_in_chunks():
+    body = os.urandom(10_000)
+    chunks = list(iter_request_body(io.BytesIO(body + b"next request"), {"Content-Length": "10000"}, chunk_size=4096))
+
+    assert [len(chunk) for chunk in chunks] == [4096, 4096, 1808]
+    assert b"".join(chunks) == body
+
+
+def test_chunked_body_is_decoded():
+    raw = b"5\r\nhello\r\n6;ext=1\r\n world\r\n0\r\nX-Trailer: 1\r\n\r\nleftover"
+    rfile = io.BytesIO(raw)
+
+    assert b"".join(iter_request_body(rfile, {"Transfer-Encoding": "chunked"})) == b"hello world"
+    assert rfile.read() == b"leftover"
+
+
+@pytest.mark.parametrize(
+    "raw, headers",
+    [
+        (b"short", {"Content-Length": "10"}),
+        (b"5\r\nhel", {"Transfer-Encoding": "chunked"}),
+        (b"zz\r\n", {"Transfer-Encoding": "chunked"}),
+    ],
+)
+def test_truncated_body_raises(raw, headers):
+    with pytest.raises(IncompleteUploadError):
+        b"".join(iter_request_body(io.BytesIO(raw), headers))
+
+
+def test_spool_upload_hashes_and_writes_file(tmp_path):
+    body = os.urandom(200_000)
+    chunks = iter_request_body(io.BytesIO(body), {"Content-Length": str(len(body))})
+
+    with spool_upload(chunks, max_bytes=len(body), spool_dir=tmp_path) as upload:
+        assert upload.size == len(body)
+        assert upload.sha256 == hashlib.sha256(body).hexdigest()
+        assert upload.read_bytes() == body
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spool_upload_stops_reading_at_limit(tmp_path):
+    consumed = []
+
+    def chunks():
+        for _ in range(100):
+            consumed.append(1)
+            yield b"x" * 1024
+
+    with pytest.raises(UploadTooLargeError):
+        spool_upload(chunks(), max_bytes=4096, spool_dir=tmp_path)
+
+    assert len(consumed) == 5
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-200", (800, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+        ("bytes=5-1", None),
+        ("bytes=abc", None),
+    ],
+)
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header, size", [("bytes=1000-", 1000), ("bytes=-0", 1000), ("bytes=-1", 0)])
+def test_unsatisfiable_range(header, size):
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_byte_range(header, size)
+
+
+def test_etag_matches_weak_and_lists():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"def"', '"abc"')
+    assert not etag_matches('"abc"', None)
+
+
+def test_content_disposition_keeps_unicode_name():
+    assert content_disposition('scan "1" é.pdf') == (
+        "attachment; filename=\"scan _1_ _.pdf\"; filename*=UTF-8''scan%20%221%22%20%C3%A9.pdf"
+    )
@@ -0,0 +1,73 @@
+import threading
+from datetime import date
+
+import pytest
+
+from change_bus import ChangeBus, TooManySubscribersError, format_event
+
+
+def test_wait_returns_events_published_after_the_position():
+    bus = ChangeBus()
+    bus.publish("team.created", {"id": 1})
+    start = bus.position()
+    bus.publish("team.created", {"id": 2})
+    bus.publish("rsvp.recorded", {"meetingId": 5})
+
+    events, position = bus.wait(start, timeout=0)
+
+    assert [(event_type, data) for _, event_type, data in events] == [
+        ("team.created", {"id": 2}),
+        ("rsvp.recorded", {"meetingId": 5}),
+    ]
+    assert events[-1][0] == bus.event_id(position)
+    assert bus.wait(position, timeout=0) == ([], position)
+
+
+def test_wait_wakes_up_on_publish():
+    bus = ChangeBus()
+    start = bus.position()
+    threading.Timer(0.05, bus.publish, ("team.created", {"id": 1})).start()
+
+    events, _ = bus.wait(start, timeout=5)
+
+    assert [event_type for _, event_type, _ in events] == ["team.created"]
+
+
+def test_last_event_id_resumes_or_asks_for_a_reload():
+    bus = ChangeBus(history=3)
+    for number in range(5):
+        bus.publish("team.created", {"id": number})
+
+    assert bus.position(bus.event_id(3)) == 3
+    assert bus.position(bus.event_id(2)) == 2
+    assert bus.position(bus.event_id(1)) is None
+    assert bus.position(bus.event_id(9)) is None
+    assert bus.position("other-3") is None
+    assert bus.position("garbage") is None
+
+
+def test_a_stream_that_falls_behind_the_buffer_must_reload():
+    bus = ChangeBus(history=2)
+    start = bus.position()
+    for number in range(3):
+        bus.publish("team.created", {"id": number})
+
+    assert bus.wait(start, timeout=0) == (None, 3)
+
+
+def test_stream_slots_are_limited_and_released():
+    bus = ChangeBus(max_subscribers=1)
+    with bus.subscribe():
+        with pytest.raises(TooManySubscribersError):
+            bus.subscribe()
+        assert bus.stats()["subscribers"] == 1
+    with bus.subscribe():
+        pass
+    assert bus.stats()["subscribers"] == 0
+
+
+def test_format_event():
+    event = ("ab12-7", "meeting.created", {"id": 7, "startsAt": date(2026, 3, 2)})
+    assert format_event(event) == (
+        b'id: ab12-7\nevent: meeting.created\ndata: {"id":7,"startsAt":"2026-03-02"}\n\n'
+    )
@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+
+from db_pool import ConnectionPool, PoolClosedError, PoolTimeoutError
+
+
+class FakeConnection:
+    """Stand-in driver connection recording the calls the pool makes."""
+
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.rollbacks = 0
+        self.resets = 0
+        self.pings = 0
+        self.session_vars = {}
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise ConnectionError("server has gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def reset_session(self):
+        self.resets += 1
+        self.session_vars.clear()
+
+    def close(self):
+        self.closed = True
+
+
+def _make_pool(**kwargs):
+    created = []
+
+    def connect():
+        conn = FakeConnection(len(created) + 1)
+        created.append(conn)
+        return conn
+
+    kwargs.setdefault("healthcheck_idle", 0)
+    return ConnectionPool(connect, **kwargs), created
+
+
+def test_connections_are_reused_and_reset_on_return():
+    pool, created = _make_pool(size=2)
+
+    conn = pool.acquire()
+    conn.session_vars["sql_mode"] = "custom"
+    conn.close()
+    conn = pool.acquire()
+    conn.close()
+
+    assert len(created) == 1
+    assert created[0].rollbacks == 2
+    assert created[0].session_vars == {}
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["connects"] == 1
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+
+
+def test_double_close_returns_connection_once():
+    pool, _ = _make_pool(size=1)
+    conn = pool.acquire()
+    conn.close()
+    conn.close()
+    assert pool.stats()["idle"] == 1
+
+
+def test_checkout_times_out_when_pool_is_exhausted():
+    pool, _ = _make_pool(size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    held.close()
+
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["timeouts"] == 1
+
+
+def test_waiter_gets_connection_when_released():
+    pool, created = _make_pool(size=1, timeout=2)
+    held = pool.acquire()
+    result = {}
+
+    def worker():
+        conn = pool.acquire()
+        result["number"] = conn.number
+        conn.close()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    held.close()
+    thread.join(timeout=2)
+
+    assert result["number"] == 1
+    assert len(created) == 1
+    assert pool.stats()["waits"] in {0, 1}
+
+
+def test_dead_connection_is_replaced_on_checkout():
+    pool, created = _make_pool(size=1)
+    conn = pool.acquire()
+    conn.close()
+    created[0].alive = False
+
+    conn = pool.acquire()
+    assert conn.number == 2
+    conn.close()
+
+    assert created[0].closed
+    assert pool.stats()["healthcheck_failures"] == 1
+    assert pool.stats()["open"] == 1
+
+
+def test_connect_failure_frees_slot():
+    calls = []
+
+    def connect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionRefusedError("database down")
+        return FakeConnection(len(calls))
+
+    pool = ConnectionPool(connect, size=1, timeout=0.05)
+    with pytest.raises(ConnectionRefusedError):
+        pool.acquire()
+    conn = pool.acquire()
+    conn.close()
+    assert pool.stats()["connect_errors"] == 1
+
+
+def test_closed_pool_rejects_checkout():
+    pool, created = _make_pool(size=1)
+    pool.acquire().close()
+    pool.close()
+    assert created[0].closed
+    with pytest.raises(PoolClosedError):
+        pool.acquire()
@@ -0,0 +1,240 @@
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+import pytest
+
+from email_outbox import OutboxDispatcher, create_smtp_pool, enqueue_messages
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server: enough of RFC 5321 for smtplib login + sendmail."""
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply("220 stub.local ESMTP")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self._reply("250-stub.local")
+                self._reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                with server.lock:
+                    server.logins += 1
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                if address in server.reject:
+                    self._reply(server.reject[address])
+                else:
+                    recipients.append(address)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                body = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if data_line in (b".\r\n", b""):
+                        break
+                    body.append(data_line)
+                with server.lock:
+                    for recipient in recipients:
+                        server.messages.append((recipient, b"".join(body)))
+                self._reply("250 OK queued")
+            elif verb in {"RSET", "NOOP"}:
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubSMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.logins = 0
+        self.messages = []
+        self.reject = {}
+
+
+class InMemoryOutboxStore:
+    """Stand-in for OutboxStore with the same claim/mark semantics.
+
+    ``now`` plays the database clock.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.now = datetime(2026, 3, 1, 9, 0)
+
+    def add(self, recipient, body=b"Subject: hi\r\n\r\nhello\r\n"):
+        row_id = len(self.rows) + 1
+        self.rows[row_id] = {
+            "id": row_id,
+            "recipient": recipient,
+            "message": body,
+            "attempts": 0,
+            "status": "Pending",
+            "next_attempt_at": datetime.min,
+            "last_error": None,
+        }
+        return row_id
+
+    def claim(self, limit):
+        due = [
+            row for row in self.rows.values()
+            if row["status"] == "Pending" and row["next_attempt_at"] <= self.now
+        ][:limit]
+        for row in due:
+            row["status"] = "Sending"
+        return [dict(row) for row in due]
+
+    def mark_sent(self, ids):
+        for row_id in ids:
+            self.rows[row_id].update(status="Sent", attempts=self.rows[row_id]["attempts"] + 1)
+
+    def mark_failed(self, failures):
+        for row_id, status, retry_seconds, error in failures:
+            row = self.rows[row_id]
+            next_attempt_at = self.now + timedelta(seconds=int(retry_seconds))
+            row.update(status=status, next_attempt_at=next_attempt_at, last_error=error, attempts=row["attempts"] + 1)
+
+
+@pytest.fixture
+def smtp_server():
+    server = StubSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _dispatcher(smtp_server, store, **kwargs):
+    settings = {
+        "host": "127.0.0.1",
+        "port": smtp_server.server_address[1],
+        "user": "planner",
+        "password": "secret",
+        "from": "planner@example.com",
+        "use_tls": False,
+    }
+    return OutboxDispatcher(store, create_smtp_pool(settings, size=1), settings["from"], **kwargs)
+
+
+def test_batch_is_sent_over_one_authenticated_session(smtp_server):
+    store = InMemoryOutboxStore()
+    for index in range(5):
+        store.add(f"user{index}@example.com")
+    dispatcher = _dispatcher(smtp_server, store, batch_size=3)
+
+    assert dispatcher.dispatch_once() == 3
+    assert dispatcher.dispatch_once() == 2
+    assert dispatcher.dispatch_once() == 0
+    dispatcher.smtp_pool.close()
+
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == 1
+    assert sorted(recipient for recipient, _ in smtp_server.messages) == [
+        f"user{index}@example.com" for index in range(5)
+    ]
+    assert {row["status"] for row in store.rows.values()} == {"Sent"}
+
+
+def test_temporary_failure_is_retried_with_backoff(smtp_server):
+    smtp_server.reject["busy@example.com"] = "451 4.3.0 Try again later"
+    store = InMemoryOutboxStore()
+    row_id = store.add("busy@example.com")
+    ok_id = store.add("ok@example.com")
+    dispatcher = _dispatcher(smtp_server, store, backoff_base=60)
+    now = store.now
+
+    dispatcher.dispatch_once()
+    dispatcher.smtp_pool.close()
+
+    row = store.rows[row_id]
+    assert row["status"] == "Pending"
+    assert row["attempts"] == 1
+    assert now + timedelta(seconds=47) < row["next_attempt_at"] < now + timedelta(seconds=73)
+    assert "451" in row["last_error"]
+    assert store.rows[ok_id]["status"] == "Sent"
+    assert dispatcher.stats()["retried"] == 1
+
+
+def test_permanent_rejection_fails_without_retry(smtp_server):
+    smtp_server.reject["gone@example.com"] = "550 5.1.1 No such user"
+    store = InMemoryOutboxStore()
+    row_id = store.add("gone@example.com")
+    dispatcher = _dispatcher(smtp_server, store)
+
+    dispatcher.dispatch_once()
+    dispatcher.smtp_pool.close()
+
+    assert store.rows[row_id]["status"] == "Failed"
+    assert dispatcher.stats()["failed"] == 1
+
+
+def test_message_fails_after_max_attempts(smtp_server):
+    smtp_server.reject["busy@example.com"] = "451 4.3.0 Try again later"
+    store = InMemoryOutboxStore()
+    row_id = store.add("busy@example.com")
+    store.rows[row_id]["attempts"] = 2
+    dispatcher = _dispatcher(smtp_server, store, max_attempts=3)
+
+    dispatcher.dispatch_once()
+    dispatcher.smtp_pool.close()
+
+    assert store.rows[row_id]["status"] == "Failed"
+    assert store.rows[row_id]["attempts"] == 3
+
+
+def test_unreachable_server_defers_whole_batch():
+    store = InMemoryOutboxStore()
+    ids = [store.add(f"user{index}@example.com") for index in range(3)]
+    settings = {"host": "127.0.0.1", "port": 1, "user": "u", "password": "p", "from": "f@example.com", "use_tls": False}
+    dispatcher = OutboxDispatcher(store, create_smtp_pool(settings, size=1), settings["from"])
+
+    dispatcher.dispatch_once()
+
+    assert [store.rows[row_id]["status"] for row_id in ids] == ["Pending"] * 3
+    assert dispatcher.smtp_pool.stats()["connect_errors"] == 1
+
+
+def test_enqueue_messages_inserts_serialized_messages():
+    class RecordingCursor:
+        def executemany(self, query, rows):
+            self.query = query
+            self.rows = rows
+
+    msg = EmailMessage()
+    msg["Subject"] = "Meeting Invite: Tumor Board"
+    msg["From"] = "planner@example.com"
+    msg["To"] = "dr.who@example.com"
+    msg.set_content("You are invited.")
+    cursor = RecordingCursor()
+
+    assert enqueue_messages(cursor, [msg], meeting_id=7) == 1
+    assert "INSERT INTO email_outbox" in cursor.query
+    meeting_id, recipient, subject, body = cursor.rows[0]
+    assert (meeting_id, recipient, subject) == (7, "dr.who@example.com", "Meeting Invite: Tumor Board")
+    assert b"You are invited." in body
@@ -0,0 +1,72 @@
+import pytest
+
+from email_templates import CompiledTemplate, get_template, meeting_template_values
+
+MEETING = {
+    "id": 42,
+    "name": "Tumor Board <Oncology & Radiology>",
+    "startsAt": "2026-03-02",
+    "startTime": "08:00",
+    "endTime": "09:00",
+    "timezone": "EST",
+    "teamsJoinUrl": "https://teams.microsoft.com/l/meeting/new?subject=a&b=c",
+    "scheduleType": "one-time",
+    "recurrenceRule": None,
+    "recurrenceEndDate": None,
+}
+
+LINKS = {
+    "acceptLink": "http://localhost:3000/api/respond-to-meeting/tok?action=accept&calendar=1",
+    "declineLink": "http://localhost:3000/api/respond-to-meeting/tok?action=decline",
+    "tentativeLink": "http://localhost:3000/api/respond-to-meeting/tok?action=tentative",
+}
+
+
+def test_html_templates_escape_values():
+    template = CompiledTemplate.compile("<p>{{ name }}</p>", autoescape=True)
+    assert template.render({"name": "<script>alert(1)</script>"}) == "<p>&lt;script&gt;alert(1)&lt;/script&gt;</p>"
+
+
+def test_text_templates_do_not_escape():
+    template = CompiledTemplate.compile("Meeting: {{name}}")
+    assert template.render({"name": "A & B"}) == "Meeting: A & B"
+
+
+def test_partial_then_render_matches_full_render():
+    template = CompiledTemplate.compile("{{a}}-{{b}}-{{a}}-{{c}}", autoescape=True)
+    partial = template.partial({"a": "<x>", "c": 3})
+
+    assert partial.fields == ["b"]
+    assert partial.render({"b": "&"}) == template.render({"a": "<x>", "b": "&", "c": 3})
+
+
+def test_render_reports_missing_values():
+    with pytest.raises(KeyError, match="b"):
+        CompiledTemplate.compile("{{a}}{{b}}").render({"a": 1})
+
+
+def test_invite_template_leaves_only_recipient_slots():
+    values = {**meeting_template_values(MEETING), "teamsJoinUrl": MEETING["teamsJoinUrl"]}
+    partial = get_template("invite_email.html").partial(values)
+
+    assert sorted(partial.fields) == ["acceptLink", "declineLink", "tentativeLink"]
+    rendered = partial.render(LINKS)
+    assert "Tumor Board &lt;Oncology &amp; Radiology&gt;" in rendered
+    assert 'href="http://localhost:3000/api/respond-to-meeting/tok?action=accept&amp;calendar=1"' in rendered
+    assert "{{" not in rendered
+
+
+def test_templates_are_compiled_once():
+    assert get_template("invite_email.txt") is get_template("invite_email.txt")
+
+
+def test_accepted_page_only_mentions_the_email_when_one_is_sent():
+    links = {"googleUrl": "g", "outlookUrl": "o", "icsUrl": "i"}
+
+    without_email = get_template("meeting_accepted.html").render({**links, "emailNote": ""})
+    with_email = get_template("meeting_accepted.html").render(
+        {**links, "emailNote": "A calendar invite email is being sent to a@example.com."}
+    )
+
+    assert "email" not in without_email.lower()
+    assert "a@example.com" in with_email
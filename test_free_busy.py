@@ -0,0 +1,169 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from free_busy import BusyIndex, free_busy, merge_intervals, parse_free_busy_filters
+
+TODAY = date(2026, 3, 1)
+
+
+def _params(**values):
+    return lambda name, default="": values.get(name, default)
+
+
+def _at(day, hour, minute=0):
+    return datetime(2026, 3, day, hour, minute)
+
+
+class BusyTables:
+    """Stand-in connection answering the three busy index queries from in-memory rows."""
+
+    def __init__(self, occurrences, invites=(), responses=()):
+        self.occurrences = list(occurrences)
+        self.invites = list(invites)
+        self.responses = list(responses)
+        self.ranges = []
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def execute(self, query, params):
+        start, end = params
+        in_range = {row[0] for row in self.occurrences if start <= row[1].date() < end}
+        if "FROM meeting_occurrences" in query.split("WHERE")[0]:
+            self.ranges.append(params)
+            self._rows = [
+                {"meeting_id": m, "occurrence_start": s, "occurrence_end": e}
+                for m, s, e in self.occurrences if m in in_range and start <= s.date() < end
+            ]
+        elif "FROM meeting_invites" in query:
+            self._rows = [{"meeting_id": m, "emails": emails} for m, emails in self.invites if m in in_range]
+        else:
+            self._rows = [
+                {"meeting_id": m, "invitee_email": email, "status": status}
+                for m, email, status in self.responses if m in in_range
+            ]
+
+    def fetchall(self):
+        return self._rows
+
+
+def _index(tables, until=date(2026, 3, 31)):
+    index = BusyIndex()
+    index.rebuild(tables, TODAY, until)
+    return index
+
+
+def test_rebuild_books_invitees_unless_they_declined():
+    tables = BusyTables(
+        [(1, _at(2, 8), _at(2, 9)), (2, _at(2, 8, 30), _at(2, 10))],
+        invites=[(1, "a@example.com, B@example.com"), (2, "b@example.com")],
+        responses=[(1, "b@example.com", "Decline"), (2, "b@example.com", "Accept")],
+    )
+    index = _index(tables)
+
+    assert [c["meetingId"] for c in index.conflicts(["a@example.com"], [(_at(2, 8, 45), _at(2, 9, 15))])] == [1]
+    assert [c["meetingId"] for c in index.conflicts(["b@example.com"], [(_at(2, 7), _at(2, 8, 45))])] == [2]
+    assert index.conflicts(["a@example.com"], [(_at(2, 9), _at(2, 10))]) == []
+
+
+def test_long_occurrence_is_found_from_a_later_window():
+    tables = BusyTables(
+        [(1, _at(2, 6), _at(2, 18)), (2, _at(2, 9), _at(2, 9, 30))],
+        invites=[(1, "a@example.com"), (2, "a@example.com")],
+    )
+    index = _index(tables)
+
+    found = index.conflicts(["a@example.com"], [(_at(2, 16), _at(2, 17))])
+    assert [(c["meetingId"], c["start"]) for c in found] == [(1, _at(2, 6))]
+
+
+def test_writes_update_the_index():
+    index = _index(BusyTables([]))
+    beyond_index = (datetime(2026, 5, 1, 8), datetime(2026, 5, 1, 9))
+    index.add_meeting(7, [(_at(3, 8), _at(3, 9)), (_at(10, 8), _at(10, 9)), beyond_index], ["a@example.com"])
+
+    assert len(index.conflicts(["a@example.com"], [(_at(1, 0), _at(31, 0))])) == 2
+
+    index.set_attendance(7, "A@example.com", "Decline")
+    assert index.conflicts(["a@example.com"], [(_at(1, 0), _at(31, 0))]) == []
+    index.set_attendance(7, "a@example.com", "Accept")
+    assert len(index.conflicts(["a@example.com"], [(_at(3, 8, 30), _at(3, 8, 45))])) == 1
+    assert index.conflicts(["a@example.com"], [(_at(3, 8), _at(3, 9))], exclude_meeting_id=7) == []
+
+
+def test_extend_loads_only_the_new_dates():
+    tables = BusyTables(
+        [(1, _at(2, 8), _at(2, 9)), (1, datetime(2026, 4, 6, 8), datetime(2026, 4, 6, 9))],
+        invites=[(1, "a@example.com")],
+    )
+    index = _index(tables)
+    index.extend(tables, date(2026, 4, 30))
+
+    assert tables.ranges[-1] == (date(2026, 4, 1), date(2026, 5, 1))
+    assert index.stats()["intervals"] == 2
+
+
+def test_writes_during_a_rebuild_are_replayed():
+    index = BusyIndex()
+
+    class SlowTables(BusyTables):
+        def execute(self, query, params):
+            if not self.ranges:
+                index.add_meeting(9, [(_at(4, 8), _at(4, 9))], ["a@example.com"])
+            super().execute(query, params)
+
+    index.rebuild(SlowTables([]), TODAY, date(2026, 3, 31))
+    assert [c["meetingId"] for c in index.conflicts(["a@example.com"], [(_at(4, 8), _at(4, 9))])] == [9]
+
+
+def test_free_busy_merges_and_clips_blocks():
+    tables = BusyTables(
+        [(1, _at(2, 8), _at(2, 9)), (2, _at(2, 9), _at(2, 10)), (3, _at(3, 23), _at(4, 1))],
+        invites=[(1, "a@example.com"), (2, "a@example.com"), (3, "a@example.com")],
+    )
+    filters = parse_free_busy_filters(
+        _params(emails="a@example.com, nobody@example.com", **{"from": "2026-03-02", "to": "2026-03-03"}), TODAY
+    )
+
+    assert free_busy(_index(tables), filters) == {
+        "from": "2026-03-02",
+        "to": "2026-03-03",
+        "attendees": {
+            "a@example.com": [
+                {"start": "2026-03-02T08:00:00", "end": "2026-03-02T10:00:00"},
+                {"start": "2026-03-03T23:00:00", "end": "2026-03-04T00:00:00"},
+            ],
+            "nobody@example.com": [],
+        },
+    }
+
+
+def test_merge_intervals():
+    assert merge_intervals([(1, 3), (2, 4), (4, 5), (7, 8)]) == [(1, 5), (7, 8)]
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [
+        ({"from": "2026-03-02", "to": "2026-03-03"}, "emails"),
+        ({"emails": "a@example.com", "to": "2026-03-03"}, "from is required"),
+        ({"emails": "a@example.com", "from": "2026-02-27", "to": "2026-03-03"}, "past"),
+        ({"emails": "a@example.com", "from": "2026-03-02", "to": "2026-06-01"}, "at most"),
+        ({"emails": ",".join(f"u{n}@x.org" for n in range(101)), "from": "2026-03-02", "to": "2026-03-03"}, "100"),
+    ],
+)
+def test_invalid_free_busy_filters(params, message):
+    with pytest.raises(ValueError, match=message):
+        parse_free_busy_filters(_params(**params), TODAY)
+
+
+def test_lookup_in_a_long_daily_series():
+    index = BusyIndex()
+    index.rebuild(BusyTables([]), TODAY, date(2026, 12, 31))
+    day = datetime(2026, 3, 2, 8)
+    daily = [(day + timedelta(days=n), day + timedelta(days=n, hours=1)) for n in range(300)]
+    index.add_meeting(1, daily, ["a@example.com"])
+
+    window = (datetime(2026, 6, 1, 8, 30), datetime(2026, 6, 1, 8, 45))
+    assert [c["start"] for c in index.conflicts(["a@example.com"], [window])] == [datetime(2026, 6, 1, 8)]
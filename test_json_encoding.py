@@ -0,0 +1,66 @@
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import pytest
+
+import json_encoding
+from json_encoding import dumps, iter_json_array
+
+ROW = {
+    "id": 7,
+    "name": "Tumor board – Ward 4",
+    "startsAt": date(2026, 3, 2),
+    "startTime": timedelta(hours=8, minutes=30),
+    "createdAt": datetime(2026, 3, 1, 12, 0, 5),
+    "alarm": time(7, 45),
+    "cost": Decimal("12.50"),
+    "responses": {"a@example.com": "Accept"},
+    "recurrenceRule": None,
+}
+EXPECTED = (
+    '{"id":7,"name":"Tumor board – Ward 4","startsAt":"2026-03-02","startTime":"8:30:00",'
+    '"createdAt":"2026-03-01T12:00:05","alarm":"07:45:00","cost":"12.50",'
+    '"responses":{"a@example.com":"Accept"},"recurrenceRule":null}'
+).encode("utf-8")
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(json_encoding, "orjson", None)
+    return request.param
+
+
+def test_mysql_column_types_encode_the_same_with_either_encoder(encoder):
+    assert json_encoding.encoder_name() == encoder
+    assert dumps(ROW) == EXPECTED
+    assert dumps({1: "a"}) == b'{"1":"a"}'
+
+
+@pytest.mark.parametrize("count", [0, 1, 3, 4, 10])
+def test_streamed_array_joins_to_the_whole_document(encoder, count):
+    items = [{"id": n, "startsAt": date(2026, 3, 1) + timedelta(days=n)} for n in range(count)]
+    chunks = list(iter_json_array(items, chunk_items=3))
+
+    assert b"".join(chunks) == dumps(items)
+    assert json.loads(b"".join(chunks)) == json.loads(dumps(items))
+    assert len(chunks) == max(1, -(-count // 3))
+
+
+def test_streamed_array_pulls_items_lazily(encoder):
+    pulled = []
+
+    def rows():
+        for n in range(7):
+            pulled.append(n)
+            yield {"id": n}
+
+    chunks = iter_json_array(rows(), chunk_items=3)
+
+    assert next(chunks) == b'[{"id":0},{"id":1},{"id":2}'
+    # Only the first piece and one piece of look-ahead have been read.
+    assert pulled == list(range(6))
+    assert b"".join([b'[{"id":0},{"id":1},{"id":2}', *chunks]) == dumps([{"id": n} for n in range(7)])
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from list_cache import ListCache, SharedCacheVersions, create_cache_versions
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_invalidation_reaches_only_dependent_keys():
+    cache = ListCache(ttl=300)
+    loads = []
+
+    def load(name):
+        def loader():
+            loads.append(name)
+            return [name]
+        return loader
+
+    def read_all():
+        cache.get_or_load(cache.key("teams", depends_on=("teams",)), load("teams"))
+        cache.get_or_load(cache.key("members", depends_on=("members", "teams")), load("members"))
+        cache.get_or_load(cache.key("meeting", 1, ("meeting:1",)), load("meeting 1"))
+        cache.get_or_load(cache.key("meeting", 2, ("meeting:2",)), load("meeting 2"))
+
+    read_all()
+    read_all()
+    assert len(loads) == 4
+
+    cache.invalidate("teams")
+    cache.invalidate("meeting:2")
+    read_all()
+    assert loads[4:] == ["teams", "members", "meeting 2"]
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_entries_expire_and_least_recently_used_is_evicted():
+    clock = FakeClock()
+    cache = ListCache(ttl=10, max_entries=2, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    clock.now = 11
+    assert cache.get("c") is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_etag_follows_versions_not_content():
+    cache = ListCache(ttl=300, clock=FakeClock())
+    etag = cache.etag(cache.key("teams", depends_on=("teams",)))
+
+    assert cache.etag(cache.key("teams", depends_on=("teams",))) == etag
+    assert etag.startswith('"') and etag.endswith('"')
+    cache.invalidate("members")
+    assert cache.etag(cache.key("teams", depends_on=("teams",))) == etag
+    cache.invalidate("teams")
+    assert cache.etag(cache.key("teams", depends_on=("teams",))) != etag
+    # Another process's counters may also read 0: its tags must not match.
+    other = ListCache(ttl=300)
+    assert other.etag(other.key("teams", depends_on=("teams",))) != cache.etag(("teams", (), (0,)))
+
+
+def test_local_etags_roll_over_every_ttl():
+    # Another worker's write never bumps local versions; the tag must not
+    # keep answering 304 for it past the TTL.
+    clock = FakeClock()
+    cache = ListCache(ttl=300, clock=clock)
+    shared = ListCache(ttl=300, versions=SharedCacheVersions(slots=64), clock=clock)
+    key = cache.key("teams", depends_on=("teams",))
+    shared_key = shared.key("teams", depends_on=("teams",))
+    etag, shared_etag = cache.etag(key), shared.etag(shared_key)
+
+    clock.now = 299
+    assert cache.etag(key) == etag
+    clock.now = 300
+    assert cache.etag(key) != etag
+    assert shared.etag(shared_key) == shared_etag
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_shared_versions_carry_invalidations_across_forked_workers():
+    cache = ListCache(ttl=300, versions=SharedCacheVersions(slots=64))
+    key = cache.key("teams", depends_on=("teams",))
+    cache.set(key, ["stale"])
+
+    pid = os.fork()
+    if pid == 0:
+        cache.invalidate("teams")
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert cache.key("teams", depends_on=("teams",)) != key
+    assert cache.stats()["versions"] == "shared"
+
+
+def test_unknown_version_backend():
+    with pytest.raises(ValueError, match="local, shared"):
+        create_cache_versions("redis")
@@ -0,0 +1,239 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from meeting_listing import (
+    DEFAULT_PAGE_SIZE,
+    build_meeting_page_query,
+    decode_cursor,
+    encode_cursor,
+    fetch_meeting_options,
+    fetch_meeting_page,
+    fetch_meeting_page_ids,
+    parse_meeting_filters,
+)
+
+
+def _params(**values):
+    return lambda name, default="": values.get(name, default)
+
+
+def test_cursor_round_trip_uses_mysql_column_types():
+    row = {"startsAt": date(2026, 3, 2), "startTime": timedelta(hours=8, minutes=30), "id": 17}
+    cursor = encode_cursor(row)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2026-03-02", "8:30:00", 17)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "W10", encode_cursor({"startsAt": "x", "startTime": "", "id": 1})])
+def test_bad_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_filters_default_to_first_page():
+    filters = parse_meeting_filters(_params())
+    assert filters["limit"] == DEFAULT_PAGE_SIZE
+    assert filters["after"] is None
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [
+        ({"limit": "0"}, "limit"),
+        ({"limit": "abc"}, "limit"),
+        ({"from": "03/02/2026"}, "from"),
+        ({"scheduleType": "weekly"}, "scheduleType"),
+        ({"teamId": "x"}, "teamId"),
+        ({"name": "x" * 256}, "name"),
+    ],
+)
+def test_invalid_filters_raise_value_error(params, message):
+    with pytest.raises(ValueError, match=message):
+        parse_meeting_filters(_params(**params))
+
+
+def test_page_query_applies_keyset_and_filters():
+    cursor = encode_cursor({"startsAt": "2026-03-02", "startTime": "08:00:00", "id": 9})
+    filters = parse_meeting_filters(
+        _params(limit="10", cursor=cursor, scheduleType="recurring", teamId="3", **{"from": "2026-01-01"})
+    )
+
+    sql, params = build_meeting_page_query(filters)
+
+    assert "ms.schedule_type = %s" in sql
+    assert "ms.starts_at >= %s" in sql
+    assert "tm.team_id = %s" in sql
+    assert "FROM meeting_invites mi" in sql
+    assert "ORDER BY ms.starts_at DESC, ms.start_time DESC, ms.meeting_id DESC" in sql
+    assert params == [
+        "recurring",
+        "2026-01-01",
+        "2026-03-02", "2026-03-02", "08:00:00", "08:00:00", 9,
+        3,
+        11,
+    ]
+    assert sql.count("%s") == len(params)
+
+
+def test_page_query_searches_name_and_one_patient_across_all_meetings():
+    filters = parse_meeting_filters(_params(name=" 50%_off ", patientName="Doe", mrn="MRN1"))
+
+    sql, params = build_meeting_page_query(filters)
+
+    assert "me.name LIKE %s" in sql
+    assert "mpd.patient_name LIKE %s AND mpd.medical_record_number LIKE %s" in sql
+    assert params == ["%50\\%\\_off%", "%Doe%", "%MRN1%", DEFAULT_PAGE_SIZE + 1]
+    assert sql.count("%s") == len(params)
+
+
+def test_page_query_without_search_skips_patient_lookup():
+    sql, _ = build_meeting_page_query(parse_meeting_filters(_params(name="  ")))
+
+    assert "LIKE" not in sql
+    assert "meeting_patient_details" not in sql
+
+
+class ScriptedConnection:
+    """Stand-in connection answering each query by the table it reads."""
+
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+        table = query.split("FROM", 1)[1].split()[0]
+        self._rows = self.results.get(table, [])
+
+    def fetchall(self):
+        return self._rows
+
+
+def _schedule(meeting_id, day):
+    return {
+        "id": meeting_id,
+        "name": f"Meeting {meeting_id}",
+        "starts_at": date(2026, 3, day),
+        "start_time": timedelta(hours=8),
+        "end_time": timedelta(hours=9),
+        "timezone": "EST",
+        "teams_join_url": None,
+        "schedule_type": "one-time",
+        "recurrence_rule": None,
+        "recurrence_end_date": None,
+        "recurrence_exdates": None,
+    }
+
+
+def test_fetch_meeting_page_assembles_children_per_meeting():
+    conn = ScriptedConnection(
+        {
+            "meeting_schedules": [_schedule(2, 5), _schedule(1, 4), _schedule(0, 3)],
+            "meeting_patient_details": [
+                {
+                    "id": 10, "meeting_id": 2, "patient_name": "Ann", "medical_record_number": "MRN|1",
+                    "patient_date_of_birth": date(1970, 1, 1), "doctor_name": "Dr. B", "department_name": "Onc",
+                    "meeting_agenda_note": "review CT | MRI", "patient_description": "",
+                },
+            ],
+            "meeting_attachments": [
+                {"id": 5, "meeting_id": 2, "file_name": "ct.pdf", "file_type": "application/pdf", "file_size": 10},
+                {"id": 6, "meeting_id": 2, "file_name": "ct.pdf", "file_type": "application/pdf", "file_size": 12},
+                {"id": 4, "meeting_id": 2, "file_name": "mri.pdf", "file_type": None, "file_size": 99},
+            ],
+            "meeting_invites": [{"meeting_id": 1, "emails": "a@example.com, b@example.com"}],
+            "meeting_invitee_responses": [
+                {"meeting_id": 1, "invitee_email": "a@example.com", "status": "Accept"},
+                {"meeting_id": 1, "invitee_email": "b@example.com", "status": "Pending"},
+            ],
+        }
+    )
+
+    meetings, has_more = fetch_meeting_page(conn, parse_meeting_filters(_params(limit="2")))
+
+    assert has_more
+    assert [meeting["id"] for meeting in meetings] == [2, 1]
+    first, second = meetings
+    assert first["patients"] == [
+        {
+            "patientDetailId": 10, "patientName": "Ann", "medicalRecordNumber": "MRN|1",
+            "patientDateOfBirth": date(1970, 1, 1), "doctorName": "Dr. B", "departmentName": "Onc",
+            "meetingAgendaNote": "review CT | MRI", "patientDescription": None,
+        }
+    ]
+    assert first["attachmentCount"] == 3
+    assert first["attachmentNames"] == "ct.pdf, mri.pdf"
+    assert [attachment["id"] for attachment in first["attachments"]] == [5, 6, 4]
+    assert first["attachments"][2] == {"id": 4, "fileName": "mri.pdf", "fileType": None, "fileSize": 99}
+    assert second["attachments"] == []
+    assert first["invitees"] is None
+    assert second["invitees"] == "a@example.com, b@example.com"
+    assert second["responses"] == {"a@example.com": "Accept", "b@example.com": "Pending"}
+    assert all(params == [2, 1] for _, params in conn.queries[1:])
+    assert not any("file_data" in query for query, _ in conn.queries)
+
+
+def test_fetch_meeting_page_skips_child_queries_for_empty_page():
+    conn = ScriptedConnection({})
+    assert fetch_meeting_page(conn, parse_meeting_filters(_params())) == ([], False)
+    assert len(conn.queries) == 1
+
+
+def test_fetch_meeting_page_ids_reads_only_the_page_query():
+    conn = ScriptedConnection({"meeting_schedules": [{"id": 2}, {"id": 1}, {"id": 0}]})
+
+    assert fetch_meeting_page_ids(conn, parse_meeting_filters(_params(limit="2"))) == ([2, 1], True)
+    assert len(conn.queries) == 1
+    assert "SELECT ms.meeting_id AS id" in conn.queries[0][0]
+
+
+def test_meeting_options_match_name_or_id():
+    conn = ScriptedConnection({"meeting_schedules": [{"id": 12, "name": "Tumor Board", "starts_at": date(2026, 3, 2)}]})
+
+    assert fetch_meeting_options(conn, "#12") == [{"id": 12, "name": "Tumor Board", "startsAt": date(2026, 3, 2)}]
+    query, params = conn.queries[0]
+    assert "(me.name LIKE %s OR me.id = %s)" in query
+    assert params == ["%#12%", 12, 20]
+
+    fetch_meeting_options(conn, "")
+    query, params = conn.queries[1]
+    assert "WHERE" not in query
+    assert params == [20]
+
+
+def _find_in_set(needle, haystack):
+    items = [item.lower() for item in (haystack or "").split(",")]
+    return items.index(needle.lower()) + 1 if needle and needle.lower() in items else 0
+
+
+def test_team_filter_finds_meetings_created_with_email_off():
+    # Real SQL on SQLite: with EMAIL_ENABLED off a meeting has meeting_invites
+    # but no meeting_invitee_responses rows.
+    db = sqlite3.connect(":memory:")
+    db.create_function("FIND_IN_SET", 2, _find_in_set)
+    db.executescript(
+        """
+        CREATE TABLE meetings (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE meeting_schedules (meeting_id INTEGER, starts_at TEXT, start_time TEXT, schedule_type TEXT);
+        CREATE TABLE members (id INTEGER PRIMARY KEY, email TEXT);
+        CREATE TABLE team_members (team_id INTEGER, member_id INTEGER);
+        CREATE TABLE meeting_invites (meeting_id INTEGER, emails TEXT);
+        CREATE TABLE meeting_invitee_responses (meeting_id INTEGER, invitee_email TEXT);
+        INSERT INTO meetings VALUES (1, 'Team meeting'), (2, 'Other meeting');
+        INSERT INTO meeting_schedules VALUES (1, '2026-03-02', '08:00:00', 'one-time'), (2, '2026-03-03', '08:00:00', 'one-time');
+        INSERT INTO members VALUES (5, 'Doc@Example.org');
+        INSERT INTO team_members VALUES (3, 5);
+        INSERT INTO meeting_invites VALUES (1, 'someone@example.org, doc@example.org'), (2, 'someone@example.org');
+        """
+    )
+    sql, params = build_meeting_page_query(parse_meeting_filters(_params(teamId="3")), columns="ms.meeting_id AS id")
+
+    rows = db.execute(sql.replace("%s", "?"), params).fetchall()
+
+    assert rows == [(1,)]
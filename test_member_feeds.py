@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+
+from member_feeds import FeedCache, MemberFeed, feed_last_modified, feed_url, fetch_feed_meetings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_feed_validators_depend_only_on_content():
+    first = MemberFeed("a@example.com", b"BEGIN:VCALENDAR", datetime(2026, 3, 2, 8, tzinfo=timezone.utc))
+    again = MemberFeed("a@example.com", b"BEGIN:VCALENDAR", datetime(2026, 3, 2, 8, tzinfo=timezone.utc))
+
+    assert first.etag == again.etag
+    assert first.etag != MemberFeed("a@example.com", b"BEGIN:VCALENDAR\r\n", None).etag
+    assert first.last_modified_header == "Mon, 02 Mar 2026 08:00:00 GMT"
+
+
+def test_last_modified_is_the_latest_creation_or_response():
+    meetings = [
+        {"createdAt": datetime(2026, 3, 1, 9), "respondedAt": None},
+        {"createdAt": datetime(2026, 2, 1, 9), "respondedAt": datetime(2026, 3, 5, 7)},
+    ]
+    assert feed_last_modified(meetings) == datetime(2026, 3, 5, 7, tzinfo=timezone.utc)
+    assert feed_last_modified([]) is None
+
+
+def test_invalidate_drops_only_the_members_feed():
+    cache = FeedCache(ttl=300)
+    cache.set("tok-a", MemberFeed("a@example.com", b"a", None))
+    cache.set("tok-b", MemberFeed("b@example.com", b"b", None))
+
+    cache.invalidate(["A@example.com", "nobody@example.com"])
+
+    assert cache.get("tok-a") is None
+    assert cache.get("tok-b").body == b"b"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_feeds_expire_after_ttl():
+    clock = FakeClock()
+    cache = FeedCache(ttl=300, clock=clock)
+    cache.set("tok-a", MemberFeed("a@example.com", b"a", None))
+
+    clock.now = 299
+    assert cache.get("tok-a") is not None
+    clock.now = 301
+    assert cache.get("tok-a") is None
+
+
+def test_fetch_feed_meetings_matches_responses_and_invites_by_email():
+    class Recorder:
+        def cursor(self, dictionary=False):
+            return self
+
+        def execute(self, query, params):
+            self.query, self.params = query, params
+
+        def fetchall(self):
+            return []
+
+    conn = Recorder()
+    assert fetch_feed_meetings(conn, "a@example.com") == []
+    assert conn.params == ("a@example.com", "a@example.com")
+    assert "mir.status <> 'Decline'" in conn.query
+    assert feed_url("abc") == "/api/feeds/abc.ics"
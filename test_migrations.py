@@ -0,0 +1,179 @@
+import pytest
+
+from migrations import (
+    MIGRATIONS_DIR,
+    MigrationError,
+    SchemaOutOfDateError,
+    apply_migrations,
+    applied_migrations,
+    check_schema,
+    load_migrations,
+    migration_status,
+    split_sql,
+)
+
+
+class NoSuchTableError(Exception):
+    errno = 1146
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def execute(self, statement, params=None):
+        self.conn.executed.append(statement.strip())
+        if statement.startswith("SELECT GET_LOCK") or statement.startswith("SELECT RELEASE_LOCK"):
+            self.rows = [(1,)]
+        elif statement.startswith("SELECT version, checksum"):
+            if not self.conn.has_table:
+                raise NoSuchTableError("Table 'schema_migrations' doesn't exist")
+            self.rows = sorted(self.conn.applied.items())
+        elif "CREATE TABLE IF NOT EXISTS schema_migrations" in statement:
+            self.conn.has_table = True
+        elif statement.startswith("INSERT INTO schema_migrations"):
+            version, name, checksum, execution_ms = params
+            self.conn.applied[version] = checksum
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class FakeConnection:
+    """Stand-in connection that keeps schema_migrations in a dict."""
+
+    def __init__(self, applied=None):
+        self.has_table = applied is not None
+        self.applied = dict(applied or {})
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+def _write(directory, files):
+    for name, text in files.items():
+        (directory / name).write_text(text, encoding="utf-8")
+    return load_migrations(directory)
+
+
+def test_migrations_load_in_version_order_and_ignore_other_files(tmp_path):
+    migrations = _write(
+        tmp_path,
+        {
+            "0002_add_rooms.sql": "CREATE TABLE rooms (id INT);",
+            "0001_initial.sql": "CREATE TABLE teams (id INT);",
+            "README.md": "notes",
+            "2_unpadded.sql": "SELECT 1;",
+        },
+    )
+
+    assert [(migration.version, migration.name, migration.kind) for migration in migrations] == [
+        (1, "initial", "sql"),
+        (2, "add_rooms", "sql"),
+    ]
+
+
+def test_duplicate_versions_are_rejected(tmp_path):
+    with pytest.raises(MigrationError):
+        _write(tmp_path, {"0001_initial.sql": "SELECT 1;", "0001_other.sql": "SELECT 2;"})
+
+
+def test_checksum_ignores_line_endings(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    unix = _write(tmp_path / "a", {"0001_initial.sql": "CREATE TABLE teams (id INT);\nSELECT 1;\n"})
+    (tmp_path / "b" / "0001_initial.sql").write_bytes(b"CREATE TABLE teams (id INT);\r\nSELECT 1;\r\n")
+
+    assert unix[0].checksum == load_migrations(tmp_path / "b")[0].checksum
+
+
+def test_split_sql_ignores_semicolons_in_quotes_and_comments():
+    script = """
+        -- teams; the first table
+        CREATE TABLE teams (name VARCHAR(20) DEFAULT 'a;b');
+        /* block; comment */
+        INSERT INTO teams (name) VALUES ('it''s; fine'), ("x\\";y");
+        # trailing; comment
+    """
+
+    assert split_sql(script) == [
+        "CREATE TABLE teams (name VARCHAR(20) DEFAULT 'a;b')",
+        "INSERT INTO teams (name) VALUES ('it''s; fine'), (\"x\\\";y\")",
+    ]
+
+
+def test_shipped_migrations_load():
+    migrations = load_migrations(MIGRATIONS_DIR)
+
+    assert [migration.version for migration in migrations][:2] == [1, 2]
+    assert any("CREATE TABLE IF NOT EXISTS meetings" in statement for statement in split_sql(migrations[0].path.read_text()))
+
+
+def test_status_reports_pending_changed_and_unknown(tmp_path):
+    migrations = _write(tmp_path, {"0001_initial.sql": "SELECT 1;", "0002_next.sql": "SELECT 2;"})
+
+    status = migration_status(migrations, {1: "edited", 7: "from a newer checkout"})
+
+    assert status["pending"] == [migrations[1]]
+    assert status["changed"] == [migrations[0]]
+    assert status["unknown"] == [7]
+
+
+def test_missing_history_table_means_nothing_applied():
+    assert applied_migrations(FakeConnection()) == {}
+
+
+def test_apply_runs_pending_migrations_once_and_records_them(tmp_path):
+    migrations = _write(
+        tmp_path,
+        {
+            "0001_initial.sql": "CREATE TABLE teams (id INT);\nCREATE TABLE members (id INT);",
+            "0002_backfill.py": "def apply(conn):\n    conn.cursor().execute('UPDATE members SET id = id')\n",
+        },
+    )
+    conn = FakeConnection()
+    logged = []
+
+    applied = apply_migrations(conn, migrations, log=logged.append)
+
+    assert applied == migrations
+    assert conn.applied == {1: migrations[0].checksum, 2: migrations[1].checksum}
+    assert "CREATE TABLE members (id INT)" in conn.executed
+    assert "UPDATE members SET id = id" in conn.executed
+    assert len(logged) == 2
+    assert conn.executed[-1].startswith("SELECT RELEASE_LOCK")
+
+    conn.executed.clear()
+    assert apply_migrations(conn, migrations, log=logged.append) == []
+    assert "CREATE TABLE teams (id INT)" not in conn.executed
+
+
+def test_apply_refuses_edited_migrations(tmp_path):
+    migrations = _write(tmp_path, {"0001_initial.sql": "SELECT 1;", "0002_next.sql": "SELECT 2;"})
+    conn = FakeConnection({1: "checksum before the edit"})
+
+    with pytest.raises(MigrationError):
+        apply_migrations(conn, migrations, log=lambda line: None)
+    assert 2 not in conn.applied
+
+
+def test_check_schema_needs_every_migration_applied(tmp_path):
+    migrations = _write(tmp_path, {"0001_initial.sql": "SELECT 1;", "0002_next.sql": "SELECT 2;"})
+
+    with pytest.raises(SchemaOutOfDateError):
+        check_schema(FakeConnection(), migrations)
+    with pytest.raises(SchemaOutOfDateError):
+        check_schema(FakeConnection({1: migrations[0].checksum}), migrations)
+
+    conn = FakeConnection({migration.version: migration.checksum for migration in migrations})
+    assert check_schema(conn, migrations) == 2
+    assert len(conn.executed) == 1
@@ -0,0 +1,195 @@
+import sqlite3
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from occurrence_index import (
+    build_calendar_query,
+    extend_horizon,
+    fetch_calendar,
+    materialize_meeting,
+    occurrence_rows,
+    parse_calendar_filters,
+    time_of_day,
+)
+
+TODAY = date(2026, 3, 1)
+
+
+def _params(**values):
+    return lambda name, default="": values.get(name, default)
+
+
+def _weekly(meeting_id=1, **overrides):
+    return {
+        "id": meeting_id,
+        "startsAt": date(2026, 3, 2),
+        "startTime": timedelta(hours=8),
+        "endTime": timedelta(hours=9, minutes=30),
+        "scheduleType": "recurring",
+        "recurrenceRule": "FREQ=WEEKLY;BYDAY=MO",
+        "recurrenceEndDate": None,
+        "recurrenceExceptions": None,
+        **overrides,
+    }
+
+
+class OccurrenceTable:
+    """Stand-in for meeting_schedules + meeting_occurrences that applies the writes extend_horizon() makes."""
+
+    def __init__(self, schedules):
+        self.schedules = {schedule["id"]: dict(schedule, occurrencesUntil=None) for schedule in schedules}
+        self.occurrences = set()
+        self.commits = 0
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def execute(self, query, params=None):
+        if "FROM meeting_schedules" in query:
+            horizon, limit = params
+            behind = [
+                schedule for schedule in self.schedules.values()
+                if schedule["occurrencesUntil"] is None
+                or (schedule["scheduleType"] == "recurring" and schedule["occurrencesUntil"] < horizon)
+            ]
+            self._rows = [dict(schedule) for schedule in behind[:limit]]
+        elif query.startswith("UPDATE meeting_schedules"):
+            until, meeting_id = params
+            self.schedules[meeting_id]["occurrencesUntil"] = until
+        elif query.startswith("DELETE FROM meeting_occurrences"):
+            self.occurrences = {row for row in self.occurrences if row[0] != params[0]}
+
+    def executemany(self, query, rows):
+        self.occurrences.update(rows)
+
+    def fetchall(self):
+        return self._rows
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_occurrence_rows_combine_dates_with_meeting_times():
+    rows = list(occurrence_rows(_weekly(recurrenceExceptions="2026-03-09"), date(2026, 3, 1), date(2026, 3, 20)))
+
+    assert rows == [
+        (1, datetime(2026, 3, 2, 8, 0), datetime(2026, 3, 2, 9, 30)),
+        (1, datetime(2026, 3, 16, 8, 0), datetime(2026, 3, 16, 9, 30)),
+    ]
+
+
+@pytest.mark.parametrize("value", [timedelta(hours=8, minutes=5), time(8, 5), "08:05", "8:05:00"])
+def test_time_of_day_accepts_mysql_and_payload_values(value):
+    assert time_of_day(value) == time(8, 5)
+
+
+def test_materialize_meeting_replaces_previous_rows():
+    table = OccurrenceTable([_weekly()])
+    table.occurrences = {(1, datetime(2026, 3, 3, 8, 0), datetime(2026, 3, 3, 9, 0))}
+
+    written = materialize_meeting(table, _weekly(startTime="08:00", endTime="09:00"), date(2026, 3, 31))
+
+    assert written == 5
+    assert min(table.occurrences)[1] == datetime(2026, 3, 2, 8, 0)
+    assert table.schedules[1]["occurrencesUntil"] == date(2026, 3, 31)
+
+
+def test_extend_horizon_backfills_then_adds_only_new_dates():
+    one_time = _weekly(2, scheduleType="one-time", recurrenceRule=None, startsAt=date(2026, 3, 4))
+    table = OccurrenceTable([_weekly(), one_time])
+
+    first = extend_horizon(table, date(2026, 3, 31), batch_size=1)
+    second = extend_horizon(table, date(2026, 4, 14))
+
+    assert first == {"meetings": 2, "occurrences": 6}
+    assert second == {"meetings": 1, "occurrences": 2}
+    assert len(table.occurrences) == 8
+    assert extend_horizon(table, date(2026, 4, 14)) == {"meetings": 0, "occurrences": 0}
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [
+        ({"to": "2026-03-07"}, "from is required"),
+        ({"from": "2026-03-07", "to": "2026-03-01"}, "before"),
+        ({"from": "2026-01-01", "to": "2027-06-01"}, "at most"),
+        ({"from": "2040-01-01", "to": "2040-01-07"}, "ahead"),
+        ({"from": "2026-03-01", "to": "2026-03-07", "teamId": "x"}, "teamId"),
+    ],
+)
+def test_invalid_calendar_filters(params, message):
+    with pytest.raises(ValueError, match=message):
+        parse_calendar_filters(_params(**params), TODAY)
+
+
+def test_calendar_query_is_a_range_on_occurrence_start():
+    filters = parse_calendar_filters(
+        _params(teamId="3", email=" Doc@Example.org ", **{"from": "2026-03-02", "to": "2026-03-08"}), TODAY
+    )
+
+    sql, params = build_calendar_query(filters)
+
+    assert "mo.occurrence_start >= %s AND mo.occurrence_start < %s" in sql
+    assert "ORDER BY mo.occurrence_start, mo.meeting_id" in sql
+    assert params == [date(2026, 3, 2), date(2026, 3, 9), 3, "doc@example.org"]
+    assert sql.count("%s") == len(params)
+
+
+def _find_in_set(needle, haystack):
+    items = [item.lower() for item in (haystack or "").split(",")]
+    return items.index(needle.lower()) + 1 if needle and needle.lower() in items else 0
+
+
+@pytest.mark.parametrize("params", [{"teamId": "3"}, {"email": "doc@example.org"}])
+def test_calendar_filters_find_meetings_without_response_rows(params):
+    # Real SQL on SQLite: a meeting created with EMAIL_ENABLED off has
+    # meeting_invites but no meeting_invitee_responses rows.
+    db = sqlite3.connect(":memory:")
+    db.create_function("FIND_IN_SET", 2, _find_in_set)
+    db.executescript(
+        """
+        CREATE TABLE meetings (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE meeting_schedules (meeting_id INTEGER, timezone TEXT, schedule_type TEXT, teams_join_url TEXT);
+        CREATE TABLE meeting_occurrences (meeting_id INTEGER, occurrence_start TEXT, occurrence_end TEXT);
+        CREATE TABLE members (id INTEGER PRIMARY KEY, email TEXT);
+        CREATE TABLE team_members (team_id INTEGER, member_id INTEGER);
+        CREATE TABLE meeting_invites (meeting_id INTEGER, emails TEXT);
+        CREATE TABLE meeting_invitee_responses (meeting_id INTEGER, invitee_email TEXT);
+        INSERT INTO meetings VALUES (1, 'Team meeting'), (2, 'Other meeting');
+        INSERT INTO meeting_schedules VALUES (1, 'EST', 'one-time', NULL), (2, 'EST', 'one-time', NULL);
+        INSERT INTO meeting_occurrences VALUES
+            (1, '2026-03-02 08:00:00', '2026-03-02 09:00:00'), (2, '2026-03-03 08:00:00', '2026-03-03 09:00:00');
+        INSERT INTO members VALUES (5, 'Doc@Example.org');
+        INSERT INTO team_members VALUES (3, 5);
+        INSERT INTO meeting_invites VALUES (1, 'someone@example.org, doc@example.org'), (2, 'someone@example.org');
+        """
+    )
+    filters = parse_calendar_filters(_params(**params, **{"from": "2026-03-02", "to": "2026-03-08"}), TODAY)
+    sql, query_params = build_calendar_query(filters)
+
+    rows = db.execute(sql.replace("%s", "?"), [str(param) for param in query_params]).fetchall()
+
+    assert [row[0] for row in rows] == [1]
+
+
+def test_fetch_calendar_shapes_rows():
+    class Rows:
+        def cursor(self, dictionary=False):
+            return self
+
+        def execute(self, query, params):
+            pass
+
+        def fetchall(self):
+            return [{
+                "meeting_id": 1, "name": "Tumor board", "occurrence_start": datetime(2026, 3, 2, 8, 0),
+                "occurrence_end": datetime(2026, 3, 2, 9, 0), "timezone": "EST", "schedule_type": "recurring",
+                "teams_join_url": None,
+            }]
+
+    filters = parse_calendar_filters(_params(**{"from": "2026-03-02", "to": "2026-03-08"}), TODAY)
+    assert fetch_calendar(Rows(), filters) == [{
+        "meetingId": 1, "name": "Tumor board", "start": "2026-03-02T08:00:00", "end": "2026-03-02T09:00:00",
+        "timezone": "EST", "scheduleType": "recurring", "teamsJoinUrl": None,
+    }]
@@ -0,0 +1,117 @@
+from datetime import date
+from itertools import islice
+
+import pytest
+
+from recurrence import (
+    OccurrenceCache,
+    RecurrenceError,
+    RecurrenceRule,
+    RecurrenceSeries,
+    parse_exdates,
+    series_from_meeting,
+)
+
+
+def _dates(rule, dtstart, start, end, until=None, exdates=()):
+    series = RecurrenceSeries(dtstart, RecurrenceRule.parse(rule), until, exdates)
+    return [day.isoformat() for day in series.between(start, end)]
+
+
+@pytest.mark.parametrize(
+    "rule, dtstart, expected",
+    [
+        ("FREQ=WEEKLY;BYDAY=MO,WE", "2026-03-02", ["2026-03-02", "2026-03-04", "2026-03-09", "2026-03-11"]),
+        ("FREQ=WEEKLY;INTERVAL=2;BYDAY=TU", "2026-03-03", ["2026-03-03", "2026-03-17", "2026-03-31", "2026-04-14"]),
+        ("FREQ=MONTHLY;BYDAY=-1FR", "2026-01-30", ["2026-01-30", "2026-02-27", "2026-03-27", "2026-04-24"]),
+        ("FREQ=MONTHLY;BYMONTHDAY=31", "2026-01-31", ["2026-01-31", "2026-03-31", "2026-05-31", "2026-07-31"]),
+        ("FREQ=MONTHLY;BYMONTHDAY=-1", "2026-01-31", ["2026-01-31", "2026-02-28", "2026-03-31", "2026-04-30"]),
+        ("FREQ=YEARLY", "2024-02-29", ["2024-02-29", "2028-02-29", "2032-02-29", "2036-02-29"]),
+        ("FREQ=YEARLY;BYMONTH=11;BYDAY=4TH", "2026-11-26", ["2026-11-26", "2027-11-25", "2028-11-23", "2029-11-22"]),
+        ("FREQ=DAILY;INTERVAL=3", "2026-03-02", ["2026-03-02", "2026-03-05", "2026-03-08", "2026-03-11"]),
+        ("FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR", "2026-03-06", ["2026-03-06", "2026-03-09", "2026-03-10", "2026-03-11"]),
+    ],
+)
+def test_rule_expansion(rule, dtstart, expected):
+    series = RecurrenceSeries(dtstart, RecurrenceRule.parse(rule))
+    assert [day.isoformat() for day in islice(series.between(dtstart, "2040-12-31"), 4)] == expected
+
+
+def test_count_includes_occurrences_before_the_window_and_exdates():
+    assert _dates("FREQ=DAILY;COUNT=5", "2026-03-02", "2026-03-04", "2026-12-31", exdates=["2026-03-05"]) == [
+        "2026-03-04",
+        "2026-03-06",
+    ]
+
+
+def test_end_date_and_until_both_apply():
+    assert _dates("FREQ=WEEKLY;BYDAY=FR", "2026-03-06", "2026-01-01", "2026-12-31", until="2026-03-20") == [
+        "2026-03-06",
+        "2026-03-13",
+        "2026-03-20",
+    ]
+    assert _dates("FREQ=WEEKLY;UNTIL=20260313", "2026-03-06", "2026-01-01", "2026-12-31", until="2026-12-31") == [
+        "2026-03-06",
+        "2026-03-13",
+    ]
+
+
+def test_window_far_from_start_skips_ahead():
+    assert _dates("FREQ=DAILY;INTERVAL=3", "2026-03-02", "2027-03-01", "2027-03-07") == ["2027-03-03", "2027-03-06"]
+
+
+def test_rule_that_never_matches_terminates():
+    assert _dates("FREQ=MONTHLY;BYMONTH=2;BYMONTHDAY=30", "2026-01-30", "2026-01-01", "2100-12-31") == ["2026-01-30"]
+
+
+def test_one_time_meeting_has_a_single_occurrence():
+    series = series_from_meeting({"startsAt": date(2026, 3, 2), "scheduleType": "one-time", "recurrenceRule": None})
+    assert list(series.between("2026-01-01", "2026-12-31")) == [date(2026, 3, 2)]
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "FREQ=HOURLY",
+        "BYDAY=MO",
+        "FREQ=WEEKLY;BYHOUR=9",
+        "FREQ=WEEKLY;BYDAY=1MO",
+        "FREQ=WEEKLY;BYMONTHDAY=1",
+        "FREQ=DAILY;COUNT=2;UNTIL=20260101",
+        "FREQ=DAILY;INTERVAL=0",
+        "FREQ=WEEKLY;BYDAY=XX",
+        "FREQ=MONTHLY;BYMONTH=13",
+    ],
+)
+def test_invalid_rules_are_rejected(rule):
+    with pytest.raises(RecurrenceError):
+        RecurrenceRule.parse(rule)
+
+
+def test_rule_text_round_trips():
+    rule = RecurrenceRule.parse("rrule:freq=monthly;byday=-1fr;interval=2")
+    assert str(rule) == "FREQ=MONTHLY;INTERVAL=2;BYDAY=-1FR"
+    assert rule.format(until="20260629T120000Z") == "FREQ=MONTHLY;INTERVAL=2;UNTIL=20260629T120000Z;BYDAY=-1FR"
+
+
+def test_parse_exdates_accepts_lists_and_strings():
+    assert parse_exdates("2026-03-09, 2026-03-02") == (date(2026, 3, 2), date(2026, 3, 9))
+    assert parse_exdates(["2026-03-02"]) == (date(2026, 3, 2),)
+    assert parse_exdates(None) == ()
+    with pytest.raises(RecurrenceError):
+        parse_exdates("next monday")
+
+
+def test_occurrence_cache_reuses_year_windows_and_notices_rule_changes():
+    cache = OccurrenceCache()
+    weekly = RecurrenceSeries("2020-01-06", RecurrenceRule.parse("FREQ=WEEKLY;BYDAY=MO"))
+
+    first = cache.between(1, weekly, "2026-01-01", "2026-12-31")
+    again = cache.between(1, weekly, "2026-03-01", "2026-03-31")
+    assert len(first) == 52
+    assert again == [date(2026, 3, 2), date(2026, 3, 9), date(2026, 3, 16), date(2026, 3, 23), date(2026, 3, 30)]
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    changed = RecurrenceSeries("2020-01-06", RecurrenceRule.parse("FREQ=WEEKLY;BYDAY=TU"))
+    assert cache.between(1, changed, "2026-03-01", "2026-03-07") == [date(2026, 3, 3)]
+    assert cache.next_after(1, changed, "2026-12-30") == date(2027, 1, 5)
@@ -0,0 +1,77 @@
+import gzip
+import zlib
+
+import response_compression
+from response_compression import ResponseCompressor
+from static_assets import encoded_etag
+
+BODY = b'[' + b",".join(b'{"id":%d,"teamsJoinUrl":"https://teams.example.com/l/meetup-join/1"}' % n for n in range(200)) + b"]"
+
+
+def test_small_bodies_and_unwilling_clients_stay_uncompressed():
+    compressor = ResponseCompressor(min_size=1024)
+
+    assert compressor.choose("gzip, deflate", 1023) == "identity"
+    assert compressor.choose("identity", len(BODY)) == "identity"
+    assert compressor.choose("gzip;q=0", len(BODY)) == "identity"
+    assert compressor.choose("gzip, deflate", len(BODY)) == "gzip"
+    assert compressor.stats()["below_min_size"] == 1
+
+
+def test_compressed_body_round_trips_and_counts_bytes_saved():
+    compressor = ResponseCompressor(gzip_level=1)
+    compressed = compressor.compress(BODY, "gzip")
+
+    assert gzip.decompress(compressed) == BODY
+    stats = compressor.stats()
+    assert stats["responses"] == 1
+    assert stats["bytes_saved"] == len(BODY) - len(compressed) > 0
+
+
+def test_streamed_pieces_decode_as_they_arrive():
+    compressor = ResponseCompressor()
+    chunks = [BODY[:5000], BODY[5000:], b""]
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    decoded = []
+
+    for piece in compressor.compress_stream(iter(chunks), "gzip"):
+        decoded.append(decoder.decompress(piece))
+
+    # Every chunk is fully decodable before the next one is sent.
+    assert decoded[0] == BODY[:5000]
+    assert b"".join(decoded) == BODY
+    assert compressor.stats()["by_encoding"]["gzip"]["bytes_in"] == len(BODY)
+
+
+def test_brotli_is_preferred_when_installed(monkeypatch):
+    calls = []
+
+    class FakeCompressor:
+        def __init__(self, quality):
+            calls.append(("quality", quality))
+
+        def process(self, data):
+            calls.append(("process", data))
+            return data
+
+        def flush(self):
+            return b"|"
+
+        def finish(self):
+            return b"."
+
+    class FakeBrotli:
+        Compressor = FakeCompressor
+
+    monkeypatch.setattr(response_compression, "brotli", FakeBrotli)
+    compressor = ResponseCompressor(brotli_quality=5)
+
+    assert compressor.negotiate("gzip, deflate, br") == "br"
+    assert compressor.negotiate("gzip;q=1, br;q=0.5") == "gzip"
+    assert b"".join(compressor.compress_stream([b"ab", b"cd"], "br")) == b"ab|cd|."
+    assert calls[0] == ("quality", 5)
+
+
+def test_encoded_etag_marks_the_variant():
+    assert encoded_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert encoded_etag('"abc"', "identity") == '"abc"'
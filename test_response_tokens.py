@@ -0,0 +1,60 @@
+import pytest
+
+from response_tokens import ResponseTokenSigner, TokenError, parse_token_keys
+
+OLD_KEY = b"old-secret-0123456789"
+NEW_KEY = b"new-secret-0123456789"
+
+
+def test_round_trip_carries_meeting_and_invitee():
+    signer = ResponseTokenSigner({"k1": OLD_KEY}, "k1", ttl_seconds=60)
+    token = signer.issue(1234, 98765, now=1000)
+
+    assert token.startswith("k1.")
+    assert len(token) < 64
+    assert signer.verify(token, now=1059) == (1234, 98765)
+
+
+def test_expired_token_is_rejected():
+    signer = ResponseTokenSigner({"k1": OLD_KEY}, "k1", ttl_seconds=60)
+    token = signer.issue(1, 2, now=1000)
+
+    with pytest.raises(TokenError, match="expired"):
+        signer.verify(token, now=1061)
+
+
+def test_tampered_payload_is_rejected():
+    signer = ResponseTokenSigner({"k1": OLD_KEY}, "k1", ttl_seconds=60)
+    other = signer.issue(2, 2)
+    key_id, _, signature = signer.issue(1, 2).split(".")
+    forged = f"{key_id}.{other.split('.')[1]}.{signature}"
+
+    with pytest.raises(TokenError):
+        signer.verify(forged)
+
+
+@pytest.mark.parametrize("token", ["", "a.b", "k1.!!!.???", "k1.AAAA.AAAA", "k1..", "k1.é.x"])
+def test_garbage_is_rejected(token):
+    with pytest.raises(TokenError):
+        ResponseTokenSigner({"k1": OLD_KEY}, "k1", ttl_seconds=60).verify(token)
+
+
+def test_rotation_keeps_old_tokens_valid_until_key_is_removed():
+    old = ResponseTokenSigner({"k1": OLD_KEY}, "k1", ttl_seconds=60)
+    rotated = ResponseTokenSigner({"k2": NEW_KEY, "k1": OLD_KEY}, "k2", ttl_seconds=60)
+    retired = ResponseTokenSigner({"k2": NEW_KEY}, "k2", ttl_seconds=60)
+    token = old.issue(5, 6)
+
+    assert rotated.issue(5, 6).startswith("k2.")
+    assert rotated.verify(token) == (5, 6)
+    with pytest.raises(TokenError):
+        retired.verify(token)
+
+
+def test_parse_token_keys_first_key_signs():
+    keys, active = parse_token_keys("k2:new-secret-0123456789, k1:old-secret-0123456789")
+    assert active == "k2"
+    assert keys == {"k2": NEW_KEY, "k1": OLD_KEY}
+    assert parse_token_keys("") == ({}, None)
+    with pytest.raises(ValueError):
+        parse_token_keys("k1:short")
@@ -0,0 +1,92 @@
+import pytest
+
+from router import Router, RouteTimings, parse_query
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+
+def _router():
+    router = Router()
+    router.add("GET", "/api/teams", lambda handler: handler.calls.append("teams"))
+    router.add("GET", "/api/meetings/{meeting_id:int}", lambda handler, meeting_id: handler.calls.append(meeting_id))
+    router.add("GET", "/api/respond/{token}.ics", lambda handler, token: handler.calls.append(("ics", token)))
+    router.add("GET", "/api/respond/{token}", lambda handler, token: handler.calls.append(("respond", token)))
+    router.add("POST", "/api/teams", lambda handler: handler.calls.append("create"))
+    return router
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("GET", "/api/teams", "teams"),
+        ("POST", "/api/teams", "create"),
+        ("GET", "/api/meetings/42", 42),
+        ("GET", "/api/respond/k1.abc.def.ics", ("ics", "k1.abc.def")),
+        ("GET", "/api/respond/k1.abc.def", ("respond", "k1.abc.def")),
+        ("GET", "/api/respond/a%20b", ("respond", "a b")),
+    ],
+)
+def test_dispatch_calls_handler_with_converted_params(method, path, expected):
+    handler = Recorder()
+
+    assert _router().dispatch(handler, method, path)
+    assert handler.calls == [expected]
+
+
+@pytest.mark.parametrize(
+    "method, path",
+    [("GET", "/api/meetings/abc"), ("GET", "/api/meetings/1/x"), ("DELETE", "/api/teams"), ("GET", "/api/respond/")],
+)
+def test_unmatched_requests_are_not_dispatched(method, path):
+    handler = Recorder()
+
+    assert not _router().dispatch(handler, method, path)
+    assert handler.calls == []
+
+
+def test_allowed_methods_lists_every_method_for_a_path():
+    router = _router()
+
+    assert router.allowed_methods("/api/teams") == ["GET", "POST"]
+    assert router.allowed_methods("/api/meetings/7") == ["GET"]
+    assert router.allowed_methods("/nope") == []
+
+
+def test_duplicate_static_route_is_rejected():
+    router = _router()
+
+    with pytest.raises(ValueError):
+        router.add("GET", "/api/teams", lambda handler: None)
+
+
+def test_timing_hook_runs_even_when_handler_raises():
+    router = Router()
+    timings = RouteTimings()
+    router.add_hook(timings)
+
+    def fail(handler):
+        raise RuntimeError("boom")
+
+    router.add("GET", "/ok", lambda handler: None)
+    router.add("GET", "/fail", fail, name="failing")
+    router.dispatch(None, "GET", "/ok")
+    router.dispatch(None, "GET", "/ok")
+    with pytest.raises(RuntimeError):
+        router.dispatch(None, "GET", "/fail")
+
+    stats = timings.stats()
+    assert stats["GET /ok"]["count"] == 2
+    assert stats["failing"]["count"] == 1
+    assert stats["GET /ok"]["maxMs"] >= stats["GET /ok"]["avgMs"]
+
+
+def test_parse_query_decodes_values():
+    assert parse_query("fileName=scan%20%C3%A9.pdf&a=1&a=2&empty=&plus=x+y") == {
+        "fileName": "scan é.pdf",
+        "a": "1",
+        "empty": "",
+        "plus": "x y",
+    }
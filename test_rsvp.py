@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from response_tokens import ResponseTokenSigner, TokenError
+from rsvp import RsvpService, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts_oldest():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, max_entries=2, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    clock.now = 11
+    assert cache.get("c") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "entries": 1}
+
+
+class InvitationConnection:
+    """Connection/dictionary cursor answering the invitation JOIN and the conditional UPDATE."""
+
+    def __init__(self):
+        self.statuses = {11: "Pending"}
+        self.queries = []
+        self.rowcount = -1
+        self.closed = 0
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def close(self):
+        self.closed += 1
+
+    def execute(self, query, params):
+        self.queries.append((query.split()[0], params))
+        if query.split()[0] == "SELECT":
+            found = params in [(LEGACY_TOKEN,), (11, 7)]
+            self._row = {"inviteeId": 11, "inviteeEmail": "a@example.com", "id": 7, "name": "Tumor Board"} if found else None
+        else:
+            status, _, invitee_id, unchanged = params
+            self.rowcount = 0
+            if self.statuses.get(invitee_id, unchanged) != unchanged:
+                self.statuses[invitee_id] = status
+                self.rowcount = 1
+
+    def fetchone(self):
+        return dict(self._row) if self._row else None
+
+
+LEGACY_TOKEN = "x" * 43
+SIGNER = ResponseTokenSigner({"k1": b"0123456789abcdef"}, "k1", ttl_seconds=3600)
+
+
+@pytest.mark.parametrize("token", [LEGACY_TOKEN, SIGNER.issue(7, 11)])
+def test_lookup_is_cached_per_token_and_meeting(token):
+    service = RsvpService(ttl=30, signer=SIGNER)
+    conn = InvitationConnection()
+
+    first = service.lookup(lambda: conn, token)
+    second = service.lookup(lambda: conn, token)
+
+    assert first == (11, "a@example.com", {"id": 7, "name": "Tumor Board"})
+    assert second == first
+    assert [name for name, _ in conn.queries] == ["SELECT"]
+    assert conn.closed == 1
+
+
+def _tampered(token):
+    # Changes the signature's first character: always different, and unlike
+    # the last one it carries no base64 padding bits.
+    payload, signature = token.rsplit(".", 1)
+    return f"{payload}.{'B' if signature[0] == 'A' else 'A'}{signature[1:]}"
+
+
+@pytest.mark.parametrize(
+    "token",
+    ["not-a-token", "y" * 44, _tampered(SIGNER.issue(7, 11)), "k2.AAAA.AAAA", SIGNER.issue(7, 11, now=0)],
+)
+def test_bad_tokens_are_rejected_without_a_connection(token):
+    service = RsvpService(signer=SIGNER)
+
+    def no_connection():
+        raise AssertionError("database was used")
+
+    with pytest.raises(TokenError):
+        service.lookup(no_connection, token)
+    assert service.stats()["rejected"] == 1
+
+
+def test_rejections_are_counted_across_threads():
+    service = RsvpService(signer=SIGNER)
+
+    def reject_many():
+        for _ in range(2000):
+            with pytest.raises(TokenError):
+                service.lookup(None, "not-a-token")
+
+    threads = [threading.Thread(target=reject_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert service.stats()["rejected"] == 16000
+
+
+def test_signed_tokens_are_rejected_without_a_signer():
+    with pytest.raises(TokenError):
+        RsvpService().lookup(None, SIGNER.issue(7, 11))
+
+
+def test_unknown_token_returns_none():
+    assert RsvpService().lookup(InvitationConnection, "z" * 43) is None
+
+
+def test_record_reports_only_the_first_change():
+    service = RsvpService()
+    conn = InvitationConnection()
+
+    assert service.record(conn, 11, "Accept", None)
+    assert not service.record(conn, 11, "Accept", None)
+    assert service.record(conn, 11, "Decline", None)
+    assert [name for name, _ in conn.queries] == ["UPDATE"] * 3
@@ -0,0 +1,233 @@
+import http.client
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib import error as urllib_error
+from urllib import request as urllib_request
+
+import pytest
+
+from server import BoundedThreadPoolServer, KeepAliveRequestHandler, create_server
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    release = threading.Event()
+
+    def do_GET(self):
+        if self.path == "/slow":
+            self.release.wait(timeout=5)
+        body = json.dumps({"path": self.path}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _get(server, path):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    with urllib_request.urlopen(url, timeout=5) as response:
+        return response.status, json.loads(response.read())
+
+
+@pytest.fixture
+def pool_server():
+    servers = []
+
+    def start(**kwargs):
+        SlowHandler.release = threading.Event()
+        server = BoundedThreadPoolServer(("127.0.0.1", 0), SlowHandler, **kwargs)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        return server
+
+    yield start
+
+    for server, thread in servers:
+        SlowHandler.release.set()
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+def _wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_slow_request_does_not_block_others(pool_server):
+    server = pool_server(threads=2, queue_size=4)
+    slow = threading.Thread(target=_get, args=(server, "/slow"))
+    slow.start()
+    assert _wait_for(lambda: server.stats()["in_flight"] == 1)
+
+    status, body = _get(server, "/fast")
+
+    assert status == 200
+    assert body == {"path": "/fast"}
+    SlowHandler.release.set()
+    slow.join(timeout=5)
+
+
+def test_saturated_server_answers_503(pool_server):
+    server = pool_server(threads=1, queue_size=1)
+    first = threading.Thread(target=_get, args=(server, "/slow"))
+    first.start()
+    assert _wait_for(lambda: server.stats()["in_flight"] == 1)
+    second = threading.Thread(target=_get, args=(server, "/slow"))
+    second.start()
+    assert _wait_for(lambda: server.stats()["queued"] == 1)
+
+    with pytest.raises(urllib_error.HTTPError) as excinfo:
+        _get(server, "/fast")
+
+    assert excinfo.value.code == 503
+    assert excinfo.value.headers["Retry-After"] == "1"
+    assert server.stats()["rejected"] == 1
+    SlowHandler.release.set()
+    first.join(timeout=5)
+    second.join(timeout=5)
+
+
+def test_server_close_drains_in_flight_requests():
+    SlowHandler.release = threading.Event()
+    server = BoundedThreadPoolServer(("127.0.0.1", 0), SlowHandler, threads=1, queue_size=2)
+    serve_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    serve_thread.start()
+    result = {}
+    client = threading.Thread(target=lambda: result.update(zip(("status", "body"), _get(server, "/slow"))))
+    client.start()
+    assert _wait_for(lambda: server.stats()["in_flight"] == 1)
+
+    server.shutdown()
+    serve_thread.join(timeout=5)
+    threading.Timer(0.1, SlowHandler.release.set).start()
+    server.server_close()
+    client.join(timeout=5)
+
+    assert result["status"] == 200
+    assert server.stats()["completed"] == 1
+
+
+def test_create_server_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        create_server(SlowHandler, host="127.0.0.1", port=0, mode="fibers")
+
+
+class KeepAliveHandler(KeepAliveRequestHandler):
+    keepalive_timeout = 0.5
+    keepalive_max_requests = 3
+
+    def do_GET(self):
+        body = json.dumps({"port": self.client_address[1], "count": self.requests_handled}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def keepalive_server():
+    server = BoundedThreadPoolServer(("127.0.0.1", 0), KeepAliveHandler, threads=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+def test_connection_is_reused_up_to_max_requests(keepalive_server):
+    conn = http.client.HTTPConnection("127.0.0.1", keepalive_server.server_address[1], timeout=5)
+    seen = []
+    for _ in range(3):
+        conn.request("GET", "/")
+        response = conn.getresponse()
+        seen.append((json.loads(response.read()), response.getheader("Connection")))
+
+    assert [body["count"] for body, _ in seen] == [0, 1, 2]
+    assert len({body["port"] for body, _ in seen}) == 1
+    assert [header for _, header in seen] == [None, None, "close"]
+    assert keepalive_server.stats()["accepted"] == 1
+
+
+def test_idle_connection_is_closed_after_timeout(keepalive_server):
+    sock = socket.create_connection(keepalive_server.server_address, timeout=5)
+    sock.sendall(b"GET / HTTP/1.1\r\nHost: x\r\n\r\n")
+    # Headers and body are separate writes and may arrive separately.
+    response = b""
+    while not response.endswith(b"}"):
+        response += sock.recv(4096)
+    assert b"Keep-Alive: timeout=1, max=3" in response
+
+    started = time.monotonic()
+    assert sock.recv(4096) == b""
+    assert time.monotonic() - started < 3
+    sock.close()
+
+
+class PatientKeepAliveHandler(KeepAliveHandler):
+    keepalive_timeout = 10.0
+
+
+def test_idle_connection_gives_worker_back_when_work_is_queued():
+    server = BoundedThreadPoolServer(("127.0.0.1", 0), PatientKeepAliveHandler, threads=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        idle = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        idle.request("GET", "/")
+        idle.getresponse().read()
+
+        # The only worker now waits on the idle connection for up to 10 s.
+        started = time.monotonic()
+        status, _ = _get(server, "/queued")
+
+        assert status == 200
+        assert time.monotonic() - started < 2
+        idle.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+def test_pipelined_requests_are_answered_in_order(keepalive_server):
+    sock = socket.create_connection(keepalive_server.server_address, timeout=5)
+    sock.sendall(b"GET /a HTTP/1.1\r\nHost: x\r\n\r\nGET /b HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+    data = b""
+    while chunk := sock.recv(4096):
+        data += chunk
+    sock.close()
+
+    assert data.count(b"HTTP/1.1 200 OK") == 2
+    assert b'"count": 1' in data
+    assert data.rstrip().endswith(b"}")
+
+
+def test_single_mode_closes_after_each_response():
+    server = create_server(KeepAliveHandler, host="127.0.0.1", port=0, mode="single")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        conn.request("GET", "/")
+        assert conn.getresponse().getheader("Connection") == "close"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
@@ -0,0 +1,92 @@
+import gzip
+import os
+
+import pytest
+
+from static_assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    StaticAssetCache,
+    negotiate_encoding,
+)
+
+
+@pytest.fixture
+def public(tmp_path):
+    (tmp_path / "index.html").write_text(
+        '<link href="styles.css"><link href="https://cdn.example.com/x.css"><script src="app.js"></script>'
+    )
+    (tmp_path / "app.js").write_text("console.log('planner');\n" * 100)
+    (tmp_path / "styles.css").write_text("body{}")
+    return tmp_path
+
+
+def _touch(path, content):
+    stat = path.stat()
+    path.write_text(content)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_html_references_are_fingerprinted(public):
+    cache = StaticAssetCache(public)
+    index, cache_control = cache.lookup("/")
+    app_js = cache.get("app.js")
+
+    html = index.variants["identity"].decode()
+    assert f'src="{app_js.fingerprinted_path}"' in html
+    assert 'href="https://cdn.example.com/x.css"' in html
+    assert cache_control == REVALIDATE_CACHE_CONTROL
+    assert index.content_type == "text/html; charset=utf-8"
+
+
+def test_fingerprinted_url_is_immutable_only_for_current_hash(public):
+    cache = StaticAssetCache(public)
+    app_js = cache.get("app.js")
+
+    assert cache.lookup(app_js.fingerprinted_path) == (app_js, IMMUTABLE_CACHE_CONTROL)
+    assert cache.lookup("/app.0123456789.js") == (app_js, REVALIDATE_CACHE_CONTROL)
+    assert cache.lookup("/missing.0123456789.js") == (None, None)
+    assert cache.lookup("/../secret.txt") == (None, None)
+
+
+def test_compressed_variants_only_above_threshold(public):
+    cache = StaticAssetCache(public)
+    app_js = cache.get("app.js")
+
+    assert gzip.decompress(app_js.variants["gzip"]) == app_js.variants["identity"]
+    assert app_js.variant("gzip")[1] == app_js.etag[:-1] + '-gzip"'
+    assert set(cache.get("styles.css").variants) == {"identity"}
+
+
+def test_changed_file_is_reloaded_and_page_refingerprinted(public):
+    cache = StaticAssetCache(public, check_interval=0)
+    index = cache.get("index.html")
+    old_js = cache.get("app.js")
+    assert cache.get("app.js") is old_js
+
+    _touch(public / "app.js", "console.log('v2');")
+    new_js = cache.get("app.js")
+    new_index = cache.get("index.html")
+
+    assert new_js.fingerprint != old_js.fingerprint
+    assert new_index is not index
+    assert new_js.fingerprinted_path.encode() in new_index.variants["identity"]
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, "identity"),
+        ("gzip, deflate", "gzip"),
+        ("gzip, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("gzip;q=0", "identity"),
+        ("*", "br"),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, {"identity": b"", "gzip": b"", "br": b""}) == expected
+
+
+def test_negotiate_encoding_ignores_unavailable_variants():
+    assert negotiate_encoding("br", {"identity": b"", "gzip": b""}) == "identity"